@@ -0,0 +1,46 @@
+"""
+Compares maybe_attr_dict and lazy_attr_dict on large decoded json payload.
+Run from repository root: python -m benchmarks.bench_attr_dict
+"""
+import json
+import timeit
+import tracemalloc
+
+from requests_client.utils import maybe_attr_dict, lazy_attr_dict
+
+
+PAYLOAD = json.dumps({'data': {'items': [
+    {'id': i, 'name': 'item {}'.format(i), 'tags': ['a', 'b'],
+     'owner': {'id': i, 'profile': {'name': 'owner', 'links': [{'url': 'x'}]}}}
+    for i in range(20000)
+]}})
+
+
+def access_first(data):
+    return data.data['items'][0].owner.profile.name
+
+
+def access_all(data):
+    return sum(item.owner.id for item in data.data['items'])
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(number=5):
+    for name, wrap in (('maybe_attr_dict', maybe_attr_dict), ('lazy_attr_dict', lazy_attr_dict)):
+        for access in (access_first, access_all):
+            def run():
+                return access(wrap(json.loads(PAYLOAD)))
+            seconds = timeit.timeit(run, number=number) / number
+            print('{:16} {:13} {:8.2f} ms {:8.2f} MB peak'.format(
+                name, access.__name__, seconds * 1000, peak_memory(run) / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main()
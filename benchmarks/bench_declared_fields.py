@@ -0,0 +1,99 @@
+"""
+Import time of generated entities corpus and ResponseSchema with Meta.model creation,
+with cached get_declared_fields and previous dir() scan.
+Run from repository root: python -m benchmarks.bench_declared_fields
+"""
+import gc
+import time
+from contextlib import contextmanager
+
+from marshmallow import fields
+from marshmallow.base import FieldABC
+from marshmallow.schema import _get_fields, _get_fields_by_mro
+
+from requests_client import models, schemas
+from requests_client.models import SchemedEntity
+from requests_client.schemas import ResponseSchema
+
+
+def get_declared_fields_old(cls, base=FieldABC):
+    def iterator(obj):
+        for attr_name in dir(obj):
+            try:
+                attr = getattr(obj, attr_name)
+            except Exception:
+                continue
+            if isinstance(attr, FieldABC):
+                yield attr_name, attr
+    return _get_fields(dict(iterator(cls)), base) + _get_fields_by_mro(cls, base)
+
+
+@contextmanager
+def patched(func):
+    original = schemas.get_declared_fields
+    models.get_declared_fields = schemas.get_declared_fields = func
+    try:
+        yield
+    finally:
+        models.get_declared_fields = schemas.get_declared_fields = original
+
+
+def create_corpus_attrs(count=300, fields_count=20):
+    attrs_list = []
+    for i in range(count):
+        attrs = {'field_{}'.format(j): fields.Str() for j in range(fields_count)}
+        attrs.update(('property_{}'.format(j), property(lambda self: None))
+                     for j in range(fields_count))
+        attrs_list.append(attrs)
+    return attrs_list
+
+
+def create_corpus(attrs_list):
+    base = type('Base', (SchemedEntity,), {'id': fields.Int(), 'name': fields.Str()})
+    return [type('Entity{}'.format(i), (base,), attrs) for i, attrs in enumerate(attrs_list)]
+
+
+def get_fields(entities, repeat=5):
+    for _ in range(repeat):
+        for entity in entities:
+            schemas.get_declared_fields(entity)
+
+
+def create_schemas(entities, repeat=5):
+    for _ in range(repeat):
+        for entity in entities:
+            type('Schema', (ResponseSchema,), {'Meta': type('Meta', (), {'model': entity})})()
+
+
+def timed(func, *args):
+    # Without gc, as generation collections during class creation add noise
+    gc.collect()
+    gc.disable()
+    try:
+        started_at = time.perf_counter()
+        rv = func(*args)
+        return rv, (time.perf_counter() - started_at) * 1000
+    finally:
+        gc.enable()
+
+
+def main(rounds=10):
+    # Variants are alternated and best round is reported, so machine load drift
+    # affects both of them
+    variants = (('dir scan', get_declared_fields_old), ('cached', schemas.get_declared_fields))
+    results = {name: [float('inf')] * 3 for name, _ in variants}
+    for _ in range(rounds):
+        for name, func in variants:
+            attrs_list = create_corpus_attrs()
+            with patched(func):
+                entities, corpus_ms = timed(create_corpus, attrs_list)
+                _, fields_ms = timed(get_fields, entities)
+                _, schemas_ms = timed(create_schemas, entities)
+            results[name] = list(map(min, results[name], (corpus_ms, fields_ms, schemas_ms)))
+    for name, _ in variants:
+        print('{:10} corpus import {:7.1f} ms, get_declared_fields x5 {:7.1f} ms, '
+              'model schemas x5 {:7.1f} ms'.format(name, *results[name]))
+
+
+if __name__ == '__main__':
+    main()
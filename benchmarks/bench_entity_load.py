@@ -0,0 +1,48 @@
+"""
+Bulk SchemedEntity creation from loaded data: cls(**item) per item and create_many,
+for dict-backed and slotted entities.
+Run from repository root: python -m benchmarks.bench_entity_load
+"""
+import time
+
+from marshmallow import fields
+
+from requests_client.models import SchemedEntity
+
+
+FIELDS_COUNT = 10
+
+
+def create_entity(slotted):
+    attrs = {'field_{}'.format(i): fields.Int(default=0) for i in range(FIELDS_COUNT)}
+    if slotted:
+        attrs['__slots__'] = True
+    return type('Entity', (SchemedEntity,), attrs)
+
+
+def create_items(count):
+    # Every second field is set, others are defaults
+    return [{'field_{}'.format(i): i for i in range(0, FIELDS_COUNT, 2)} for _ in range(count)]
+
+
+def timed(func, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started_at)
+    return min(timings) * 1000
+
+
+def main(count=10000):
+    items = create_items(count)
+    for name, slotted in (('dict', False), ('slotted', True)):
+        entity = create_entity(slotted)
+        init_ms = timed(lambda: tuple(entity(**item) for item in items))
+        bulk_ms = timed(entity.create_many, items)
+        print('{:8} {} items: cls(**item) {:6.1f} ms, create_many {:6.1f} ms ({:.1f}x)'
+              .format(name, count, init_ms, bulk_ms, init_ms / bulk_ms))
+
+
+if __name__ == '__main__':
+    main()
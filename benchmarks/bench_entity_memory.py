@@ -0,0 +1,45 @@
+"""
+Memory and creation time of dict-backed and slotted SchemedEntity instances.
+Run from repository root: python -m benchmarks.bench_entity_memory
+"""
+import gc
+import time
+import tracemalloc
+
+from marshmallow import fields
+
+from requests_client.models import SchemedEntity
+
+
+FIELDS_COUNT = 10
+
+
+def create_entity(slotted):
+    attrs = {'field_{}'.format(i): fields.Int() for i in range(FIELDS_COUNT)}
+    if slotted:
+        attrs['__slots__'] = True
+    return type('Entity', (SchemedEntity,), attrs)
+
+
+def measure(entity, count):
+    data = {'field_{}'.format(i): i for i in range(FIELDS_COUNT)}
+    gc.collect()
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    instances = [entity(**data) for _ in range(count)]
+    elapsed = time.perf_counter() - started_at
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return size, elapsed
+
+
+def main(count=100000):
+    for name, slotted in (('dict', False), ('slotted', True)):
+        size, elapsed = measure(create_entity(slotted), count)
+        print('{:8} {} instances: {:7.1f} MiB, {:4} bytes per instance, {:6.1f} ms'.format(
+            name, count, size / 2 ** 20, size // count, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
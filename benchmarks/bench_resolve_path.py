@@ -0,0 +1,60 @@
+"""
+Compares compiled resolve_obj_path with previous recursive implementation.
+Run from repository root: python -m benchmarks.bench_resolve_path
+"""
+import timeit
+
+from requests_client.utils import resolve_obj_path, lazy_attr_dict, NO_DEFAULT
+
+
+def resolve_obj_key_old(obj, key, default=NO_DEFAULT):
+    if key.isdigit():
+        try:
+            return obj[int(key)]
+        except Exception:
+            try:
+                return obj[key]
+            except Exception:
+                if default is not NO_DEFAULT:
+                    return default
+                raise ValueError('Could not resolve "{}" on {} object'.format(key, obj))
+    else:
+        try:
+            return obj[key]
+        except Exception:
+            try:
+                return getattr(obj, key)
+            except Exception:
+                if default is not NO_DEFAULT:
+                    return default
+                raise ValueError('Could not resolve "{}" on {} object'.format(key, obj))
+
+
+def resolve_obj_path_old(obj, path, default=NO_DEFAULT):
+    dot_pos = path.find('.')
+    if dot_pos == -1:
+        return resolve_obj_key_old(obj, path, default)
+    else:
+        key, path = path[:dot_pos], path[(dot_pos + 1):]
+        return resolve_obj_path_old(resolve_obj_key_old(obj, key, default), path, default)
+
+
+DATA = {'response': {'data': {'items': [{'id': 1, 'owner': {'name': 'x'}}]}}, 'error': None}
+CASES = [
+    ('dict', DATA, 'response.data.items.0.owner.name', NO_DEFAULT),
+    ('lazy', lazy_attr_dict(DATA), 'response.data.items.0.owner.name', NO_DEFAULT),
+    ('missing', DATA, 'error_code.value', None),
+]
+
+
+def main(number=200000):
+    for name, data, path, default in CASES:
+        for impl in (resolve_obj_path_old, resolve_obj_path):
+            assert impl(data, path, default) == resolve_obj_path_old(data, path, default)
+            seconds = timeit.timeit(lambda: impl(data, path, default), number=number)
+            print('{:8} {:22} {:8.3f} us'.format(name, impl.__name__,
+                                                 seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+TimestampField conversion throughput: utils.from_timestamp/to_timestamp per value
+(previous implementation), field deserialize, deserialize_many and serialize.
+Run from repository root: python -m benchmarks.bench_timestamp
+"""
+import random
+import time
+
+from requests_client.fields import TimestampField
+from requests_client.utils import from_timestamp, to_timestamp
+
+
+def timed(func, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def report(name, count, seconds):
+    print('{:32} {:8.0f}k values/s'.format(name, count / seconds / 1000))
+
+
+def main(count=100000):
+    rnd = random.Random(0)
+    for timezone, ms in (('UTC', False), ('Europe/Moscow', True)):
+        field = TimestampField(timezone, ms=ms, zero_as_none=True)
+        int_field = TimestampField(timezone, ms=ms, as_int=True)
+        scale = 1000 if ms else 1
+        values = [rnd.randint(10 ** 9, 2 * 10 ** 9) * scale for _ in range(count)]
+        dts = field.deserialize_many(values)
+        print('timezone={} ms={}'.format(timezone, ms))
+
+        report('from_timestamp', count, timed(
+            lambda: [from_timestamp(v, field.timezone, ms) for v in values]))
+        report('deserialize', count, timed(lambda: [field.deserialize(v) for v in values]))
+        report('deserialize_many', count, timed(field.deserialize_many, values))
+        report('to_timestamp (as_int)', count, timed(
+            lambda: [int(to_timestamp(dt, field.timezone, ms)) for dt in dts]))
+        report('serialize (as_int)', count, timed(
+            lambda: [int_field._serialize(dt, None, None) for dt in dts]))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
 from .client import (  # noqa
     BaseClient, auth_required, response_schema, ratelimit_error, temporary_error,
-    reraise
+    reraise, ratelimit
 )
@@ -0,0 +1,204 @@
+import socket
+from ipaddress import ip_address
+from threading import Lock
+from time import monotonic
+from urllib.parse import urlparse
+
+from requests import Request
+from requests.adapters import (HTTPAdapter as _HTTPAdapter, DEFAULT_POOLSIZE,
+                               DEFAULT_POOLBLOCK)
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
+from urllib3.util.proxy import connection_requires_http_tunnel
+
+
+def get_prefix(url):
+    url = urlparse(url)
+    return '{}://{}/'.format(url.scheme, url.netloc)
+
+
+def get_pool(adapter, url, proxies=None, verify=True, cert=None):
+    if hasattr(adapter, 'get_connection_with_tls_context'):
+        # requests>=2.32.2
+        request = Request('GET', url).prepare()
+        return adapter.get_connection_with_tls_context(request, verify, proxies, cert)
+    return adapter.get_connection(url, proxies)
+
+
+def warmup(adapter, url, connections=1, proxies=None, verify=True, timeout=None, cert=None):
+    """
+    Opens up to `connections` keep-alive connections to url host in requests adapter pool
+    (limited by pool_maxsize), returns count of opened connections.
+    """
+    pool = get_pool(adapter, url, proxies, verify, cert)
+    tunnel = connection_requires_http_tunnel(pool.proxy, pool.proxy_config, pool.scheme)
+    conns, opened = [], 0
+    try:
+        for _ in range(min(connections, adapter._pool_maxsize)):
+            conn = pool._get_conn()
+            conns.append(conn)
+            if conn.sock is not None:
+                continue
+            if timeout is not None:
+                conn.timeout = timeout
+            if pool.proxy is not None and tunnel:
+                pool._prepare_proxy(conn)
+            else:
+                conn.connect()
+            opened += 1
+    finally:
+        for conn in conns:
+            pool._put_conn(conn)
+    return opened
+
+
+class DNSCache:
+    """
+    Caches resolved host address for `ttl` seconds, so new connections
+    don't wait for DNS. On resolve error host is returned as is,
+    so error is raised on connect as usual.
+    """
+    def __init__(self, ttl=300, clock=monotonic):
+        self.ttl, self.clock = ttl, clock
+        self.hits, self.misses = 0, 0
+        self._entries = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return '<{}(ttl={}, hits={}, misses={})>'.format(
+            self.__class__.__name__, self.ttl, self.hits, self.misses)
+
+    def resolve(self, host, port=None):
+        try:
+            ip_address(host)
+            return host
+        except ValueError:
+            pass
+
+        with self._lock:
+            address, expires_at = self._entries.get(host, (None, None))
+            if address and expires_at > self.clock():
+                self.hits += 1
+                return address
+            self.misses += 1
+
+        try:
+            address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        except (OSError, IndexError):
+            return host
+        with self._lock:
+            self._entries[host] = (address, self.clock() + self.ttl)
+        return address
+
+    def clear(self, host=None):
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(host, None)
+
+
+class _DNSCacheMixin:
+    dns_cache = None
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        if self.dns_cache is not None:
+            # host is still used for Host header and TLS SNI
+            conn._dns_host = self.dns_cache.resolve(conn._dns_host, conn.port)
+        return conn
+
+
+class _HTTPConnectionPool(_DNSCacheMixin, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSConnectionPool(_DNSCacheMixin, HTTPSConnectionPool):
+    pass
+
+
+class DNSCachePoolManager(PoolManager):
+    def __init__(self, *args, dns_cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dns_cache = dns_cache
+        self.pool_classes_by_scheme = {'http': _HTTPConnectionPool,
+                                       'https': _HTTPSConnectionPool}
+
+    def _new_pool(self, *args, **kwargs):
+        pool = super()._new_pool(*args, **kwargs)
+        pool.dns_cache = self.dns_cache
+        return pool
+
+
+class HTTPAdapter(_HTTPAdapter):
+    """
+    Adapter with optional DNSCache (not used for proxy connections).
+    """
+    def __init__(self, *args, dns_cache=None, **kwargs):
+        # Set before super, as it initializes pool manager
+        self.dns_cache = dns_cache
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        # dns_cache is not pickled with adapter
+        if getattr(self, 'dns_cache', None) is not None:
+            self.poolmanager = DNSCachePoolManager(num_pools=connections, maxsize=maxsize,
+                                                   block=block, dns_cache=self.dns_cache,
+                                                   **pool_kwargs)
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """
+    Adapter mounted to many sessions, so closing one session
+    should not close connections used by others.
+    """
+    def close(self):
+        pass
+
+    def close_shared(self):
+        super().close()
+
+
+class AdapterRegistry:
+    """
+    Shares urllib3 connection pools between clients sessions, keyed by
+    (base_url scheme and host, proxy_url, ssl_verify). Cookies and headers are
+    still kept per session, only TCP/TLS connections are reused.
+    """
+    adapter_cls = SharedHTTPAdapter
+
+    def __init__(self, pool_connections=DEFAULT_POOLSIZE, pool_maxsize=DEFAULT_POOLSIZE,
+                 pool_block=DEFAULT_POOLBLOCK, max_retries=0, dns_cache=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_retries = max_retries
+        self.dns_cache = dns_cache
+        self._adapters = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return '<{}(pool_maxsize={}, adapters={})>'.format(
+            self.__class__.__name__, self.pool_maxsize, len(self._adapters))
+
+    def get_adapter(self, url, proxy_url=None, ssl_verify=True):
+        key = (get_prefix(url), proxy_url, ssl_verify)
+        with self._lock:
+            if key not in self._adapters:
+                self._adapters[key] = self.adapter_cls(
+                    pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block, max_retries=self.max_retries,
+                    dns_cache=self.dns_cache)
+            return self._adapters[key]
+
+    def mount(self, session, url, proxy_url=None, ssl_verify=True):
+        adapter = self.get_adapter(url, proxy_url, ssl_verify)
+        session.mount(get_prefix(url), adapter)
+        return adapter
+
+    def close(self):
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close_shared()
+            self._adapters.clear()
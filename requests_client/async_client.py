@@ -0,0 +1,372 @@
+import asyncio
+import os
+import ssl
+from datetime import timedelta
+from functools import wraps, partial
+from time import monotonic
+
+from requests import Request, Response
+from requests.cookies import RequestsCookieJar, morsel_to_cookie
+from requests.exceptions import ConnectionError, Timeout, ProxyError, SSLError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+
+try:
+    import aiohttp
+    import yarl
+except ImportError:
+    aiohttp = None
+
+from .utils import copy_response
+from .schemas import maybe_create_response_schema
+from .client import (BaseClient, AuthRequired, Retry, TemporaryError,
+                     _create_error_processor, _append_error_processor,
+                     _resolve_ratelimiter, _append_ratelimiter)
+
+
+class AsyncTransport:
+    """
+    Sends prepared requests.PreparedRequest and returns requests.Response,
+    so response processing is the same as for sync client.
+    """
+    async def send(self, session, request, allow_redirects=False, proxies=None,
+                   verify=True, timeout=None, stream=False, cert=None):
+        raise NotImplementedError()
+
+    async def close(self):
+        pass
+
+
+class ThreadTransport(AsyncTransport):
+    """
+    Sends request with client requests session in executor thread.
+    Useful if aiohttp is not installed, but blocks thread on each request.
+    """
+    def __init__(self, executor=None):
+        self.executor = executor
+
+    async def send(self, session, request, allow_redirects=False, proxies=None,
+                   verify=True, timeout=None, stream=False, cert=None):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(session.send, request, allow_redirects=allow_redirects,
+                                   proxies=proxies or {}, verify=verify, timeout=timeout,
+                                   stream=stream, cert=cert))
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    Sends request with aiohttp. Note that response content is always read,
+    "stream" is not supported.
+    """
+    def __init__(self, **session_kwargs):
+        assert aiohttp, '"aiohttp" module not found'
+        self.session_kwargs = session_kwargs
+        self._session = None
+
+    @property
+    def session(self):
+        # Lazy creation, because aiohttp session should be created inside event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                cookie_jar=aiohttp.DummyCookieJar(), **self.session_kwargs)
+        return self._session
+
+    def _get_timeout(self, timeout):
+        if isinstance(timeout, (tuple, list)):
+            return aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        return aiohttp.ClientTimeout(total=timeout)
+
+    def _get_ssl(self, verify, cert=None):
+        if not cert:
+            if verify is False:
+                return False
+            elif not isinstance(verify, str):
+                return None
+        # CA bundle file or directory (as REQUESTS_CA_BUNDLE), client certificate
+        if isinstance(verify, str):
+            context = ssl.create_default_context(
+                **{'capath' if os.path.isdir(verify) else 'cafile': verify})
+        else:
+            context = ssl.create_default_context()
+            if verify is False:
+                context.check_hostname, context.verify_mode = False, ssl.CERT_NONE
+        if cert:
+            context.load_cert_chain(*((cert,) if isinstance(cert, str) else cert))
+        return context
+
+    async def send(self, session, request, allow_redirects=False, proxies=None,
+                   verify=True, timeout=None, stream=False, cert=None):
+        url = yarl.URL(request.url, encoded=True)
+        start_time = monotonic()
+        try:
+            async with self.session.request(
+                request.method, url, data=request.body, headers=dict(request.headers),
+                allow_redirects=allow_redirects, proxy=select_proxy(request.url, proxies),
+                ssl=self._get_ssl(verify, cert), timeout=self._get_timeout(timeout),
+            ) as resp:
+                content = await resp.read()
+        except asyncio.TimeoutError as exc:
+            raise Timeout(exc, request=request)
+        except aiohttp.ClientProxyConnectionError as exc:
+            raise ProxyError(exc, request=request)
+        except aiohttp.ClientSSLError as exc:
+            raise SSLError(exc, request=request)
+        except aiohttp.ClientConnectionError as exc:
+            raise ConnectionError(exc, request=request)
+        return self.build_response(request, resp, content, monotonic() - start_time)
+
+    def build_response(self, request, resp, content, elapsed_seconds):
+        response = Response()
+        response.status_code = resp.status
+        response.reason = resp.reason
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = str(resp.url)
+        response.request = request
+        response.elapsed = timedelta(seconds=elapsed_seconds)
+        response._content = content
+        response.cookies = RequestsCookieJar()
+        for morsel in resp.cookies.values():
+            if not morsel['domain']:
+                morsel['domain'] = resp.url.host
+            response.cookies.set_cookie(morsel_to_cookie(morsel))
+        return response
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class AsyncBaseClient(BaseClient):
+    """
+    Abstract class for asyncio requests client.
+    Request preparation (headers, cookies, auth) is made with requests session,
+    and prepared request is sent with transport (aiohttp by default).
+    Note that single_flight should be singleflight.AsyncSingleFlight instance.
+    """
+
+    transport_cls = aiohttp and AiohttpTransport or ThreadTransport
+    # Executor for blocking ratelimiters and response cache (RedisRateLimiter, StorageCache),
+    # so they don't block event loop. None is event loop default executor
+    executor = None
+
+    def __init__(self, *args, transport=None, **kwargs):
+        self.transport = transport or self.transport_cls()
+        super().__init__(*args, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.transport.close()
+
+    async def authenticate(self):
+        raise NotImplementedError()
+
+    async def auth_required_processor(self, exc):
+        await self.authenticate()
+        return self.is_authenticated
+
+    async def sleep(self, seconds, log_reason=None):
+        if seconds < 0:
+            raise ValueError('Can\'t sleep in backward time: {}'.format(seconds))
+        elif not seconds:
+            return
+        if self.debug_level >= 4:
+            self.logger.debug('Sleeping %s seconds. Reason: %s', seconds, log_reason)
+        await asyncio.sleep(seconds)
+
+    async def request(self, *args, **kwargs):
+        """
+        Wrapper method around `request` for exception processing, raised by ancestors.
+        """
+        retry_state = self._init_retry_state()
+
+        while True:
+            try:
+                try:
+                    return await self._request(*args, **kwargs)
+                except Exception as exc:
+                    self.error_processor(exc)
+                    raise
+            except (Retry, TemporaryError) as exc:
+                await self.sleep(*self._process_retry(exc, retry_state))
+
+    async def _request(self, *args, **kwargs):
+        """
+        Implement this coroutine in ancestors, and await _send_request from it.
+        raise TemporaryError and RatelimitError for proper response wrapping.
+        """
+        raise NotImplementedError()
+
+    async def _send_request(self, method, url, params=None, data=None, headers=None,
+                            json=None, http_status=2, parse_json=False, error_processors=[],
+                            allow_redirects=None, cookies=None, stream=False,
+                            ratelimiters=[], cache=True):
+        """
+        Same as BaseClient._send_request, but request is sent with transport.
+        """
+        url, kwargs = self._prepare_request(method, url, params, data, headers, json,
+                                            allow_redirects, cookies, stream)
+        cache_key, cache_entry = await self._run_blocking(
+            self._is_cache_blocking(), self._get_cache_entry, method, url, kwargs, cache)
+        if cache_entry is not None and cache_entry.is_fresh():
+            return self._process_response(cache_entry.build_response(), http_status,
+                                          parse_json, error_processors, from_cache=True)
+
+        flight_key = self._get_flight_key(method, url, kwargs, http_status, parse_json,
+                                          error_processors)
+        if flight_key is not None:
+            return await self.single_flight.do(flight_key, lambda: self._send_prepared_request(
+                method, url, kwargs, http_status, parse_json, error_processors, ratelimiters,
+                cache_key, cache_entry,
+            ), copy=copy_response)
+        return await self._send_prepared_request(method, url, kwargs, http_status, parse_json,
+                                                 error_processors, ratelimiters,
+                                                 cache_key, cache_entry)
+
+    async def _send_prepared_request(self, method, url, kwargs, http_status, parse_json,
+                                     error_processors, ratelimiters, cache_key, cache_entry):
+        circuit_key = self._check_circuit(url)
+        wait_seconds = await self._run_blocking(
+            any(getattr(r, 'blocking', False) for r in [self.ratelimiter] + list(ratelimiters)),
+            self._reserve_call_time, ratelimiters)
+        await self.sleep(wait_seconds, log_reason='request wait')
+        try:
+            try:
+                request = self.session.prepare_request(Request(
+                    method, url, params=kwargs.pop('params'), data=kwargs.pop('data'),
+                    json=kwargs.pop('json'), headers=kwargs.pop('headers'),
+                    cookies=kwargs.pop('cookies'),
+                ))
+                # Same as session.request: session and environment proxies, verify and cert
+                kwargs.update(self.session.merge_environment_settings(
+                    request.url, kwargs.pop('proxies') or {}, kwargs['stream'],
+                    kwargs.pop('verify'), None))
+                response = await self.transport.send(self.session, request, **kwargs)
+                self.session.cookies.update(response.cookies)
+                response = await self._run_blocking(
+                    cache_key is not None and self._is_cache_blocking(),
+                    self._process_cache, cache_key, cache_entry, response)
+            except Exception as exc:
+                self.error_processor(exc, error_processors)
+                raise
+            finally:
+                self._set_response_time()
+
+            response = self._process_response(response, http_status, parse_json,
+                                              error_processors, kwargs['stream'])
+        except Exception as exc:
+            self._record_circuit(circuit_key, exc)
+            raise
+        self._record_circuit(circuit_key)
+        return response
+
+    async def _run_blocking(self, blocking, func, *args):
+        if not blocking:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(func, *args))
+
+    def _is_cache_blocking(self):
+        return bool(self.response_cache) and getattr(self.response_cache.cache, 'blocking', False)
+
+    async def get(self, *args, **kwargs):
+        return await self.request('GET', *args, **kwargs)
+
+    async def post(self, *args, **kwargs):
+        return await self.request('POST', *args, **kwargs)
+
+    async def map(self, calls, concurrency=None, ordered=True):
+        """
+        Same as BaseClient.map, but calls are coroutine functions, awaited on event loop
+        with at most `concurrency` calls in flight.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.map_concurrency)
+
+        async def call(index, call):
+            func, args, kwargs = self._resolve_call(call)
+            async with semaphore:
+                try:
+                    return index, await func(*args, **kwargs)
+                except Exception as exc:
+                    return index, exc
+
+        tasks = [asyncio.ensure_future(call(i, call_)) for i, call_ in enumerate(calls)]
+        try:
+            if ordered:
+                for task in tasks:
+                    yield (await task)[1]
+            else:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def gather(self, calls, concurrency=None):
+        return [result async for result in self.map(calls, concurrency)]
+
+
+def auth_required(func):
+    @wraps(func)
+    async def wrapper(client, *args, **kwargs):
+        if client.auto_authenticate and not client.is_authenticated:
+            await client.authenticate()
+            return await func(client, *args, **kwargs)
+        else:
+            try:
+                return await func(client, *args, **kwargs)
+            except AuthRequired as exc:
+                if client.auto_authenticate and await client.auth_required_processor(exc):
+                    return await func(client, *args, **kwargs)
+                client.is_authenticated = False
+                raise
+    return wrapper
+
+
+def response_schema(schema, inherit=None, data_attr='data', data_path=None, **schema_kwargs):
+    # Creating schema on import, it's cached for requests
+    maybe_create_response_schema(schema, inherit, cache=True)
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(client, *args, **kwargs):
+            resp = await func(client, *args, **kwargs)
+            if isinstance(resp, Response):
+                client.apply_response_schema(resp, schema, inherit,
+                                             data_attr, data_path, **schema_kwargs)
+            return resp
+        return wrapper
+    return decorator
+
+
+def _create_temporary_error_decorator(temporary_error_type):
+    def temporary_error_decorator(exc_cls, exc_attrs={}, callback=None, wait_seconds=None):
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(client, *args, **kwargs):
+                _append_error_processor(kwargs, _create_error_processor(
+                    getattr(client, temporary_error_type), exc_cls, exc_attrs,
+                    callback, wait_seconds))
+                return await func(client, *args, **kwargs)
+            return wrapper
+        return decorator
+    return temporary_error_decorator
+
+
+ratelimit_error = _create_temporary_error_decorator('RatelimitError')
+temporary_error = _create_temporary_error_decorator('TemporaryError')
+
+
+def ratelimit(ratelimiter):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(client, *args, **kwargs):
+            _append_ratelimiter(kwargs, _resolve_ratelimiter(client, ratelimiter))
+            return await func(client, *args, **kwargs)
+        return wrapper
+    return decorator
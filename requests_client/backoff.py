@@ -0,0 +1,103 @@
+import random
+from collections import deque
+from threading import Lock
+from time import monotonic
+
+
+class Backoff:
+    """
+    Returns seconds to sleep before retry number `attempt` (starting from 1),
+    previous_seconds is previous sleep for same error type.
+    This one is constant backoff.
+    """
+    def __init__(self, base=1, cap=None):
+        self.base, self.cap = base, cap
+
+    def __repr__(self):
+        return '<{}(base={}, cap={})>'.format(self.__class__.__name__, self.base, self.cap)
+
+    def _cap(self, seconds):
+        return seconds if self.cap is None else min(self.cap, seconds)
+
+    def __call__(self, attempt, previous_seconds=None):
+        return self._cap(self.base)
+
+
+class ExponentialBackoff(Backoff):
+    """
+    base * factor ** (attempt - 1), capped.
+    jitter "full" is random in [0, backoff], "equal" is random in [backoff / 2, backoff],
+    so retries of different workers are not in lockstep.
+    """
+    def __init__(self, base=1, cap=60, factor=2, jitter='full'):
+        if jitter not in ('full', 'equal', None):
+            raise ValueError('Unknown jitter: {}'.format(jitter))
+        self.factor, self.jitter = factor, jitter
+        super().__init__(base, cap)
+
+    def __call__(self, attempt, previous_seconds=None):
+        seconds = self._cap(self.base * self.factor ** (attempt - 1))
+        if self.jitter == 'full':
+            return random.uniform(0, seconds)
+        elif self.jitter == 'equal':
+            return random.uniform(seconds / 2, seconds)
+        return seconds
+
+
+class DecorrelatedJitterBackoff(Backoff):
+    """
+    Random in [base, previous * 3], capped.
+    https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+    """
+    def __init__(self, base=1, cap=60):
+        super().__init__(base, cap)
+
+    def __call__(self, attempt, previous_seconds=None):
+        return self._cap(random.uniform(self.base, (previous_seconds or self.base) * 3))
+
+
+class RetryBudget:
+    """
+    Allows retries to be at most `ratio` of requests over sliding `window_seconds`,
+    plus `min_retries_per_second` for low traffic. Instance may be shared between clients,
+    so retry storms are shed instead of amplified.
+    """
+    def __init__(self, ratio=0.1, window_seconds=10, min_retries_per_second=1,
+                 clock=monotonic):
+        self.ratio, self.window_seconds, self.clock = ratio, window_seconds, clock
+        self.min_retries = min_retries_per_second * window_seconds
+        # [second, requests, retries] buckets
+        self._buckets = deque()
+        self._requests, self._retries = 0, 0
+        self._lock = Lock()
+
+    def __repr__(self):
+        return '<{}(ratio={}, requests={}, retries={})>'.format(
+            self.__class__.__name__, self.ratio, self._requests, self._retries)
+
+    def _get_bucket(self):
+        second = int(self.clock())
+        while self._buckets and self._buckets[0][0] <= second - self.window_seconds:
+            _, requests, retries = self._buckets.popleft()
+            self._requests -= requests
+            self._retries -= retries
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self):
+        with self._lock:
+            self._get_bucket()[1] += 1
+            self._requests += 1
+
+    def try_retry(self):
+        """
+        Returns True and records retry if budget allows it.
+        """
+        with self._lock:
+            bucket = self._get_bucket()
+            if self._retries + 1 > self.min_retries + self._requests * self.ratio:
+                return False
+            bucket[2] += 1
+            self._retries += 1
+            return True
@@ -0,0 +1,267 @@
+import hashlib
+import re
+from collections import OrderedDict
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import time
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.models import PreparedRequest
+
+
+CACHEABLE_METHODS = ('GET', 'HEAD')
+CACHEABLE_STATUSES = (200, 203, 300, 301, 308, 410)
+
+
+def get_request_key(method, url, params=None, prefix=''):
+    request = PreparedRequest()
+    request.prepare_url(url, params)
+    return hashlib.sha1('{} {} {}'.format(prefix, method, request.url)
+                        .encode('utf-8')).hexdigest()
+
+
+class CacheEntry:
+    """
+    Picklable response representation.
+    """
+    def __init__(self, response, expires_at, vary=None):
+        self.status_code = response.status_code
+        self.reason = response.reason
+        self.url = response.url
+        self.encoding = response.encoding
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.content = response.content
+        self.method = response.request.method
+        self.expires_at = expires_at
+        self.vary = vary or {}
+
+    def __repr__(self):
+        return '<{}({} {} {})>'.format(self.__class__.__name__, self.method,
+                                       self.status_code, self.url)
+
+    @property
+    def size(self):
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def is_fresh(self, now=None):
+        return self.expires_at > (now or time())
+
+    def get_validators(self):
+        headers = {}
+        if 'ETag' in self.headers:
+            headers['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def build_response(self, request=None):
+        response = Response()
+        response.status_code = self.status_code
+        response.reason = self.reason
+        response.url = self.url
+        response.encoding = self.encoding
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.elapsed = timedelta(0)
+        if request is None:
+            request = PreparedRequest()
+            request.prepare(method=self.method, url=self.url)
+        response.request = request
+        response.from_cache = True
+        return response
+
+
+class BaseCache:
+    # True if cache makes network or disk calls, so async client runs them in executor
+    blocking = False
+
+    def get(self, key):
+        raise NotImplementedError()
+
+    def set(self, key, entry):
+        raise NotImplementedError()
+
+
+class MemoryCache(BaseCache):
+    """
+    LRU cache, bounded by total entries size in bytes and entries count.
+    """
+    def __init__(self, max_size=64 * 1024 * 1024, max_entries=None):
+        self.max_size, self.max_entries = max_size, max_entries
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        if entry.size > self.max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key).size
+            self._entries[key] = entry
+            self.size += entry.size
+            while (self.size > self.max_size
+                   or self.max_entries is not None and len(self._entries) > self.max_entries):
+                self.size -= self._entries.popitem(last=False)[1].size
+
+
+class StorageCache(BaseCache):
+    """
+    Cache in BaseStorage (FileStorage, RedisStorage), so it's shared between workers.
+    Entries are kept stale_ttl seconds after expiration (to be revalidated),
+    then deleted on get, or expired by storage if it supports ttl.
+    """
+    blocking = True
+
+    def __init__(self, storage, stale_ttl=24 * 60 * 60):
+        self.storage = storage
+        self.stale_ttl = stale_ttl
+
+    def get(self, key):
+        entry = self.storage.get(key)
+        if entry is not None and entry.expires_at + self.stale_ttl <= time():
+            self.storage.delete(key)
+            return None
+        return entry
+
+    def set(self, key, entry):
+        ttl = entry.expires_at + self.stale_ttl - time()
+        if ttl <= 0:
+            self.storage.delete(key)
+        elif self.storage.supports_ttl:
+            self.storage.set(key, entry, ttl=ttl)
+        else:
+            self.storage.set(key, entry)
+
+
+class TieredCache(BaseCache):
+    """
+    Looks up caches in order (for example memory, then storage),
+    populating previous caches on hit.
+    """
+    def __init__(self, *caches):
+        self.caches = caches
+
+    @property
+    def blocking(self):
+        return any(cache.blocking for cache in self.caches)
+
+    def get(self, key):
+        for i, cache in enumerate(self.caches):
+            entry = cache.get(key)
+            if entry is not None:
+                for cache_ in self.caches[:i]:
+                    cache_.set(key, entry)
+                return entry
+        return None
+
+    def set(self, key, entry):
+        for cache in self.caches:
+            cache.set(key, entry)
+
+
+def _parse_cache_control(value):
+    return {key.lower(): quoted or token for key, quoted, token
+            in re.findall(r'([\w-]+)(?:=(?:"([^"]*)"|([^,\s]*)))?', value or '')}
+
+
+def _parse_http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class ResponseCache:
+    """
+    HTTP cache for client responses, follows Cache-Control/Expires response headers,
+    and revalidates stale responses with If-None-Match/If-Modified-Since.
+    Responses without freshness info, but with ETag or Last-Modified are stored
+    to be revalidated on each request. default_ttl is used for responses without
+    any cache headers, if set.
+    """
+    def __init__(self, cache=None, default_ttl=None):
+        self.cache = cache if cache is not None else MemoryCache()
+        self.default_ttl = default_ttl
+        self.hits, self.misses, self.revalidated = 0, 0, 0
+
+    def __repr__(self):
+        return '<{}({!r}, hits={}, misses={}, revalidated={})>'.format(
+            self.__class__.__name__, self.cache, self.hits, self.misses, self.revalidated)
+
+    def get_key(self, method, url, params=None, prefix=''):
+        return get_request_key(method, url, params, prefix)
+
+    def get(self, key, headers={}):
+        entry = self.cache.get(key)
+        if entry is not None:
+            headers = CaseInsensitiveDict(headers)
+            if any(headers.get(k) != v for k, v in entry.vary.items()):
+                entry = None
+        if entry is not None and entry.is_fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def _get_expires_at(self, headers):
+        cache_control = _parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in cache_control:
+            return None
+        now = time()
+        if 'no-cache' in cache_control:
+            return now
+        if 'max-age' in cache_control:
+            try:
+                return now + int(cache_control['max-age']) - int(headers.get('Age', 0))
+            except ValueError:
+                return now
+        if 'Expires' in headers:
+            expires_at = _parse_http_date(headers['Expires'])
+            return expires_at if expires_at is not None else now
+        if self.default_ttl is not None:
+            return now + self.default_ttl
+        if 'ETag' in headers or 'Last-Modified' in headers:
+            return now
+        return None
+
+    def store(self, key, response, headers={}):
+        if (response.request.method not in CACHEABLE_METHODS
+           or response.status_code not in CACHEABLE_STATUSES):
+            return
+        vary = [h.strip() for h in response.headers.get('Vary', '').split(',') if h.strip()]
+        if '*' in vary:
+            return
+        expires_at = self._get_expires_at(response.headers)
+        if expires_at is not None:
+            headers = CaseInsensitiveDict(headers)
+            self.cache.set(key, CacheEntry(response, expires_at,
+                                           {h: headers.get(h) for h in vary}))
+
+    def revalidate(self, key, entry, response):
+        """
+        Updates entry from 304 Not Modified response and returns cached response.
+        """
+        self.revalidated += 1
+        entry.headers.update(
+            (k, v) for k, v in response.headers.items()
+            if k.lower() not in ('content-length', 'content-encoding', 'transfer-encoding')
+        )
+        expires_at = self._get_expires_at(entry.headers)
+        entry.expires_at = expires_at if expires_at is not None else time()
+        self.cache.set(key, entry)
+        rv = entry.build_response(response.request)
+        rv.elapsed = response.elapsed
+        return rv
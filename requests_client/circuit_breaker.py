@@ -0,0 +1,97 @@
+import logging
+from threading import Lock
+from time import time
+
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Opens circuit for key (host by default) after `failure_threshold` consecutive
+    failures within `window_seconds`. While open, requests are failed fast,
+    after `recovery_seconds` circuit is half-open and `half_open_probes` requests
+    are allowed: success closes circuit, failure opens it again.
+    If storage (BaseStorage) is passed, state is shared between workers using it.
+    Wall clock is used, as state may be shared between processes.
+    """
+    def __init__(self, failure_threshold=5, window_seconds=60, recovery_seconds=30,
+                 half_open_probes=1, storage=None, clock=time):
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.recovery_seconds = recovery_seconds
+        self.half_open_probes = half_open_probes
+        self.storage, self.clock = storage, clock
+        self._states = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return '<{}(failure_threshold={}, recovery_seconds={})>'.format(
+            self.__class__.__name__, self.failure_threshold, self.recovery_seconds)
+
+    def _get_state(self, key):
+        if self.storage:
+            state = self.storage.get(key)
+        else:
+            state = self._states.get(key)
+        return state or dict(state=CLOSED, failures=0, failed_at=None, opened_at=None,
+                             half_open_at=None, probes=0)
+
+    def _set_state(self, key, state):
+        if self.storage:
+            self.storage.set(key, state)
+        else:
+            self._states[key] = state
+
+    def get_state(self, key):
+        return self._get_state(key)['state']
+
+    def allow(self, key):
+        """
+        Returns 0 if request is allowed, or seconds until next probe otherwise.
+        """
+        with self._lock:
+            state = self._get_state(key)
+            if state['state'] == CLOSED:
+                return 0
+
+            now = self.clock()
+            if state['state'] == OPEN:
+                recovery_at = state['opened_at'] + self.recovery_seconds
+                if now < recovery_at:
+                    return recovery_at - now
+                state.update(state=HALF_OPEN, half_open_at=now, probes=0)
+            elif now >= state['half_open_at'] + self.recovery_seconds:
+                # Probes are reset if there was no result during recovery period
+                state.update(half_open_at=now, probes=0)
+            if state['probes'] >= self.half_open_probes:
+                return state['half_open_at'] + self.recovery_seconds - now
+            state['probes'] += 1
+            self._set_state(key, state)
+            return 0
+
+    def record_success(self, key):
+        with self._lock:
+            state = self._get_state(key)
+            if state['state'] != CLOSED or state['failures']:
+                if state['state'] != CLOSED:
+                    logger.info('Circuit closed: %s', key)
+                self._set_state(key, dict(state, state=CLOSED, failures=0, failed_at=None,
+                                          opened_at=None, half_open_at=None, probes=0))
+
+    def record_failure(self, key):
+        with self._lock:
+            state = self._get_state(key)
+            now = self.clock()
+            if state['failed_at'] is None or now - state['failed_at'] > self.window_seconds:
+                state['failures'] = 0
+            state['failures'] += 1
+            state['failed_at'] = now
+            if (state['state'] == HALF_OPEN
+               or state['state'] == CLOSED and state['failures'] >= self.failure_threshold):
+                logger.warning('Circuit opened after %s failures: %s', state['failures'], key)
+                state.update(state=OPEN, opened_at=now, probes=0)
+            self._set_state(key, state)
@@ -1,16 +1,32 @@
 import logging
 from functools import wraps
+from datetime import timedelta
+from threading import RLock, Thread
+from time import monotonic
 from urllib.parse import urlparse, urljoin
 from json import JSONDecodeError as _JSONDecodeError
 
 from requests import Session, Response
+from requests.exceptions import (ConnectionError as RequestsConnectionError, Timeout,
+                                 InvalidJSONError)
+from requests.structures import CaseInsensitiveDict
+from requests.utils import guess_json_utf
 from marshmallow import ValidationError
 import colorama
 
 from .config import CreateFromConfigMixin
 from .storage import FileStorage
-from .utils import EntityLoggerAdapter, resolve_obj_path, maybe_attr_dict, now, pprint, missing
-from .schemas import maybe_create_response_schema
+from .utils import (EntityLoggerAdapter, resolve_obj_path, lazy_attr_dict, now, pprint, missing,
+                    copy_response)
+from .schemas import maybe_create_response_schema, schema_context, SchemaContext
+from .concurrency import imap
+from .jsoncodec import default_codec, get_codec
+from .columnar import load_columns
+from .jsonstream import load_path, iter_path_items, JSONPathError
+from .adapters import HTTPAdapter, get_prefix, warmup as warmup_adapter
+from .cache import CACHEABLE_METHODS, get_request_key
+from .ratelimit import (TokenBucket, AdaptiveRateLimiter, reserve_all, parse_ratelimit_headers,
+                        get_retry_after)
 from . import exceptions
 from .exceptions import (Retry, ClientError, RatelimitError, TemporaryError, AuthRequired,
                          ResponseValidationError)
@@ -56,6 +72,23 @@ class BaseClientMeta(type):
         return client_cls
 
 
+class _RetryState:
+    # Retries made in one BaseClient.request call
+    def __init__(self):
+        self.counts = {}
+        self.previous_wait = {}
+        self.backoff_seconds = 0
+
+    def add_backoff(self, key, seconds):
+        self.previous_wait[key] = seconds
+        self.backoff_seconds += seconds
+        return seconds
+
+    def get_retries(self):
+        # Retries made, without the last exceeded one
+        return sum(self.counts.values()) - 1
+
+
 class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
     """
     Abstract class for requests client.
@@ -78,18 +111,46 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
     timeout = 30  # http://docs.python-requests.org/en/master/user/quickstart/#timeouts
     request_wait_seconds = 0  # minimum delay between old *sent* time between sending new request
     request_wait_since_response = False  # note - this also changes last_call_time behaviour
+    # BaseRateLimiter instance, if set on class it's shared between all class instances.
+    # Defaults to TokenBucket created from request_wait_seconds
+    ratelimiter = None
+    ratelimit_headers = True  # adapt pacing to Retry-After and RateLimit response headers
     request_warn_elapsed_seconds = 10  # warn if request took more than "x" seconds
     ratelimit_retries = 0  # retry of same request before exception. 0 is "no retry"
     ratelimit_wait_seconds = 0  # sleep before next retry
     temporary_error_retries = 1  # retry of same request before exception. 0 is "no retry"
     temporary_error_wait_seconds = 0  # sleep before next retry
+    # backoff.Backoff instances, used instead of constant *_wait_seconds if set
+    ratelimit_backoff = None
+    temporary_error_backoff = None
+    # backoff.RetryBudget instance, if set on class it's shared between all class instances
+    retry_budget = None
+    # circuit_breaker.CircuitBreaker instance, shared between instances if set on class
+    circuit_breaker = None
+    # cache.ResponseCache instance, shared between instances if set on class
+    response_cache = None
+    # singleflight.SingleFlight instance to coalesce identical concurrent GET requests
+    single_flight = None
+    # adapters.AdapterRegistry instance to share connection pools for base_url between sessions
+    adapter_registry = None
+    # adapters.DNSCache instance, shared between instances if set on class.
+    # Not used with adapter_registry, pass it to AdapterRegistry instead
+    dns_cache = None
+    warmup_connections = 1  # connections opened to base_url on init with warmup=True
 
     calls_count = 0  # total responses count after client was initialized
     calls_elapsed_seconds = 0  # total seconds waited for responses
     first_call_time = None  # datetime of first call (before sending request) (utc)
     last_call_time = None  # datetime of last call (before sending request) (utc)
+    warmup_count = 0  # total connections opened by warmup
+    warmup_elapsed_seconds = 0  # total seconds spent on warmup
     auto_authenticate = True
     is_authenticated = False
+    map_concurrency = 10  # default concurrent calls count for map and gather
+    stream_chunk_size = 64 * 1024  # for incremental json parsing of stream responses
+    # jsoncodec.JSONCodec instance for responses and json request bodies,
+    # orjson or ujson if installed, stdlib json otherwise
+    json_codec = default_codec
 
     def __init__(self, auth_ident=None, debug_level=None,
                  session={}, load_state=True, logger=None, timeout=True,
@@ -99,10 +160,14 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
                  temporary_error_retries=None, temporary_error_wait_seconds=None,
                  storage_cls=None, storage_uri=None,
                  state_storage=None, proxy_url=None, ssl_verify=True,
-                 auto_authenticate=None):
+                 auto_authenticate=None, ratelimiter=None,
+                 ratelimit_backoff=None, temporary_error_backoff=None, retry_budget=None,
+                 circuit_breaker=None, response_cache=None, single_flight=None,
+                 adapter_registry=None, dns_cache=None, warmup=False, json_codec=None):
 
         if auth_ident:
             self.auth_ident = auth_ident
+        self._lock = RLock()  # guards calls stats, as client may be shared between threads
         self.debug_level = int(debug_level) if debug_level is not None else self.debug_level
         self.session = isinstance(session, dict) and self.session_cls(**session) or session
         self.logger = logger or EntityLoggerAdapter(globals()['logger'],
@@ -127,6 +192,25 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
             self.temporary_error_retries = temporary_error_retries
         if temporary_error_wait_seconds is not None:
             self.temporary_error_wait_seconds = temporary_error_wait_seconds
+        if ratelimit_backoff is not None:
+            self.ratelimit_backoff = ratelimit_backoff
+        if temporary_error_backoff is not None:
+            self.temporary_error_backoff = temporary_error_backoff
+        if retry_budget is not None:
+            self.retry_budget = retry_budget
+        if circuit_breaker is not None:
+            self.circuit_breaker = circuit_breaker
+        if response_cache is not None:
+            self.response_cache = response_cache
+        if single_flight is not None:
+            self.single_flight = single_flight
+        if json_codec is not None:
+            self.json_codec = get_codec(json_codec)
+        if ratelimiter is not None:
+            self.ratelimiter = ratelimiter
+        elif self.ratelimiter is None and self.request_wait_seconds:
+            self.ratelimiter = TokenBucket.from_interval(self.request_wait_seconds)
+        self.adaptive_ratelimiter = self.ratelimit_headers and AdaptiveRateLimiter() or None
 
         self.storage_cls = storage_cls or self.storage_cls
         self.storage_uri = storage_uri or self.storage_uri
@@ -135,6 +219,14 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
 
         self.proxy = proxy_url and {'http': proxy_url, 'https': proxy_url} or None
         self.ssl_verify = ssl_verify
+        if adapter_registry is not None:
+            self.adapter_registry = adapter_registry
+        if dns_cache is not None:
+            self.dns_cache = dns_cache
+        if self.adapter_registry and self.base_url:
+            self.adapter_registry.mount(self.session, self.base_url, proxy_url, ssl_verify)
+        elif self.dns_cache and self.base_url:
+            self.session.mount(get_prefix(self.base_url), HTTPAdapter(dns_cache=self.dns_cache))
         self.auto_authenticate = (auto_authenticate if auto_authenticate is not None
                                   else self.auto_authenticate)
 
@@ -144,6 +236,9 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
         else:
             self.init_state()
 
+        if warmup:
+            self.warmup(self.warmup_connections if warmup is True else warmup)
+
     @property
     def auth_ident(self):
         raise NotImplementedError()
@@ -152,6 +247,11 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
     def auth_name(self):
         return self.auth_ident
 
+    @property
+    def ratelimit_key(self):
+        # Key for distributed ratelimiters, so limit is per account
+        return '{}:{}'.format(self.__class__.__name__, self.auth_ident or '')
+
     @property
     def auth_repr(self):
         if self.auth_name and self.auth_name != self.auth_ident:
@@ -258,7 +358,7 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
         Wrapper method around `request` for exception processing, raised by ancestors.
         """
 
-        ratelimit_retries, temporary_error_retries, ident_retries = 0, 0, {}
+        retry_state = self._init_retry_state()
 
         while True:
             try:
@@ -267,49 +367,69 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
                 except Exception as exc:
                     self.error_processor(exc)
                     raise
+            except (Retry, TemporaryError) as exc:
+                self.sleep(*self._process_retry(exc, retry_state))
 
-            except Retry as exc:
-                ident_retries.setdefault(exc.retry_ident, 0)
-                ident_retries[exc.retry_ident] += 1
-                if ident_retries[exc.retry_ident] <= exc.retry_count:
-                    self.logger.warning('Retry(%s) after calls(%s/%s) since(%s) on: %s',
-                                        ident_retries[exc.retry_ident], self.calls_count,
-                                        self.calls_elapsed_seconds, self.first_call_time,
-                                        exc.retry_ident)
-                    if exc.wait_seconds:
-                        self.sleep(exc.wait_seconds,
-                                   log_reason='retry request: {}'.format(exc.retry_ident))
-                else:
-                    raise self.RetryExceeded(
-                        exc.result, retry_ident=exc.retry_ident, retry_count=exc.retry_count)
-
-            except RatelimitError as exc:
-                ratelimit_retries += 1
-                if ratelimit_retries <= self.ratelimit_retries:
-                    self.logger.warning('Retry(%s) after calls(%s/%s) since(%s) on error: %r',
-                                        ratelimit_retries, self.calls_count,
-                                        self.calls_elapsed_seconds, self.first_call_time, exc)
-                    self.sleep(exc.wait_seconds is not None and exc.wait_seconds
-                               or self.ratelimit_wait_seconds,
-                               log_reason='ratelimit wait')
-                else:
-                    if ratelimit_retries - 1:
-                        raise self.RetryExceeded(exc, retry_count=ratelimit_retries - 1)
-                    raise
+    def _init_retry_state(self):
+        if self.retry_budget:
+            self.retry_budget.record_request()
+        return _RetryState()
 
-            except TemporaryError as exc:
-                temporary_error_retries += 1
-                if temporary_error_retries <= self.temporary_error_retries:
-                    self.logger.debug('Retry(%s) after calls(%s/%s) since(%s) on error: %r',
-                                      temporary_error_retries, self.calls_count,
-                                      self.calls_elapsed_seconds, self.first_call_time, exc)
-                    self.sleep(exc.wait_seconds is not None and exc.wait_seconds
-                               or self.temporary_error_wait_seconds,
-                               log_reason='temporary error wait')
-                else:
-                    if temporary_error_retries - 1:
-                        raise self.RetryExceeded(exc, retry_count=temporary_error_retries - 1)
-                    raise
+    def _process_retry(self, exc, state):
+        """
+        Counts retry for exception raised from `_request` and returns (wait_seconds, log_reason)
+        to sleep before next try, or raises if retries exceeded.
+        Shared by sync and async clients, so retry semantics are the same.
+        """
+        if isinstance(exc, Retry):
+            key = ('ident', exc.retry_ident)
+            state.counts[key] = state.counts.get(key, 0) + 1
+            if state.counts[key] <= exc.retry_count:
+                self.logger.warning('Retry(%s) after calls(%s/%s) since(%s) on: %s',
+                                    state.counts[key], self.calls_count,
+                                    self.calls_elapsed_seconds, self.first_call_time,
+                                    exc.retry_ident)
+                return (state.add_backoff(key, exc.wait_seconds or 0),
+                        'retry request: {}'.format(exc.retry_ident))
+            raise self.RetryExceeded(
+                exc.result, retry_ident=exc.retry_ident, retry_count=exc.retry_count,
+                retries=state.get_retries(), backoff_seconds=state.backoff_seconds)
+
+        if isinstance(exc, RatelimitError):
+            key, max_retries, wait_seconds, backoff, log = (
+                'ratelimit', self.ratelimit_retries, self.ratelimit_wait_seconds,
+                self.ratelimit_backoff, self.logger.warning)
+        else:
+            key, max_retries, wait_seconds, backoff, log = (
+                'temporary_error', self.temporary_error_retries,
+                self.temporary_error_wait_seconds, self.temporary_error_backoff,
+                self.logger.debug)
+
+        state.counts[key] = state.counts.get(key, 0) + 1
+        if state.counts[key] <= max_retries:
+            if self.retry_budget and not self.retry_budget.try_retry():
+                raise self.RetryExceeded(
+                    exc, 'Retry budget exhausted', retry_count=state.counts[key] - 1,
+                    retries=state.get_retries(), backoff_seconds=state.backoff_seconds)
+
+            log('Retry(%s) after calls(%s/%s) since(%s) on error: %r',
+                state.counts[key], self.calls_count,
+                self.calls_elapsed_seconds, self.first_call_time, exc)
+            retry_after = self.ratelimit_headers and get_retry_after(exc.resp) or None
+            if exc.wait_seconds:
+                wait_seconds = exc.wait_seconds
+            elif retry_after is not None:
+                # Sleep exactly as server asked, if it did
+                wait_seconds = retry_after
+            elif backoff:
+                wait_seconds = backoff(state.counts[key], state.previous_wait.get(key))
+            return (state.add_backoff(key, wait_seconds),
+                    '{} wait'.format(key.replace('_', ' ')))
+        if state.counts[key] - 1:
+            raise self.RetryExceeded(exc, retry_count=state.counts[key] - 1,
+                                     retries=state.get_retries(),
+                                     backoff_seconds=state.backoff_seconds)
+        raise exc
 
     def _request(self, *args, **kwargs):
         """
@@ -320,28 +440,146 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
 
     def _send_request(self, method, url, params=None, data=None, headers=None, json=None,
                       http_status=2, parse_json=False, error_processors=[],
-                      allow_redirects=None, cookies=None, stream=False):
+                      allow_redirects=None, cookies=None, stream=False, ratelimiters=[],
+                      cache=True):
         """
         Real request sending. Sleeping some time if need,
         setting calls first/last time and count, measuring request time,
         checking status, parsing json, running error_processors
         (for exception raise to be processed in self.request),
+        ratelimiters are endpoint limiters in addition to client ratelimiter,
+        cache=False skips response_cache for request.
         """
-        call_time = now()
-        if self.last_call_time:
-            if self.request_wait_seconds:
-                delta = (call_time - self.last_call_time).total_seconds()
-                if delta < self.request_wait_seconds:
-                    self.sleep(self.request_wait_seconds - delta,
-                               log_reason='request wait')
-                    self.last_call_time = now()
-                else:
-                    self.last_call_time = call_time
-            else:
-                self.last_call_time = call_time
+        url, kwargs = self._prepare_request(method, url, params, data, headers, json,
+                                            allow_redirects, cookies, stream)
+        cache_key, cache_entry = self._get_cache_entry(method, url, kwargs, cache)
+        if cache_entry is not None and cache_entry.is_fresh():
+            return self._process_response(cache_entry.build_response(), http_status,
+                                          parse_json, error_processors, from_cache=True)
+
+        flight_key = self._get_flight_key(method, url, kwargs, http_status, parse_json,
+                                          error_processors)
+        if flight_key is not None:
+            # Waiting callers get copies of leader response snapshot,
+            # as response_schema sets resp.data on leader response
+            return self.single_flight.do(flight_key, lambda: self._send_prepared_request(
+                method, url, kwargs, http_status, parse_json, error_processors, ratelimiters,
+                cache_key, cache_entry,
+            ), copy=copy_response)
+        return self._send_prepared_request(method, url, kwargs, http_status, parse_json,
+                                           error_processors, ratelimiters,
+                                           cache_key, cache_entry)
+
+    def _send_prepared_request(self, method, url, kwargs, http_status, parse_json,
+                               error_processors, ratelimiters, cache_key, cache_entry):
+        circuit_key = self._check_circuit(url)
+        self.sleep(self._reserve_call_time(ratelimiters), log_reason='request wait')
+        try:
+            try:
+                response = self.session.request(method, url, **kwargs)
+                response = self._process_cache(cache_key, cache_entry, response)
+            except Exception as exc:
+                self.error_processor(exc, error_processors)
+                raise
+            finally:
+                self._set_response_time()
+
+            response = self._process_response(response, http_status, parse_json,
+                                              error_processors, kwargs['stream'])
+        except Exception as exc:
+            self._record_circuit(circuit_key, exc)
+            raise
+        self._record_circuit(circuit_key)
+        return response
+
+    def _get_flight_key(self, method, url, kwargs, http_status, parse_json,
+                        error_processors):
+        if not (self.single_flight and method in CACHEABLE_METHODS and not kwargs['stream']
+                and kwargs['data'] is None and kwargs['json'] is None
+                and not kwargs['cookies']):
+            return None
+        # Only requests with same headers (Accept, Range, auth) are coalesced
+        headers = CaseInsensitiveDict(self.session.headers)
+        headers.update(kwargs['headers'] or {})
+        return (get_request_key(method, url, kwargs['params'], self.ratelimit_key),
+                parse_json, repr(http_status), kwargs['allow_redirects'],
+                tuple(sorted((k.lower(), repr(v)) for k, v in headers.items())),
+                tuple(getattr(p, 'key', p) for p in error_processors))
+
+    def _get_cache_entry(self, method, url, kwargs, cache=True):
+        """
+        Returns (cache_key, entry) for cacheable request, adding validators
+        to request headers if entry is stale.
+        """
+        if not (self.response_cache and cache and method in CACHEABLE_METHODS
+                and not kwargs['stream']):
+            return None, None
+        # Cached responses are per account, as they may depend on authentication
+        key = self.response_cache.get_key(method, url, kwargs['params'], self.ratelimit_key)
+        request_headers = CaseInsensitiveDict(self.session.headers)
+        request_headers.update(kwargs['headers'] or {})
+        entry = self.response_cache.get(key, request_headers)
+        if entry is not None and not entry.is_fresh():
+            kwargs['headers'] = dict(kwargs['headers'] or {}, **entry.get_validators())
+        return key, entry
+
+    def _process_cache(self, key, entry, response):
+        if key is None:
+            return response
+        if entry is not None and response.status_code == 304:
+            return self.response_cache.revalidate(key, entry, response)
+        self.response_cache.store(key, response, response.request.headers)
+        return response
+
+    def get_circuit_key(self, url):
+        # Override to break circuit per endpoint instead of host
+        return urlparse(url).netloc
+
+    def _check_circuit(self, url):
+        if not self.circuit_breaker:
+            return None
+        key = self.get_circuit_key(url)
+        retry_after = self.circuit_breaker.allow(key)
+        if retry_after:
+            raise self.CircuitOpenError(key=key, retry_after=retry_after)
+        return key
+
+    def _record_circuit(self, key, exc=None):
+        if key is None:
+            return
+        if (isinstance(exc, (TemporaryError, RequestsConnectionError, Timeout))
+           and not isinstance(exc, RatelimitError)):
+            self.circuit_breaker.record_failure(key)
         else:
-            self.first_call_time = self.last_call_time = call_time
+            # Any other response means host is alive
+            self.circuit_breaker.record_success(key)
 
+    def _reserve_call_time(self, ratelimiters=[]):
+        """
+        Returns seconds to wait before sending request, reserving slot in ratelimiters,
+        and sets last_call_time to the time request will be actually sent.
+        """
+        wait_seconds = reserve_all([self.ratelimiter, self.adaptive_ratelimiter]
+                                   + list(ratelimiters),
+                                   key=self.ratelimit_key)
+        with self._lock:
+            self.last_call_time = now() + timedelta(seconds=wait_seconds)
+            if not self.first_call_time:
+                self.first_call_time = self.last_call_time
+        return wait_seconds
+
+    def _set_response_time(self):
+        if self.request_wait_since_response:
+            with self._lock:
+                self.last_call_time = now()
+            if self.ratelimiter:
+                self.ratelimiter.drain()
+
+    def _prepare_request(self, method, url, params=None, data=None, headers=None, json=None,
+                         allow_redirects=None, cookies=None, stream=False):
+        """
+        Returns absolute url and keyword arguments for session request.
+        """
         if not urlparse(url).scheme and self.base_url:
             url = urljoin(self.base_url, url)
 
@@ -357,21 +595,30 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
                    + pprint(data or json, print_=False)) if (data or json) else '')
             )
 
-        try:
-            kwargs = dict(params=params, data=data, json=json, headers=headers,
-                          allow_redirects=allow_redirects, proxies=self.proxy,
-                          verify=self.ssl_verify, cookies=cookies, stream=stream)
-            if self.timeout is not None:
-                # Allow session (ConfigurableSession for example) to handle timeout
-                kwargs['timeout'] = self.timeout
-            response = self.session.request(method, url, **kwargs)
-        except Exception as exc:
-            self.error_processor(exc, error_processors)
-            raise
-        finally:
-            if self.request_wait_since_response:
-                self.last_call_time = now()
-
+        if json is not None and not data:
+            # Encoding with json_codec instead of stdlib json used by requests
+            try:
+                data = self.json_codec.dumps(json, allow_nan=False)
+            except ValueError as exc:
+                raise InvalidJSONError(exc)
+            headers = CaseInsensitiveDict(headers or {})
+            headers.setdefault('Content-Type', 'application/json')
+            json = None
+
+        kwargs = dict(params=params, data=data, json=json, headers=headers,
+                      allow_redirects=allow_redirects, proxies=self.proxy,
+                      verify=self.ssl_verify, cookies=cookies, stream=stream)
+        if self.timeout is not None:
+            # Allow session (ConfigurableSession for example) to handle timeout
+            kwargs['timeout'] = self.timeout
+        return url, kwargs
+
+    def _process_response(self, response, http_status=2, parse_json=False,
+                          error_processors=[], stream=False, from_cache=False):
+        """
+        Updating calls stats, checking status, parsing json and running error_processors
+        on received response. Calls stats are not updated for fresh cached response.
+        """
         if self.debug_level >= 5:
             self.logger.debug(
                 _color_em('RESPONSE %s' % response.request.method, back=colorama.Back.GREEN)
@@ -383,15 +630,8 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
                 + (stream and '<stream>' or pprint(response.text, print_=False))
             )
 
-        elapsed_seconds = response.elapsed.total_seconds()
-        if elapsed_seconds > self.request_warn_elapsed_seconds:
-            self.logger.warning('Request %s %s took %s seconds after calls(%s/%s) since(%s)',
-                                response.request.method, response.request.url,
-                                elapsed_seconds, self.calls_count, self.calls_elapsed_seconds,
-                                self.first_call_time)
-        self.calls_elapsed_seconds += elapsed_seconds
-        self.calls_count += 1
-        self.last_response = response  # NOTE: only for debug purposes!
+        if not from_cache:
+            self._update_calls_stats(response)
 
         if (http_status and not check_http_status(response.status_code, http_status)):
             self.set_response_json_data(response, parse_json, raise_=False)
@@ -400,7 +640,7 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
             raise exc
 
         try:
-            self.set_response_json_data(response, parse_json, raise_=True)
+            self.set_response_json_data(response, parse_json, raise_=True, stream=stream)
         except _JSONDecodeError as exc:
             exc = self.JSONDecodeError(response, exc)
             self.error_processor(exc, error_processors)
@@ -408,19 +648,54 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
 
         return response
 
+    def _update_calls_stats(self, response):
+        elapsed_seconds = response.elapsed.total_seconds()
+        if elapsed_seconds > self.request_warn_elapsed_seconds:
+            self.logger.warning('Request %s %s took %s seconds after calls(%s/%s) since(%s)',
+                                response.request.method, response.request.url,
+                                elapsed_seconds, self.calls_count, self.calls_elapsed_seconds,
+                                self.first_call_time)
+        with self._lock:
+            self.calls_elapsed_seconds += elapsed_seconds
+            self.calls_count += 1
+            self.last_response = response  # NOTE: only for debug purposes!
+        if self.adaptive_ratelimiter:
+            self.adaptive_ratelimiter.update(**parse_ratelimit_headers(response.headers))
+
     def get(self, *args, **kwargs):
         return self.request('GET', *args, **kwargs)
 
     def post(self, *args, **kwargs):
         return self.request('POST', *args, **kwargs)
 
-    def set_response_json_data(self, resp, data_path=None, data_attr='data', raise_=False):
-        if (
-            data_path
-            or resp.headers.get('Content-Type', '').lower().split(';')[0] in JSON_CONTENT_TYPES
+    def set_response_json_data(self, resp, data_path=None, data_attr='data', raise_=False,
+                               stream=False):
+        if stream and isinstance(data_path, str) and resp._content is False:
+            # Parsing incrementally, only value at data_path is materialized
+            try:
+                try:
+                    data = load_path(resp.iter_content(self.stream_chunk_size), data_path,
+                                     resp.encoding or 'utf-8')
+                except JSONPathError as exc:
+                    raise self.ClientError(resp, 'Could not resolve path %s: %r' %
+                                           (data_path, exc))
+                finally:
+                    # Rest of body is not read, so connection is not reused
+                    resp.close()
+                    resp._content_consumed = True
+                setattr(resp, data_attr, data)
+            except Exception:
+                if raise_:
+                    raise
+            return
+
+        # Streamed response is not decoded without data_path, see iter_response_items
+        if data_path or (
+            not stream
+            and resp.headers.get('Content-Type', '').lower().split(';')[0] in JSON_CONTENT_TYPES
         ):
             try:
-                data = maybe_attr_dict(resp.json())
+                data = lazy_attr_dict(self.json_loads(resp))
                 setattr(resp, data_attr, data)
                 if isinstance(data_path, str):
                     try:
@@ -433,8 +708,44 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
                 if raise_:
                     raise
 
+    def json_loads(self, resp):
+        encoding = resp.encoding
+        if not encoding and len(resp.content) > 3:
+            # Same as response.json(), utf-16 and utf-32 are detected by json rules
+            encoding = guess_json_utf(resp.content)
+            if encoding and encoding != 'utf-8':
+                try:
+                    return self.json_codec.loads(resp.content.decode(encoding))
+                except UnicodeDecodeError:
+                    # Wrong guess, decoding as text as usual
+                    return self.json_codec.loads(resp.text)
+        # Decoding utf-8 content bytes directly, without text decode
+        if (encoding or 'utf-8').lower().replace('_', '-') in ('utf-8', 'utf8'):
+            return self.json_codec.loads(resp.content)
+        return self.json_codec.loads(resp.text)
+
+    def iter_response_items(self, resp, data_path=None):
+        """
+        Yields items of JSON array at data_path one by one.
+        For response requested with stream=True memory usage doesn't depend on response size.
+        """
+        if resp._content is False:
+            chunks = resp.iter_content(self.stream_chunk_size)
+        else:
+            chunks = [resp.content]
+        try:
+            try:
+                yield from iter_path_items(chunks, data_path, resp.encoding or 'utf-8')
+            except JSONPathError as exc:
+                raise self.ClientError(resp, 'Could not resolve path %s: %r' % (data_path, exc))
+            except _JSONDecodeError as exc:
+                raise self.JSONDecodeError(resp, exc)
+        finally:
+            resp.close()
+            resp._content_consumed = True
+
     def load_response_schema(self, resp, schema, inherit=None, data_attr='data',
-                             data_path=None, **kwargs):
+                             data_path=None, columns=False, **kwargs):
         data = getattr(resp, data_attr)
         data_path = data_path or getattr(schema, 'data_path', None)
         if data_path:
@@ -443,16 +754,25 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
             except Exception as exc:
                 raise self.ClientError(resp, 'Could not resolve path %s: %r' % (data_path, exc))
 
-        schema = maybe_create_response_schema(schema, inherit)
-        schema.context['client'] = self
-        schema.context['debug_level'] = self.debug_level
-        schema.context['logger'] = self.logger
-        schema.context['response'] = resp
+        instance = maybe_create_response_schema(schema, inherit)
         try:
-            return schema.load(data, **kwargs)
+            if columns:
+                # List data to dict of columns, without entities creation
+                return load_columns(data, instance)
+            context = dict(client=self, debug_level=self.debug_level, logger=self.logger,
+                           response=resp)
+            if not isinstance(instance.context, SchemaContext):
+                # Plain marshmallow schema is not reading schema_context(),
+                # so context is set on passed instance, or on new instance instead of cached
+                if instance is schema:
+                    instance.context.update(context)
+                else:
+                    instance = instance.__class__(context=context)
+            with schema_context(**context):
+                return instance.load(data, **kwargs)
         except ValidationError as exc:
             raise self.ResponseValidationError(
-                resp, schema=schema, errors=exc.normalized_messages())
+                resp, schema=instance, errors=exc.normalized_messages())
 
     def apply_response_schema(self, resp, *args, target_attr='data', **kwargs):
         try:
@@ -463,6 +783,69 @@ class BaseClient(CreateFromConfigMixin, metaclass=BaseClientMeta):
         else:
             setattr(resp, target_attr, data)
 
+    def _resolve_call(self, call):
+        # call is callable, or (callable or client method name, args[, kwargs]) tuple
+        if callable(call):
+            return call, (), {}
+        func, args, kwargs = (tuple(call) + ({},))[:3]
+        return (getattr(self, func) if isinstance(func, str) else func), args, kwargs
+
+    def map(self, calls, concurrency=None, ordered=True):
+        """
+        Runs calls concurrently with thread pool (or gevent pool if gevent patched socket).
+        Each call is callable, or (callable or client method name, args[, kwargs]) tuple,
+        for example ('get', ('path',), {'params': {'x': 1}}).
+        Yields results, or exceptions raised by calls, in calls order.
+        If not ordered, yields (index, result or exception) pairs as completed.
+        """
+        def call(call):
+            func, args, kwargs = self._resolve_call(call)
+            return func(*args, **kwargs)
+
+        for index, result, exc in imap(call, calls, concurrency or self.map_concurrency,
+                                       ordered):
+            result = result if exc is None else exc
+            yield result if ordered else (index, result)
+
+    def gather(self, calls, concurrency=None):
+        """
+        Same as map, but returns list of results or exceptions in calls order.
+        """
+        return list(self.map(calls, concurrency))
+
+    def warmup(self, connections=1, wait=False):
+        """
+        Opens keep-alive connections to base_url (using proxy if set) in background,
+        so first requests don't wait for DNS, TCP and TLS setup.
+        Returns started thread.
+        """
+        adapter = self.session.get_adapter(self.base_url)
+        thread = Thread(target=self._warmup, args=(adapter, connections), daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def _warmup(self, adapter, connections):
+        timeout = self.timeout[0] if isinstance(self.timeout, tuple) else self.timeout
+        started_at = monotonic()
+        try:
+            # Same settings as for requests (with REQUESTS_CA_BUNDLE for example),
+            # otherwise connections are opened in other pool
+            settings = self.session.merge_environment_settings(
+                self.base_url, self.proxy or {}, None, self.ssl_verify, None)
+            opened = warmup_adapter(adapter, self.base_url, connections, settings['proxies'],
+                                    settings['verify'], timeout, settings['cert'])
+        except Exception as exc:
+            self.logger.warning('Warmup failed: %r', exc)
+            return
+        elapsed_seconds = monotonic() - started_at
+        with self._lock:
+            self.warmup_count += opened
+            self.warmup_elapsed_seconds += elapsed_seconds
+        self.logger.debug('Warmup opened %s connections in %.3f seconds',
+                          opened, elapsed_seconds)
+
     @classmethod
     def storage_factory(cls, prefix, storage_cls=None, storage_uri=None):
         """
@@ -497,6 +880,9 @@ def auth_required(func):
 
 
 def response_schema(schema, inherit=None, data_attr='data', data_path=None, **schema_kwargs):
+    # Creating schema on import, it's cached for requests
+    maybe_create_response_schema(schema, inherit, cache=True)
+
     def decorator(func):
         @wraps(func)
         def wrapper(client, *args, **kwargs):
@@ -515,24 +901,35 @@ def _match_attrs(obj, attrs):
                for attr, value in attrs.items())
 
 
+def _create_error_processor(new_exc_cls, exc_cls, exc_attrs={}, callback=None,
+                            wait_seconds=None):
+    def error_processor(exc):
+        if isinstance(exc, exc_cls):
+            if _match_attrs(exc, exc_attrs) and (not callback or callback(exc)):
+                raise new_exc_cls(exc.resp, 'Temporary error', wait_seconds=wait_seconds,
+                                  original_exc=exc)
+    # Decorators create processor on every call, so single flight key is built from arguments
+    error_processor.key = (new_exc_cls, exc_cls,
+                           tuple(sorted((k, repr(v)) for k, v in exc_attrs.items())),
+                           callback, wait_seconds)
+    return error_processor
+
+
+def _append_error_processor(kwargs, error_processor):
+    if 'error_processors' in kwargs:
+        kwargs['error_processors'].append(error_processor)
+    else:
+        kwargs['error_processors'] = [error_processor]
+
+
 def _create_temporary_error_decorator(temporary_error_type):
     def temporary_error_decorator(exc_cls, exc_attrs={}, callback=None, wait_seconds=None):
-        def create_error_processor(new_exc_cls):
-            def error_processor(exc):
-                if isinstance(exc, exc_cls):
-                    if _match_attrs(exc, exc_attrs) and (not callback or callback(exc)):
-                        raise new_exc_cls(exc.resp, 'Temporary error', wait_seconds=wait_seconds,
-                                          original_exc=exc)
-            return error_processor
-
         def decorator(func):
             @wraps(func)
             def wrapper(client, *args, **kwargs):
-                error_processor = create_error_processor(getattr(client, temporary_error_type))
-                if 'error_processors' in kwargs:
-                    kwargs['error_processors'].append(error_processor)
-                else:
-                    kwargs['error_processors'] = [error_processor]
+                _append_error_processor(kwargs, _create_error_processor(
+                    getattr(client, temporary_error_type), exc_cls, exc_attrs,
+                    callback, wait_seconds))
                 return func(client, *args, **kwargs)
             return wrapper
         return decorator
@@ -543,6 +940,29 @@ ratelimit_error = _create_temporary_error_decorator('RatelimitError')
 temporary_error = _create_temporary_error_decorator('TemporaryError')
 
 
+def _resolve_ratelimiter(client, ratelimiter):
+    return getattr(client, ratelimiter) if isinstance(ratelimiter, str) else ratelimiter
+
+
+def _append_ratelimiter(kwargs, ratelimiter):
+    kwargs['ratelimiters'] = kwargs.get('ratelimiters', []) + [ratelimiter]
+
+
+def ratelimit(ratelimiter):
+    """
+    Endpoint ratelimiter, applied in addition to client ratelimiter.
+    ratelimiter is BaseRateLimiter instance (shared between all clients),
+    or client attribute name to get limiter from (for example per client limiter).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(client, *args, **kwargs):
+            _append_ratelimiter(kwargs, _resolve_ratelimiter(client, ratelimiter))
+            return func(client, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def reraise(exc_cls, exc_attrs, callback):
     def decorator(func):
         @wraps(func)
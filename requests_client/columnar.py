@@ -0,0 +1,159 @@
+"""
+Columnar loading of list data: dict of columns (by field attribute) is returned
+instead of entities, with numpy arrays if numpy is installed,
+and array.array (numeric fields) or lists otherwise.
+"""
+from array import array
+
+from marshmallow import ValidationError, fields, missing
+
+from .fields import TimestampField
+from .schemas import LoadKeySchemaMixin
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Value types not needing conversion on load, for columns converted at once
+FAST_TYPES = {
+    fields.Integer: (int,),
+    fields.Float: (int, float),
+    fields.Boolean: (bool,),
+    TimestampField: (int, float),
+}
+NAN = float('nan')
+# Seconds range of datetime (years 1-9999)
+TIMESTAMP_RANGE = (-62135596800, 253402300800)
+
+
+def _is_fast(field, values):
+    # Column values are valid and could be converted without field.deserialize
+    types = FAST_TYPES.get(type(field))
+    if not types or field.validators or field.missing not in (missing, None):
+        return False
+    if type(field) is fields.Boolean and field.truthy and (
+       True not in field.truthy or False in field.truthy or False not in field.falsy):
+        return False
+    if type(field) is fields.Float and not field.allow_nan:
+        # value - value is not zero for nan and infinity
+        if any(type(value) is float and value - value for value in values):
+            return False
+    if type(field) is TimestampField:
+        scale = 1000 if field.ms else 1
+        low, high = TIMESTAMP_RANGE[0] * scale, TIMESTAMP_RANGE[1] * scale
+        if any(type(value) in types and not low <= value < high for value in values):
+            return False
+    for value in values:
+        if value is None:
+            if field.allow_none is not True:
+                return False
+        elif value is missing:
+            if field.required:
+                return False
+        elif type(value) not in types:
+            return False
+    return True
+
+
+def _deserialize_column(field, key, data, values, errors):
+    rv = []
+    for index, (item, value) in enumerate(zip(data, values)):
+        try:
+            value = field.deserialize(value, key, item)
+        except ValidationError as exc:
+            errors.setdefault(index, {})[key] = exc.messages
+            value = None
+        rv.append(None if value is missing else value)
+    return rv
+
+
+def _timestamps_array(field, values):
+    # Vectorized TimestampField conversion to naive datetime64 in field timezone
+    # (same as naive datetimes of field), None and zero (for zero_as_none) are NaT
+    values = numpy.array([NAN if value is None or value is missing else value
+                          for value in values], dtype='float64')
+    if field.zero_as_none:
+        values[values == 0] = NAN
+    valid = ~numpy.isnan(values)
+    rv = numpy.full(len(values), numpy.datetime64('NaT'), dtype='datetime64[us]')
+    scale = 1000 if field.ms else 1000000
+    rv[valid] = numpy.round(values[valid] * scale).astype('int64').astype('datetime64[us]')
+    return rv
+
+
+def _to_array(field, values):
+    # values are deserialized, missing and null values are None
+    cls = type(field)
+    has_none = None in values
+    if numpy is not None:
+        if cls is fields.Float:
+            return numpy.array([NAN if v is None else v for v in values], dtype='float64')
+        elif cls is fields.Integer and not has_none:
+            try:
+                return numpy.array(values, dtype='int64')
+            except OverflowError:
+                pass
+        elif cls is fields.Boolean and not has_none:
+            return numpy.array(values, dtype='bool')
+        elif isinstance(field, TimestampField):
+            return numpy.array([v and v.replace(tzinfo=None) for v in values],
+                               dtype='datetime64[us]')
+        # Assigned one by one, so list values are not broadcasted
+        rv = numpy.empty(len(values), dtype='object')
+        for index, value in enumerate(values):
+            rv[index] = value
+        return rv
+
+    if cls is fields.Float:
+        return array('d', (NAN if v is None else v for v in values))
+    elif cls is fields.Integer and not has_none:
+        try:
+            return array('q', values)
+        except OverflowError:
+            pass
+    return values
+
+
+def load_column(field, key, data, errors, load_key=None):
+    if load_key:
+        # Same as LoadKeySchemaMixin, but data is not changed
+        values = [item.get(load_key, item.get(key, missing)) for item in data]
+    else:
+        values = [item.get(key, missing) for item in data]
+    if _is_fast(field, values):
+        if isinstance(field, TimestampField):
+            if numpy is not None:
+                return _timestamps_array(field, values)
+            return field.deserialize_many([None if v is missing else v for v in values])
+        else:
+            return _to_array(field, [None if v is missing else v for v in values])
+    return _to_array(field, _deserialize_column(field, key, data, values, errors))
+
+
+def load_columns(data, schema):
+    """
+    Returns dict of columns for list data, loaded by schema fields (schema hooks
+    and model are not used, except load_key for LoadKeySchemaMixin).
+    Raises ValidationError with errors like schema.load.
+    """
+    load_keys = isinstance(schema, LoadKeySchemaMixin)
+    if not isinstance(data, (list, tuple)):
+        raise ValidationError([schema.error_messages['type']], data=data)
+    errors = {}
+    for index, item in enumerate(data):
+        if not isinstance(item, dict):
+            errors[index] = {'_schema': [schema.error_messages['type']]}
+    if errors:
+        raise ValidationError(errors, data=data)
+
+    rv = {}
+    for attr_name, field in schema.fields.items():
+        if not field.dump_only:
+            key = field.data_key or attr_name
+            load_key = load_keys and field.metadata.get('load_key')
+            rv[field.attribute or attr_name] = load_column(field, key, data, errors, load_key)
+    if errors:
+        raise ValidationError(errors, data=data, valid_data=rv)
+    return rv
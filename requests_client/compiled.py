@@ -0,0 +1,222 @@
+"""
+Compiled loaders for schemas: specialized python function is generated once
+for schema fields, so load is not going through generic marshmallow machinery.
+Marshmallow is used for not supported schemas and on any validation error,
+so errors (and ResponseValidationError contents) are always the same.
+"""
+from datetime import timedelta
+
+from marshmallow import Schema, ValidationError, fields, missing
+from marshmallow.decorators import PRE_LOAD, POST_LOAD, VALIDATES, VALIDATES_SCHEMA
+from marshmallow.utils import EXCLUDE, RAISE
+
+from .fields import TimestampField, SchemedEntityField
+
+
+LOAD_TAGS = (PRE_LOAD, POST_LOAD, VALIDATES, VALIDATES_SCHEMA)
+
+# Hooks with known behavior, other load hooks are not supported
+PRE_LOAD_HOOK = '_LoadKeySchemaMixin__pre_load'  # (data, many), replaces keys
+PDB_HOOK = '_ResponseSchema__pre_load'  # (data), no-op without Meta.pdb
+POST_LOAD_HOOK = '_ResponseSchema__post_load'  # (data, many, original_data)
+
+
+class CompileError(Exception):
+    pass
+
+
+class _Fallback(Exception):
+    # Data is not valid for compiled loader, so marshmallow load is used
+    pass
+
+
+class _Compiler:
+    def __init__(self):
+        self.namespace = {'missing': missing, 'Fallback': _Fallback}
+        self.lines = []
+        self.functions = 0
+
+    def bind(self, value):
+        name = '_v{}'.format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def function(self, args):
+        name = '_load{}'.format(self.functions)
+        self.functions += 1
+        self.lines.append('def {}({}):'.format(name, args))
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def compile_schema(self, schema, unknown=None):
+        """
+        Returns name of generated function loading one item (after pre_load hooks).
+        """
+        if not isinstance(schema, Schema):
+            raise CompileError('Not a schema: {!r}'.format(schema))
+        unknown = unknown or schema.unknown
+        if schema.partial or unknown not in (EXCLUDE, RAISE):
+            raise CompileError('Partial or INCLUDE unknown loading is not supported')
+
+        load_fields = [(name, field) for name, field in schema.fields.items()
+                       if not field.dump_only]
+        # Nested loaders are compiled before this function body
+        converters = [self.compile_field(field, field.data_key or name, 'data')
+                      for name, field in load_fields]
+
+        name = self.function('data')
+        self.emit(1, 'if not isinstance(data, dict):')
+        self.emit(2, 'raise Fallback')
+        if unknown == RAISE:
+            keys = frozenset(field.data_key or name for name, field in load_fields)
+            self.emit(1, 'if not {}.issuperset(data):'.format(self.bind(keys)))
+            self.emit(2, 'raise Fallback')
+        self.emit(1, 'ret = {}()'.format(
+            'dict' if schema.dict_class is dict else self.bind(schema.dict_class)))
+
+        for (attr_name, field), converter in zip(load_fields, converters):
+            key = field.attribute or attr_name
+            if '.' in key:
+                raise CompileError('Dotted attribute is not supported: {}'.format(key))
+            self.emit(1, 'value = data.get({!r}, missing)'.format(field.data_key or attr_name))
+            self.emit_value(1, field, converter, 'ret[{!r}] = value'.format(key))
+        self.emit(1, 'return ret')
+        return name
+
+    def emit_value(self, indent, field, converter, store):
+        # Same as Field.deserialize, store is statement for value
+        self.emit(indent, 'if value is missing:')
+        if field.required:
+            self.emit(indent + 1, 'raise Fallback')
+        elif field.missing is missing:
+            self.emit(indent + 1, 'pass')
+        else:
+            self.emit(indent + 1, 'value = {}{}'.format(
+                self.bind(field.missing), '()' if callable(field.missing) else ''))
+            self.emit(indent + 1, 'if value is not missing:')
+            self.emit(indent + 2, store)
+        self.emit(indent, 'elif value is None:')
+        self.emit(indent + 1, store if field.allow_none is True else 'raise Fallback')
+        self.emit(indent, 'else:')
+        for line in converter:
+            self.emit(indent + 1, line)
+        if field.validators:
+            self.emit(indent + 1, '{}._validate(value)'.format(self.bind(field)))
+        self.emit(indent + 1, store)
+
+    def compile_field(self, field, attr, data):
+        """
+        Returns lines converting not None "value" variable.
+        """
+        # Fields subclasses may override _deserialize, so exact types are checked
+        cls = type(field)
+        deserialize = 'value = {}._deserialize(value, {!r}, {})'.format(
+            self.bind(field), attr, data)
+
+        if cls is fields.Raw:
+            return []
+        elif cls is fields.String:
+            return ['if type(value) is not str:', '    ' + deserialize]
+        elif cls is fields.Integer:
+            return ['if type(value) is not int:', '    ' + deserialize]
+        elif cls is fields.Float:
+            # value - value is not zero for nan and infinity
+            return ['if type(value) is not float or value - value:', '    ' + deserialize]
+        elif cls is fields.Boolean:
+            if field.truthy and (True not in field.truthy or False in field.truthy
+                                 or False not in field.falsy):
+                return [deserialize]
+            return ['if type(value) is not bool:', '    ' + deserialize]
+        elif cls is TimestampField:
+            # Inlined int timestamps path of TimestampField._deserialize
+            delta = '{}(0, {}value)'.format(self.bind(timedelta), '0, 0, ' if field.ms else '')
+            return ['if type(value) is int{}:'.format(' and value' if field.zero_as_none else ''),
+                    '    try:',
+                    '        value = {} + {}'.format(self.bind(field.epoch), delta),
+                    '    except OverflowError:',
+                    '        raise Fallback',
+                    'else:',
+                    '    ' + deserialize]
+        elif cls is fields.List:
+            container = self.compile_container(field.container)
+            return ['if not isinstance(value, list):', '    raise Fallback',
+                    'value = [{}(item) for item in value]'.format(container)]
+        elif cls is SchemedEntityField:
+            schema = field.schema  # resolves entity
+            loader = self.bind(compile_loader(schema, field.unknown))
+            entity = self.bind(field.entity)
+            if field.many:
+                return ['if not isinstance(value, list):', '    raise Fallback',
+                        'value = [{}(**item) for item in {}(value, True)]'.format(entity, loader)]
+            return ['value = {}(**{}(value, False))'.format(entity, loader)]
+        raise CompileError('Field is not supported: {!r}'.format(field))
+
+    def compile_container(self, field):
+        # Same as List container.deserialize(item)
+        converter = self.compile_field(field, None, 'None')
+        name = self.function('value')
+        self.emit_value(1, field, converter, 'return value')
+        return name
+
+
+def compile_loader(schema, unknown=None):
+    """
+    Returns loader(data, many) for schema instance, same as schema.load(data, many=many),
+    raises CompileError if schema is not supported.
+    Loader raises ValidationError or _Fallback if data could not be loaded,
+    so marshmallow load should be used to get errors.
+    """
+    hooks = {name for key, names in schema._hooks.items()
+             if (key[0] if isinstance(key, tuple) else key) in LOAD_TAGS for name in names}
+    if hooks - {PRE_LOAD_HOOK, PDB_HOOK, POST_LOAD_HOOK}:
+        raise CompileError('Load hooks are not supported: {}'.format(
+            ', '.join(sorted(hooks - {PRE_LOAD_HOOK, PDB_HOOK, POST_LOAD_HOOK}))))
+    if PDB_HOOK in hooks and getattr(schema.Meta, 'pdb', False):
+        raise CompileError('Meta.pdb is not supported')
+
+    compiler = _Compiler()
+    name = compiler.compile_schema(schema, unknown)
+    exec('\n'.join(compiler.lines), compiler.namespace)
+    load_item = compiler.namespace[name]
+
+    pre_load = getattr(schema, PRE_LOAD_HOOK) if PRE_LOAD_HOOK in hooks else None
+    post_load = getattr(schema, POST_LOAD_HOOK) if POST_LOAD_HOOK in hooks else None
+
+    def loader(data, many):
+        processed = pre_load(data, many) if pre_load else data
+        if many:
+            if not isinstance(processed, list):
+                raise _Fallback
+            rv = [load_item(item) for item in processed]
+        else:
+            rv = load_item(processed)
+        return post_load(rv, many, data) if post_load else rv
+    loader.source = '\n'.join(compiler.lines)
+    return loader
+
+
+class CompiledSchemaMixin:
+    """
+    Loads data with loader compiled on first load, if schema is supported.
+    """
+    def get_compiled_loader(self):
+        # Recompiled if fields were changed
+        fields, loader = self.__dict__.get('_compiled_loader', (None, None))
+        if fields is not self.fields:
+            try:
+                loader = compile_loader(self)
+            except CompileError:
+                loader = None
+            self._compiled_loader = (self.fields, loader)
+        return loader
+
+    def load(self, data, many=None, partial=None, unknown=None):
+        loader = self.get_compiled_loader() if partial is None and unknown is None else None
+        if loader:
+            try:
+                return loader(data, self.many if many is None else bool(many))
+            except (ValidationError, _Fallback):
+                pass
+        return super().load(data, many=many, partial=partial, unknown=unknown)
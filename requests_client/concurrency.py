@@ -0,0 +1,51 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+try:
+    from gevent.pool import Pool as GeventPool
+    from gevent.monkey import is_module_patched
+except ImportError:
+    GeventPool = None
+
+
+def _call(func, index, item):
+    try:
+        return index, func(item), None
+    except Exception as exc:
+        return index, None, exc
+
+
+def _imap_threads(func, items, concurrency, ordered):
+    items = enumerate(items)
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = deque(executor.submit(_call, func, i, item)
+                        for i, item in islice(items, concurrency))
+        while futures:
+            if ordered:
+                done = [futures.popleft()]
+            else:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    futures.remove(future)
+            for future in done:
+                for i, item in islice(items, 1):
+                    futures.append(executor.submit(_call, func, i, item))
+                yield future.result()
+
+
+def _imap_gevent(func, items, concurrency, ordered):
+    pool = GeventPool(concurrency)
+    imap = ordered and pool.imap or pool.imap_unordered
+    return imap(lambda args: _call(func, *args), enumerate(items))
+
+
+def imap(func, items, concurrency=10, ordered=True):
+    """
+    Calls func for each item concurrently, with at most `concurrency` calls in flight.
+    Yields (index, result, exception) in items order, or as completed if not ordered.
+    Uses gevent pool if gevent socket is monkey patched, thread pool otherwise.
+    """
+    if GeventPool and is_module_patched('socket'):
+        return _imap_gevent(func, items, concurrency, ordered)
+    return _imap_threads(func, items, concurrency, ordered)
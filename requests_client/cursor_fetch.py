@@ -1,18 +1,32 @@
+import asyncio
+from copy import copy
+from itertools import count as counter, takewhile
+from math import ceil
+from queue import Queue
+from threading import Thread, Semaphore, Lock
+from weakref import ref
+
 try:
     from gevent import sleep
 except ImportError:
     from time import sleep
 
+from .concurrency import imap
+
 
 class CursorFetchError(Exception):
     pass
 
 
 class CursorFetchIterator:
+    # Attributes of iterator not changed by fetching with prefetch
+    _consumer_attrs = ('_iterable', 'count', 'prefetch', '_pages', '_slots')
+
     def __init__(self, fetch_callback=None, cursor=None, has_more=None, reverse=False,
                  initial=[], max_count=None, max_count_to_stop_fetch=None,
                  max_fetch_count=None, fetch_wait_seconds=0,
-                 empty_fetch_retries=0, empty_fetch_wait_seconds=0, logger=None):
+                 empty_fetch_retries=0, empty_fetch_wait_seconds=0, logger=None,
+                 prefetch=0):
 
         self.cursor = cursor
         self._has_more = has_more
@@ -35,6 +49,12 @@ class CursorFetchIterator:
         self.empty_fetch_wait_seconds = empty_fetch_wait_seconds
         self.logger = logger
 
+        # Number of pages fetched ahead in background thread (greenlet if patched by gevent).
+        # fetch_callback gets copy of iterator, attributes set on it are copied to iterator
+        # when page is consumed. Use close() (or "with" block) if iterator is not exhausted.
+        self.prefetch = prefetch
+        self._pages = None
+
         self._stop_on_next_fetch = False
         self.fetch_count = 0
         self.count = 0
@@ -57,18 +77,16 @@ class CursorFetchIterator:
             return self._fetch_callback(self)
         raise NotImplementedError()
 
-    def _fetch_next(self):
-        if (self.max_fetch_count == 0 or self._stop_on_next_fetch
-           or self.has_more is False):
-            raise StopIteration()
+    def _can_fetch(self):
+        return not (self.max_fetch_count == 0 or self._stop_on_next_fetch
+                    or self.has_more is False)
 
-        if self.fetch_count and self.fetch_wait_seconds:
-            sleep(self.fetch_wait_seconds)
+    def _start_fetch(self):
         self.fetch_count += 1
         if self.fetch_count >= self.max_fetch_count:
             self._stop_on_next_fetch = True
 
-        result = self._fetch()
+    def _set_fetched(self, result):
         if result is not None:
             if not self.reverse:
                 self._iterable = list(reversed(result))
@@ -78,6 +96,15 @@ class CursorFetchIterator:
             self.logger.debug('Fetched %d items count=%d fetch_count=%d',
                               len(self._iterable), self.count, self.fetch_count)
 
+    def _fetch_next(self):
+        if not self._can_fetch():
+            raise StopIteration()
+
+        if self.fetch_count and self.fetch_wait_seconds:
+            sleep(self.fetch_wait_seconds)
+        self._start_fetch()
+        self._set_fetched(self._fetch())
+
     def __iter__(self):
         return self
 
@@ -94,10 +121,15 @@ class CursorFetchIterator:
             self._stop_on_next_fetch = True
         return self._iterable.pop()
 
-    def next(self):
-        if self._iterable:
-            return self._next()
+    def _empty_fetch_error(self):
+        msg = 'Cursor has more, but empty list returned'
+        if self.empty_fetch_retries:
+            msg += ('(after % retries with %s sleep)' %
+                    (self.empty_fetch_retries, self.empty_fetch_wait_seconds))
+        return CursorFetchError(msg)
 
+    def _fetch_items(self):
+        # Fetches next not empty page to _iterable, retrying on empty list
         self._fetch_next()
 
         if not self._iterable and self.has_more:
@@ -110,12 +142,272 @@ class CursorFetchIterator:
                 if self._iterable:
                     break
             else:
-                msg = 'Cursor has more, but empty list returned'
-                if self.empty_fetch_retries:
-                    msg += ('(after % retries with %s sleep)' %
-                            (self.empty_fetch_retries, self.empty_fetch_wait_seconds))
-                raise CursorFetchError(msg)
+                raise self._empty_fetch_error()
 
-        if not self._iterable:
+    @staticmethod
+    def _prefetch_worker(iterator_ref, fetcher, pages, slots, count, stop_count):
+        # Iterator is referenced weakly, so not closed iterator could be garbage collected
+        page = None  # or exception, on the end of fetching
+        while True:
+            slots.acquire()
+            iterator = iterator_ref()
+            if (iterator is None or iterator._stop_on_next_fetch or count >= stop_count
+               or iterator._pages is not pages):
+                break
+            del iterator
+            try:
+                fetcher._fetch_items()
+            except StopIteration:
+                break
+            except Exception as exc:
+                page = exc
+                break
+            pages.put((fetcher._iterable, fetcher._get_fetch_state()))
+            count += len(fetcher._iterable)
+            fetcher._iterable = []
+        pages.put((page, fetcher._get_fetch_state()))
+
+    def _get_fetch_state(self):
+        # Attributes changed by fetching (including ones set by fetch_callback)
+        return {k: v for k, v in vars(self).items() if k not in self._consumer_attrs}
+
+    def _fetch_prefetched(self):
+        if self._stop_on_next_fetch:
+            # Pages fetched ahead are dropped
             raise StopIteration()
-        return self._next()
+
+        if self._pages is None:
+            # Fetching on copy (passed to fetch_callback), so cursor and counters
+            # of iterator are changed on page consumption, same as without prefetch
+            fetcher = copy(self)
+            fetcher.prefetch, fetcher._iterable = 0, []
+            self._pages, self._slots = Queue(), Semaphore(self.prefetch)
+            # Items count, after which iterator stops fetching
+            stop_count = min(self.max_count, self.max_count_to_stop_fetch)
+            Thread(target=self._prefetch_worker,
+                   args=(ref(self), fetcher, self._pages, self._slots,
+                         self.count + len(self._iterable), stop_count),
+                   daemon=True).start()
+
+        page, state = self._pages.get()
+        self.__dict__.update(state)
+        if not isinstance(page, list):
+            self._pages.put((None, state))  # for next calls
+            if page is None:
+                raise StopIteration()
+            raise page
+        self._slots.release()
+        self._iterable = page
+
+    def close(self):
+        """
+        Stops prefetching pages, not consumed pages are dropped.
+        """
+        if getattr(self, '_pages', None) is not None:
+            self._pages = None
+            self._slots.release()  # wakes worker waiting for free slot
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def next(self):
+        try:
+            if self._iterable:
+                return self._next()
+
+            if self.prefetch:
+                self._fetch_prefetched()
+            else:
+                self._fetch_items()
+
+            if not self._iterable:
+                raise StopIteration()
+            return self._next()
+        except StopIteration:
+            # Worker waiting for free slot is stopped on exhaustion
+            self.close()
+            raise
+
+
+class AsyncCursorFetchIterator(CursorFetchIterator):
+    """
+    CursorFetchIterator for `async for`, with coroutine fetch_callback(iterator).
+    Waits are asyncio.sleep, prefetch is not supported.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.prefetch:
+            raise ValueError('prefetch is not supported by AsyncCursorFetchIterator')
+
+    async def _fetch(self):
+        if self._fetch_callback:
+            return await self._fetch_callback(self)
+        raise NotImplementedError()
+
+    async def _fetch_next(self):
+        # Returns False if nothing to fetch (StopIteration could not be raised by coroutine)
+        if not self._can_fetch():
+            return False
+
+        if self.fetch_count and self.fetch_wait_seconds:
+            await asyncio.sleep(self.fetch_wait_seconds)
+        self._start_fetch()
+        self._set_fetched(await self._fetch())
+        return True
+
+    async def _fetch_items(self):
+        if not await self._fetch_next():
+            return
+
+        if not self._iterable and self.has_more:
+            for i in range(self.empty_fetch_retries):
+                if self.logger:
+                    self.logger.debug('Retrying(%s) fetch on empty list', i + 1)
+                if self.empty_fetch_wait_seconds:
+                    await asyncio.sleep(self.empty_fetch_wait_seconds)
+                if not await self._fetch_next():
+                    return
+                if self._iterable:
+                    break
+            else:
+                raise self._empty_fetch_error()
+
+    def next(self):
+        raise TypeError('Use "async for" with AsyncCursorFetchIterator')
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._iterable:
+            await self._fetch_items()
+        try:
+            if self._iterable:
+                return self._next()
+        except StopIteration:
+            pass
+        raise StopAsyncIteration()
+
+
+class ParallelFetchIterator:
+    """
+    Iterator over pages fetched concurrently, for APIs paginated by offset or page number.
+    fetch_callback(iterator, page) returns items of page, pages are numbered from `start`.
+    First page is fetched before others, so callback may set iterator.total (items count)
+    or iterator.pages (pages count) from response. Otherwise pages are fetched
+    until page shorter than page_size (defaults to first page length) is returned,
+    pages fetched ahead past it are dropped.
+    Requests made by callback are limited by client ratelimiters as usual.
+    """
+    def __init__(self, fetch_callback=None, start=0, pages=None, total=None, page_size=None,
+                 concurrency=10, ordered=True, max_count=None, max_fetch_count=None,
+                 logger=None):
+        self._fetch_callback = fetch_callback
+        self.start = start
+        self.pages = pages
+        self.total = total
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.max_count = (max_count is None) and float('inf') or max_count
+        self.max_fetch_count = ((max_fetch_count is None) and float('inf')
+                                or max_fetch_count)
+        self.logger = logger
+
+        self.fetch_count = 0
+        self.count = 0
+        self._end = float('inf')  # page after last one
+        self._lock = Lock()
+        self._items = None
+
+    def _fetch(self, page):
+        if self._fetch_callback:
+            return self._fetch_callback(self, page)
+        raise NotImplementedError()
+
+    def _fetch_page(self, page):
+        with self._lock:
+            self.fetch_count += 1
+        items = list(self._fetch(page) or ())
+        if self.logger:
+            self.logger.debug('Fetched %d items page=%d fetch_count=%d',
+                              len(items), page, self.fetch_count)
+        if self.page_size and len(items) < self.page_size:
+            # Last page, next pages are not fetched
+            with self._lock:
+                self._end = min(self._end, page + 1)
+        return items
+
+    def _get_end(self):
+        end = self.start + min(self.max_fetch_count, ceil(self.max_count / self.page_size)
+                               if self.max_count != float('inf') else float('inf'))
+        if self.pages is not None:
+            end = min(end, self.start + self.pages)
+        elif self.total is not None:
+            end = min(end, self.start + ceil(self.total / self.page_size))
+        return end
+
+    def _take(self, items):
+        for item in items:
+            if self.count >= self.max_count:
+                return
+            self.count += 1
+            yield item
+
+    def _iter_items(self):
+        if not self.max_count or not self.max_fetch_count:
+            return
+        items = self._fetch_page(self.start)
+        self.page_size = self.page_size or len(items)
+        if not items:
+            return
+        self._end = min(self._end, self._get_end())
+        yield from self._take(items)
+
+        pages = takewhile(lambda page: page < self._end, counter(self.start + 1))
+        results = imap(self._fetch_page, pages, self.concurrency, self.ordered)
+        short_pages = []
+        try:
+            for index, items, exc in results:
+                if exc is not None:
+                    raise exc
+                page = self.start + 1 + index
+                if page >= self._end:
+                    # Fetched ahead past last page, API may return last page again for it
+                    continue
+                if not self.ordered and len(items) < self.page_size:
+                    # May be past last page, while previous pages are in progress
+                    short_pages.append((page, items))
+                    continue
+                yield from self._take(items)
+                if self.count >= self.max_count:
+                    return
+            for page, items in short_pages:
+                if page < self._end:
+                    yield from self._take(items)
+        finally:
+            # Waiting for pages in progress
+            close = getattr(results, 'close', None)
+            if close:
+                close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.next()
+
+    def next(self):
+        if self._items is None:
+            self._items = self._iter_items()
+        return next(self._items)
+
+    def close(self):
+        if self._items is not None:
+            self._items.close()
@@ -67,7 +67,8 @@ class ClientError(Exception):
 
 
 class RetryExceeded(ClientError):
-    def __init__(self, result, msg=None, retry_ident=None, retry_count=None):
+    def __init__(self, result, msg=None, retry_ident=None, retry_count=None,
+                 retries=None, backoff_seconds=None):
 
         if isinstance(result, ClientError):
             resp = result.resp
@@ -83,12 +84,16 @@ class RetryExceeded(ClientError):
         self.result = result
         self.retry_ident = retry_ident
         self.retry_count = retry_count
+        self.retries = retries  # total retries made for all reasons
+        self.backoff_seconds = backoff_seconds  # total seconds slept before retries
         self.reason = retry_ident != 'default' and retry_ident or reason or 'default'
 
-        super().__init__(resp, msg, retry_ident, retry_count)
+        super().__init__(resp, msg, retry_ident, retry_count, retries, backoff_seconds)
 
     def get_message(self, full=False):
         msg = 'Retries({}) on "{}" exceeded'.format(self.retry_count, self.reason)
+        if self.backoff_seconds:
+            msg += ' after {:.3f} seconds backoff'.format(self.backoff_seconds)
         return self.msg and '{}: {}'.format(msg, self.msg) or msg
 
 
@@ -143,6 +148,21 @@ class RatelimitError(TemporaryError):
     pass
 
 
+class CircuitOpenError(ClientError):
+    """
+    Request was not sent, because circuit breaker is open for this host (key).
+    """
+    def __init__(self, resp=None, msg=None, key=None, retry_after=None):
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(resp, msg, key, retry_after)
+
+    def get_message(self, full=False):
+        msg = 'Circuit open for {} (retry after {:.1f} seconds)'.format(
+            self.key, self.retry_after or 0)
+        return self.msg and '{}: {}'.format(msg, self.msg) or msg
+
+
 class AuthError(ClientError):
     """
     This is critical to client exceptions.
@@ -1,9 +1,13 @@
 from copy import deepcopy
+from datetime import datetime, timedelta
 
 from marshmallow import fields
 from dateutil.tz import UTC
 
-from .utils import import_string, resolve_obj_path, from_timestamp, to_timestamp, get_tz
+from .utils import import_string, resolve_obj_path, get_tz
+
+
+EPOCH = datetime(1970, 1, 1)
 
 
 class TimestampField(fields.Field):
@@ -23,6 +27,10 @@ class TimestampField(fields.Field):
         because 1 millisecond is 1000 microseconds.  Defaults to `False`.
     :param kwargs: The same keyword arguments that :class:`Field` receives.
     """
+    default_error_messages = {
+        'invalid': 'Not a valid timestamp.',
+    }
+
     def __init__(self, timezone=UTC, ms=False, naive=False, as_int=False, zero_as_none=False,
                  **kwargs):
         self.timezone = get_tz(timezone)
@@ -30,23 +38,57 @@ class TimestampField(fields.Field):
         self.naive = naive
         self.as_int = as_int
         self.zero_as_none = zero_as_none
+        # Same as utils.from_timestamp: timestamp is in timezone,
+        # so datetime is epoch in timezone + timedelta (without tz conversions)
+        self.epoch = EPOCH if naive else EPOCH.replace(tzinfo=self.timezone)
         super(TimestampField, self).__init__(**kwargs)
 
     def _serialize(self, value, attr, obj):
+        # Same as utils.to_timestamp, with exact integer arithmetic for as_int
         if value is None:
             return None
-        value = to_timestamp(value, self.timezone, self.ms)
-        return int(value) if self.as_int else value
+        if value.tzinfo is not None:
+            value = value.astimezone(self.timezone).replace(tzinfo=None)
+        delta = value - EPOCH
+        if not self.as_int:
+            return delta.total_seconds() * (1000 if self.ms else 1)
+        # int() of float timestamp is truncated towards zero
+        value = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+        return abs(value) // (1000 if self.ms else 1000000) * (1 if value >= 0 else -1)
 
     def _deserialize(self, value, attr, data):
         if self.zero_as_none and value == 0:
             return None
         try:
-            return from_timestamp(value, None if self.naive else self.timezone, self.ms)
+            if type(value) is int:
+                delta = timedelta(0, 0, 0, value) if self.ms else timedelta(0, value)
+            else:
+                value = float(value)
+                delta = timedelta(seconds=value / 1000 if self.ms else value)
+            return self.epoch + delta
         except (ValueError, OverflowError, OSError):
-            # Timestamp exceeds limits, ValueError needed for Python < 3.3
+            # Timestamp exceeds limits
             self.fail('invalid')
 
+    def deserialize_many(self, values):
+        """
+        Same as _deserialize for each value, but faster for int timestamps,
+        None values are kept.
+        """
+        if all(type(value) is int or value is None for value in values):
+            epoch, zero = self.epoch, 0 if self.zero_as_none else None
+            try:
+                if self.ms:
+                    return [None if value is None or value == zero
+                            else epoch + timedelta(0, 0, 0, value) for value in values]
+                return [None if value is None or value == zero
+                        else epoch + timedelta(0, value) for value in values]
+            except OverflowError:
+                # Not valid timestamp, error is raised below
+                pass
+        return [None if value is None else self._deserialize(value, None, None)
+                for value in values]
+
 
 class SchemedEntityField(fields.Nested):
     def __init__(self, entity, **kwargs):
@@ -76,8 +118,8 @@ class SchemedEntityField(fields.Nested):
             return import_string(entity)
         return entity
 
-    def _deserialize(self, value, attr, data):
-        data = super()._deserialize(value, attr, data)
+    def _deserialize(self, value, attr, data, **kwargs):
+        data = super()._deserialize(value, attr, data, **kwargs)
         if self.many:
             return [self.entity(**data_) for data_ in data]
         return self.entity(**data)
@@ -0,0 +1,181 @@
+import json
+from json import JSONDecodeError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec:
+    """
+    Stdlib json codec. loads accepts str or bytes, dumps returns utf-8 bytes.
+    Decode errors are always json.JSONDecodeError.
+    """
+    name = 'json'
+
+    def __repr__(self):
+        return '<{}>'.format(self.__class__.__name__)
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, default=None, indent=None, allow_nan=True):
+        # allow_nan=False raises ValueError for nan and infinity, as requests does
+        return json.dumps(obj, default=default, indent=indent, ensure_ascii=False,
+                          allow_nan=allow_nan,
+                          separators=(',', ': ') if indent else (',', ':')).encode('utf-8')
+
+
+def _has_non_finite(obj):
+    if type(obj) is float:
+        # value - value is not zero for nan and infinity
+        return obj - obj != 0
+    elif isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    elif isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    return False
+
+
+# Digits to "0", float parts to ".", other bytes (except minus) to spaces,
+# to find integers out of 64 bit range
+_DIGITS_TABLE = bytes(48 if 48 <= c <= 57 else 46 if c in b'.eE' else c if c == 45 else 32
+                      for c in range(256))
+_LONG_NUMBER = b'0' * 20
+# orjson decodes integers up to 2 ** 64 - 1, but only down to -2 ** 63
+_NEGATIVE_NUMBER, _MIN_NUMBER = b' -' + b'0' * 19, b'9223372036854775808'
+
+
+def _has_long_integer(data, offset=0, end=None):
+    # Numbers start after space (translated separator), while float parts start after "."
+    numbers = (data[offset - 1:end] if offset else b' ' + data[:end]).translate(_DIGITS_TABLE)
+    pos = numbers.find(_LONG_NUMBER)
+    while pos != -1:
+        if numbers[pos - 1:pos] == b' ' or numbers[pos - 2:pos] == b' -':
+            return True
+        pos = numbers.find(_LONG_NUMBER, pos + 20)
+    # Negative numbers out of range start with 9, numbers[index] is byte before minus
+    pos = data.find(b'-9', offset, end)
+    while pos != -1:
+        index = pos - offset
+        if (numbers[index:index + 21] == _NEGATIVE_NUMBER and numbers[index + 21:index + 22] != b'.'
+                and data[pos + 1:pos + 20] > _MIN_NUMBER):
+            return True
+        pos = data.find(b'-9', pos + 2, end)
+    return False
+
+
+def _has_long_number(data):
+    """
+    Checks data for integers with 20 digits and negative 19 digits integers out of 64 bit
+    range. Such number has digits on two positions in a row in each 9th byte sample,
+    so only sampled positions are checked on common path.
+    """
+    sample = data[::9].translate(_DIGITS_TABLE)
+    pos = sample.find(b'00')
+    for _ in range(16):
+        if pos == -1:
+            return False
+        start = pos * 9
+        offset = max(start - 20, 0)
+        if offset and _LONG_NUMBER in data[offset - 1:start].translate(_DIGITS_TABLE):
+            # Digits run starts before checked window
+            break
+        if _has_long_integer(data, offset, start + 21):
+            return True
+        pos = sample.find(b'00', pos + 1)
+    # Many long numbers (floats or ids for example), checking all data
+    return _has_long_integer(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Falls back to stdlib json for data orjson handles differently:
+    integers out of 64 bit range, nan and infinity, not supported types (namedtuple).
+    """
+    name = 'orjson'
+
+    def loads(self, data):
+        try:
+            rv = orjson.loads(data)
+        except orjson.JSONDecodeError as exc:
+            # NaN and Infinity are supported by stdlib json
+            try:
+                return json.loads(data)
+            except JSONDecodeError:
+                raise
+            except ValueError:
+                # Not utf-8 bytes
+                raise exc
+        # Integers out of 64 bit range are decoded by orjson as floats
+        if _has_long_number(data if isinstance(data, bytes) else data.encode('utf-8', 'replace')):
+            return json.loads(data)
+        return rv
+
+    def dumps(self, obj, default=None, indent=None, allow_nan=True):
+        if indent not in (None, 2):
+            # Only 2 spaces indent is supported
+            return super().dumps(obj, default, indent, allow_nan)
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            rv = orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            return super().dumps(obj, default, indent, allow_nan)
+        # nan and infinity are encoded as null
+        if b'null' in rv and _has_non_finite(obj):
+            return super().dumps(obj, default, indent, allow_nan)
+        return rv
+
+
+class UjsonCodec(JSONCodec):
+    name = 'ujson'
+
+    def loads(self, data):
+        try:
+            return ujson.loads(data)
+        except ValueError as exc:
+            if isinstance(data, bytes):
+                data = data.decode('utf-8', 'replace')
+            raise JSONDecodeError(str(exc), data, 0)
+
+    def dumps(self, obj, default=None, indent=None, allow_nan=True):
+        try:
+            # ujson>=5 encodes nan and infinity unless allow_nan=False,
+            # they are passed to stdlib json to respect allow_nan argument
+            return ujson.dumps(obj, default=default, indent=indent or 0, ensure_ascii=False,
+                               escape_forward_slashes=False,
+                               allow_nan=False).encode('utf-8')
+        except (TypeError, OverflowError):
+            # Big integers, nan and infinity
+            return super().dumps(obj, default, indent, allow_nan)
+
+
+CODECS = {
+    'orjson': orjson and OrjsonCodec,
+    'ujson': ujson and UjsonCodec,
+    'json': JSONCodec,
+}
+
+
+def get_codec(codec=None):
+    """
+    Returns codec instance by name, or fastest installed codec if codec is None.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None:
+        return next(cls for cls in CODECS.values() if cls)()
+    if codec not in CODECS:
+        raise ValueError('Unknown json codec: {}'.format(codec))
+    if not CODECS[codec]:
+        raise ImportError('{} is not installed'.format(codec))
+    return CODECS[codec]()
+
+
+default_codec = get_codec()
@@ -0,0 +1,198 @@
+import codecs
+import re
+from json import JSONDecoder, JSONDecodeError
+
+from .utils import AttrDict
+
+
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARS = '0123456789+-.eE'
+# Skips to next bracket, or to start of string not terminated in buffer
+SKIP_TO_BRACKET_RE = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}"])')
+STRING_TOKENS_RE = re.compile(r'["\\]')
+
+
+class JSONPathError(ValueError):
+    pass
+
+
+class JSONStreamReader:
+    """
+    Incremental JSON reader over chunks iterable (bytes or str), keeps in memory
+    only not yet parsed part of document. Values are decoded with stdlib decoder,
+    objects are created as AttrDict.
+    """
+    def __init__(self, chunks, encoding='utf-8', object_pairs_hook=AttrDict):
+        self.chunks = iter(chunks)
+        self.decoder = JSONDecoder(object_pairs_hook=object_pairs_hook)
+        self._text_decoder = codecs.getincrementaldecoder(encoding)('strict')
+        self.buf, self.pos, self.eof = '', 0, False
+
+    def read(self, min_size=0):
+        """
+        Appends chunks to buffer until it's at least min_size, returns False on eof.
+        """
+        self.buf, self.pos = self.buf[self.pos:], 0
+        while True:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                self.buf += self._text_decoder.decode(b'', final=True)
+                self.eof = True
+                return False
+            self.buf += (chunk if isinstance(chunk, str)
+                         else self._text_decoder.decode(chunk))
+            if len(self.buf) >= min_size:
+                return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.read():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise JSONDecodeError('Expecting {!r}'.format(chars), self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def decode_value(self):
+        if self.peek() in ('{', '[', '"'):
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+            except JSONDecodeError:
+                # Value is not in buffer, reading to the end of value to parse it only once
+                self._scan_value()
+                value, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+            return value
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except JSONDecodeError:
+                if self.eof:
+                    raise
+                # Doubling buffer, so big values are not reparsed too many times
+                self.read(2 * (len(self.buf) - self.pos))
+                continue
+            # Number may continue in next chunk ("1" of "1e10" is decoded as 1)
+            if not self.eof and not self.buf[end:].lstrip(NUMBER_CHARS):
+                self.read()
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        """
+        Moves past value without decoding it and keeping it in buffer.
+        Container and string values are not validated.
+        """
+        if self.peek() in ('{', '[', '"'):
+            self.pos = self._scan_value(keep=False)
+        else:
+            self.decode_value()
+
+    def _scan_value(self, keep=True):
+        """
+        Reads chunks until end of container or string value at pos, tracking only
+        brackets depth and strings state. Returns end position of value.
+        If not keep, scanned part of value is dropped from buffer.
+        """
+        in_string = self.buf[self.pos] == '"'
+        depth, i = 0 if in_string else 1, self.pos + 1
+        while True:
+            if in_string:
+                match = STRING_TOKENS_RE.search(self.buf, i)
+            else:
+                match = SKIP_TO_BRACKET_RE.match(self.buf, i)
+            if not match:
+                # No quotes or brackets till the end, escaped char may be in next chunk
+                i = max(i, len(self.buf))
+                if not keep:
+                    self.pos = len(self.buf)
+                i -= self.pos
+                if not self.read():
+                    raise JSONDecodeError('Unterminated value', self.buf, len(self.buf))
+                continue
+            i = match.end()
+            char = self.buf[i - 1]
+            if in_string:
+                if char == '\\':
+                    i += 1
+                    continue
+                in_string = False
+            elif char == '"':
+                in_string = True
+                continue
+            elif char in '[{':
+                depth += 1
+                continue
+            else:
+                depth -= 1
+            if not depth:
+                return i
+
+    def seek(self, path):
+        """
+        Moves to value at dot separated path (same as utils.resolve_obj_path).
+        """
+        for key in path.split('.') if path else ():
+            char = self.peek()
+            if char not in ('{', '['):
+                raise JSONPathError('Could not resolve "{}" on value'.format(key))
+            self.pos += 1
+            if char == '{':
+                while self.peek() != '}':
+                    if self.decode_value() == key:
+                        self.expect(':')
+                        break
+                    self.expect(':')
+                    self.skip_value()
+                    if self.expect(',}') == '}':
+                        self.pos -= 1
+                else:
+                    raise JSONPathError('Could not resolve "{}" on object'.format(key))
+            else:
+                if not key.isdigit():
+                    raise JSONPathError('Could not resolve "{}" on array'.format(key))
+                for _ in range(int(key)):
+                    if self.peek() == ']':
+                        break
+                    self.skip_value()
+                    if self.expect(',]') == ']':
+                        self.pos -= 1
+                if self.peek() == ']':
+                    raise JSONPathError('Could not resolve "{}" on array'.format(key))
+
+    def load(self, path=None):
+        self.seek(path)
+        return self.decode_value()
+
+    def iter_items(self, path=None):
+        self.seek(path)
+        self.expect('[')
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.decode_value()
+            if self.expect(',]') == ']':
+                return
+
+
+def load_path(chunks, path=None, encoding='utf-8'):
+    """
+    Returns value at path from JSON document chunks,
+    without materializing other parts of document.
+    """
+    return JSONStreamReader(chunks, encoding).load(path)
+
+
+def iter_path_items(chunks, path=None, encoding='utf-8'):
+    """
+    Yields items of array at path from JSON document chunks one by one.
+    """
+    return JSONStreamReader(chunks, encoding).iter_items(path)
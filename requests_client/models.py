@@ -1,9 +1,11 @@
+from abc import ABCMeta
 from collections import OrderedDict
 from copy import deepcopy
+from types import MemberDescriptorType
 
 from marshmallow import Schema, missing
 
-from .utils import ReprMixin, class_or_instance_property
+from .utils import BaseReprMixin, class_or_instance_property
 from .schemas import get_declared_fields
 
 
@@ -30,25 +32,47 @@ def _maybe_to_dict(value):
 DEFAULT_SLOTS = ['_entity', '_meta']
 
 
-class Entity(ReprMixin):
+class EntityMeta(ABCMeta):
+    """
+    Instances of classes with declared __slots__ have __dict__ too, same as
+    with not slotted bases. Classes are fully slotted only if created with
+    `slotted=True` (bases with empty slots and generated SchemedEntity slots).
+    Derived from ABCMeta, so entities may be mixed with abstract base classes.
+    """
+    def __new__(metacls, cls, bases, classdict, slotted=False):
+        declared = slots = classdict.get('__slots__')
+        if (not slotted and slots is not None and slots is not True
+           and not any(base.__dictoffset__ for base in bases)):
+            slots = (slots,) if isinstance(slots, str) else tuple(slots)
+            if '__dict__' not in slots:
+                classdict = dict(classdict, __slots__=slots + ('__dict__',))
+        new_cls = super().__new__(metacls, cls, bases, classdict)
+        if classdict.get('__slots__') is not declared:
+            # Declared slots are used as entity fields (for __init__ check and update)
+            new_cls.__slots__ = declared
+        return new_cls
+
+    def __init__(cls, name, bases, classdict, slotted=False):
+        super().__init__(name, bases, classdict)
+
+
+class Entity(BaseReprMixin, metaclass=EntityMeta, slotted=True):
+    # Empty slots, so subclasses may be fully slotted (without __dict__)
+    __slots__ = ()
+    # Instance attributes which are not fields, added to generated slots
+    _extra_slots = tuple(DEFAULT_SLOTS)
+
     def __init__(self, **kwargs):
+        # If some parent class has no __slots__, instance has __dict__,
+        # so attributes are checked against __slots__ explicitly
+        check_slots = self.__slots__ and type(self).__dictoffset__
         for k, v in kwargs.items():
-            if hasattr(self, '__slots__') and k not in self.__slots__:
+            if check_slots and k not in self.__slots__:
+                raise AttributeError('Unknown attribute "%s" on %s' % (k, self.__class__))
+            try:
+                setattr(self, k, v)
+            except AttributeError:
                 raise AttributeError('Unknown attribute "%s" on %s' % (k, self.__class__))
-            setattr(self, k, v)
-
-        # TODO: Consider code above as hotfix.
-        # Code below will not work because of tricky __slots__ inheritance.
-        # If some parent class has no __slots__, instance will always
-        # have __dict__ attribute. What we need is split SlottedEntity
-        # and regular Entity, also remove DEFAULT_SLOTS (as it actually can be inherited),
-        # and populate _fields not from self.__slots__, but also from slotted parents.
-
-        # for k, v in kwargs.items():
-        #     try:
-        #         setattr(self, k, v)
-        #     except AttributeError:
-        #         raise AttributeError('Unknown attribute %s on %s' % (k, self.__class__))
 
     def __contains__(self, key):
         return hasattr(self, key)
@@ -61,8 +85,7 @@ class Entity(ReprMixin):
 
     @class_or_instance_property
     def _fields(self):
-        if hasattr(self, '__slots__'):
-            return self.__slots__
+        return self.__slots__ or None
 
     def update(self, other):
         if isinstance(other, dict):
@@ -92,26 +115,50 @@ class Entity(ReprMixin):
         }
 
 
-class SchemedEntityMeta(type):
-    def __new__(metacls, cls, bases, classdict):
-
-        # TODO: allow SchemedEntity to have dynamic slots
-        # based on fields. Note that __slots__ should be defined
-        # before super().__new__
-
-        # if classdict['__slots__'] is True:
-        #     classdict['__slots__'] = tuple(declared_fields)
-        # elif classdict['__slots__'] is False:
-        #     del new_cls.__slots__  # default
-
-        new_cls = super().__new__(metacls, cls, bases, classdict)
-
-        if isinstance(new_cls.schema, type):
-            new_cls.schema = new_cls.schema()
-        new_cls.schema = deepcopy(new_cls.schema)
+def _get_slots(classes):
+    # Names of slots defined by classes
+    return {
+        name for klass in classes for name in vars(klass)
+        if isinstance(vars(klass)[name], MemberDescriptorType)
+    }
+
+
+class SchemedEntityMeta(EntityMeta):
+    """
+    Set `__slots__ = True` on class to generate slots from schema fields
+    (and `_extra_slots` of bases), so instances are created without __dict__.
+    For instances to be fully slotted all bases should have __slots__ too.
+    """
+    def __new__(metacls, cls, bases, classdict, slotted=False):
+        generated = classdict.get('__slots__') is True
+        if generated:
+            # Fields are collected from plain class, as class attributes
+            # can't be defined with same name as slots
+            probe = ABCMeta.__new__(metacls, cls, bases, dict(classdict, __slots__=()))
+            declared_fields = get_declared_fields(probe)
+
+            schema = probe.schema
+            names = [name for name, _ in declared_fields]
+            names += (schema._declared_fields if isinstance(schema, type)
+                      else schema.declared_fields)
+            names += [name for base in probe.__mro__
+                      for name in vars(base).get('_extra_slots', ())]
+            inherited_slots = _get_slots(probe.__mro__[1:])
+            classdict = {k: v for k, v in classdict.items() if k not in names}
+            classdict['__slots__'] = tuple(OrderedDict.fromkeys(
+                name for name in names if name not in inherited_slots))
+
+        new_cls = super().__new__(metacls, cls, bases, classdict,
+                                  slotted=slotted or generated)
+
+        schema = new_cls.schema
+        if isinstance(schema, type):
+            schema = schema()
+        # Inherited fields are not copied, as they are replaced below
+        new_cls.schema = deepcopy(schema, {id(schema.declared_fields): {}, id(schema.fields): {}})
         new_cls.schema.entity = new_cls  # TODO: weakref?
 
-        fields = OrderedDict(get_declared_fields(new_cls))
+        fields = OrderedDict(declared_fields if generated else get_declared_fields(new_cls))
         fields.update(new_cls.schema.declared_fields)
         fields = deepcopy(fields)
         for field in fields.values():
@@ -126,16 +173,69 @@ class SchemedEntityMeta(type):
 
         assert all(f.parent for f in new_cls.schema.fields.values())
 
+        slots = _get_slots(new_cls.__mro__)
         for field_name in new_cls.schema.fields:
-            # For entity.field is missing and not 'field' in entity
-            setattr(new_cls, field_name, missing)
+            # For entity.field is missing and not 'field' in entity,
+            # for slots it's done in __getattr__
+            if field_name not in slots:
+                setattr(new_cls, field_name, missing)
 
         return new_cls
 
 
-class SchemedEntity(Entity, metaclass=SchemedEntityMeta):
+def _create_constructor(cls):
+    """
+    Returns constructor(kwargs) for cls, same as cls(**kwargs) but with
+    precomputed defaults and attributes, used for bulk instances creation.
+    """
+    if (cls.__new__ is not object.__new__ or cls.__setattr__ is not object.__setattr__
+       or cls.__init__ is not SchemedEntity.__init__):
+        return lambda kwargs: cls(**kwargs)
+
+    new = object.__new__
+    defaults = tuple((name, field.default) for name, field in cls.schema.fields.items()
+                     if field.default is not missing)
+
+    if not cls.__dictoffset__:
+        # Fully slotted, unknown attributes (or properties) are processed by __init__
+        slots = frozenset(_get_slots(cls.__mro__))
+
+        def constructor(kwargs):
+            if not slots.issuperset(kwargs):
+                return cls(**kwargs)
+            obj = new(cls)
+            for name, value in kwargs.items():
+                setattr(obj, name, value)
+            for name, value in defaults:
+                if name not in kwargs:
+                    setattr(obj, name, value)
+            return obj
+        return constructor
+
+    # Attributes set by descriptors (properties, slots) on __init__
+    descriptors = frozenset(
+        name for klass in cls.__mro__ for name, attr in vars(klass).items()
+        if hasattr(type(attr), '__set__')
+    )
+    allowed = frozenset(cls.__slots__) if cls.__slots__ else None
+
+    def constructor(kwargs):
+        if not descriptors.isdisjoint(kwargs) or (allowed is not None
+                                                  and not allowed.issuperset(kwargs)):
+            return cls(**kwargs)
+        obj = new(cls)
+        attrs = obj.__dict__
+        attrs.update(kwargs)
+        for name, value in defaults:
+            if name not in attrs:
+                attrs[name] = value
+        return obj
+    return constructor
+
+
+class SchemedEntity(Entity, metaclass=SchemedEntityMeta, slotted=True):
+    __slots__ = ()
     schema = Schema()
-    # __slots__ = False
 
     def __init__(self, **kwargs):
         for name, field in self.schema.fields.items():
@@ -143,6 +243,31 @@ class SchemedEntity(Entity, metaclass=SchemedEntityMeta):
                 kwargs.setdefault(name, field.default)
         super().__init__(**kwargs)
 
+    def __getattr__(self, name):
+        # Called only for not set slots: fields are missing,
+        # other attributes are resolved to class defaults (like BindedEntityMixin._client)
+        cls = type(self)
+        if name in cls.schema.fields:
+            return missing
+        for klass in cls.__mro__:
+            value = vars(klass).get(name, missing)
+            if value is not missing and not isinstance(value, MemberDescriptorType):
+                return value
+        raise AttributeError(name)
+
+    def __getstate__(self):
+        # Only set slots are saved, otherwise missing from __getattr__ would be pickled
+        cls = type(self)
+        slots = {}
+        for klass in cls.__mro__:
+            for name, attr in vars(klass).items():
+                if isinstance(attr, MemberDescriptorType) and name not in slots:
+                    try:
+                        slots[name] = attr.__get__(self, cls)
+                    except AttributeError:
+                        pass
+        return (self.__dict__ if cls.__dictoffset__ else None), slots
+
     @class_or_instance_property
     def _fields(self):
         return self.schema.fields
@@ -151,13 +276,23 @@ class SchemedEntity(Entity, metaclass=SchemedEntityMeta):
         assert not many
         return self.schema.dump(self, **kwargs)
 
+    @classmethod
+    def create_many(cls, items):
+        """
+        Same as tuple(cls(**kwargs) for kwargs in items), but faster.
+        """
+        # Constructor is created once per class (not inherited)
+        constructor = vars(cls).get('_constructor')
+        if constructor is None:
+            constructor = cls._constructor = _create_constructor(cls)
+        return tuple(map(constructor, items))
+
     @classmethod
     def load(cls, data, many=False, **kwargs):
         if not many:
             return cls(**cls.schema.load(data, **kwargs))
         else:
-            return tuple(cls(**item) for item
-                         in cls.schema.load(data, many=many, **kwargs))
+            return cls.create_many(cls.schema.load(data, many=many, **kwargs))
 
     @classmethod
     def __deepcopy__(cls, memo):
@@ -171,6 +306,8 @@ class SchemedEntity(Entity, metaclass=SchemedEntityMeta):
 
 
 class BindedEntityMixin:
+    __slots__ = ()
+    _extra_slots = ('_client',)
     _client = None  # TODO: weakref on bind?
 
     @class_or_instance_property
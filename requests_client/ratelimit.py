@@ -0,0 +1,271 @@
+import logging
+import re
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, time
+
+from .storage import RedisStorage, redis
+
+
+logger = logging.getLogger(__name__)
+
+
+# GCRA (generic cell rate algorithm) with reservation: theoretical arrival time (TAT)
+# is always moved forward, and caller waits until its slot.
+# Redis server time is used (if clock time is not passed), so clock is the same for all nodes.
+GCRA_LUA = '''
+if redis.replicate_commands then redis.replicate_commands() end
+local now = tonumber(ARGV[4])
+if not now then
+  local time = redis.call('TIME')
+  now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+end
+local interval, burst, tokens = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or 0)
+if tat < now then tat = now end
+tat = tat + interval * tokens
+redis.call('SET', KEYS[1], string.format('%.6f', tat),
+           'PX', math.ceil((tat - now) * 1000) + 1)
+local wait = tat - interval * burst - now
+if wait < 0 then wait = 0 end
+return string.format('%.6f', wait)
+'''
+
+
+class BaseRateLimiter:
+    """
+    Rate limiter reserves request slot and returns seconds to wait before sending it,
+    so callers (threads, greenlets or coroutines) sleep themselves,
+    and limiter is never blocked. Instance may be shared between clients.
+    """
+    # True if reserve makes network calls, so async client runs it in executor
+    blocking = False
+
+    def reserve(self, tokens=1, key=None):
+        """
+        key is client ratelimit_key (auth_ident by default), it's ignored by local limiters,
+        as limiter instance already defines it's scope.
+        """
+        raise NotImplementedError()
+
+    def drain(self):
+        """
+        Called after response if client has request_wait_since_response,
+        so next request is paced since response received.
+        """
+        pass
+
+
+class TokenBucket(BaseRateLimiter):
+    """
+    Token bucket with `rate` tokens per second and `burst` capacity.
+    Bucket is full on creation. Tokens may go below zero on reserve,
+    which means that callers are queued and wait for refill in order.
+    """
+    def __init__(self, rate, burst=1, clock=monotonic):
+        if rate <= 0:
+            raise ValueError('Rate should be positive: {}'.format(rate))
+        self.rate, self.burst, self.clock = rate, burst, clock
+        self.tokens = burst
+        self.updated_at = clock()
+        self._lock = Lock()
+
+    @classmethod
+    def from_interval(cls, seconds, burst=1, **kwargs):
+        # One token per "seconds" interval, like request_wait_seconds pacing
+        return cls(1 / seconds, burst, **kwargs)
+
+    def __repr__(self):
+        return '<{}(rate={}, burst={}, tokens={:.2f})>'.format(
+            self.__class__.__name__, self.rate, self.burst, self.tokens)
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, tokens=1, key=None):
+        with self._lock:
+            self._refill()
+            self.tokens -= tokens
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def drain(self):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0)
+
+
+class RedisRateLimiter(BaseRateLimiter):
+    """
+    Distributed ratelimiter, shared between processes and nodes with redis (GCRA
+    with `rate` requests per second and `burst` capacity).
+    Limit is kept per key, so with client ratelimit_key it's per auth_ident,
+    and with separate instances (different name) for endpoints it's per endpoint also.
+    If redis is unavailable, local TokenBucket per key is used, and redis is
+    tried again after `fallback_seconds`.
+    Redis server time is used unless `clock` is passed (for tests).
+    """
+    fallback_seconds = 30
+    blocking = True
+
+    def __init__(self, storage, rate, burst=1, name='', fallback_seconds=None, clock=None):
+        if rate <= 0:
+            raise ValueError('Rate should be positive: {}'.format(rate))
+        if not isinstance(storage, RedisStorage):
+            storage = RedisStorage(storage, 'ratelimit_')
+        self.storage, self.rate, self.burst, self.name = storage, rate, burst, name
+        self.clock = clock
+        if fallback_seconds is not None:
+            self.fallback_seconds = fallback_seconds
+        self._script = storage._redis.register_script(GCRA_LUA)
+        self._fallback_until = None
+        self._fallback_buckets = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return '<{}({}, rate={}, burst={})>'.format(
+            self.__class__.__name__, self.storage._build_key(self.name), self.rate, self.burst)
+
+    def _reserve_fallback(self, tokens, key):
+        with self._lock:
+            if key not in self._fallback_buckets:
+                self._fallback_buckets[key] = TokenBucket(
+                    self.rate, self.burst, clock=self.clock or monotonic)
+        return self._fallback_buckets[key].reserve(tokens)
+
+    def reserve(self, tokens=1, key=None):
+        if self._fallback_until and self._fallback_until > monotonic():
+            return self._reserve_fallback(tokens, key)
+
+        try:
+            wait_seconds = self._script(
+                keys=[self.storage._build_key('{}:{}'.format(self.name, key or ''))],
+                args=[1 / self.rate, self.burst, tokens] + ([self.clock()] if self.clock else []))
+        except redis.RedisError as exc:
+            logger.warning('Ratelimit redis failed, using local for %s seconds: %r',
+                           self.fallback_seconds, exc)
+            self._fallback_until = monotonic() + self.fallback_seconds
+            return self._reserve_fallback(tokens, key)
+        self._fallback_until = None
+        return float(wait_seconds)
+
+
+class AdaptiveRateLimiter(BaseRateLimiter):
+    """
+    Pacing model updated from response headers (see parse_ratelimit_headers).
+    Requests are blocked until Retry-After, or until window reset if no requests remaining.
+    When remaining requests are below `pace_ratio` of limit, remaining requests
+    are spread evenly until window reset, so we slow down before ratelimit error.
+    Waits from headers are limited by `max_wait` seconds (if not None),
+    so misparsed reset is not blocking requests forever.
+    """
+    def __init__(self, pace_ratio=0.1, clock=monotonic, max_wait=3600):
+        self.pace_ratio, self.clock, self.max_wait = pace_ratio, clock, max_wait
+        self.blocked_until = None
+        self.limit, self.remaining, self.reset_at = None, None, None
+        self._next_at = clock()
+        self._lock = Lock()
+
+    def __repr__(self):
+        return '<{}(remaining={}, limit={})>'.format(
+            self.__class__.__name__, self.remaining, self.limit)
+
+    def update(self, retry_after=None, limit=None, remaining=None, reset=None):
+        now = self.clock()
+        if self.max_wait is not None:
+            retry_after = retry_after if retry_after is None else min(retry_after, self.max_wait)
+            reset = reset if reset is None else min(reset, self.max_wait)
+        with self._lock:
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until or now, now + retry_after)
+            if remaining is not None and reset is not None:
+                if limit:
+                    self.limit = limit
+                elif self.limit is None or self.reset_at is None or self.reset_at <= now:
+                    # New window, use first remaining as limit if it's not known
+                    self.limit = remaining
+                else:
+                    self.limit = max(self.limit, remaining)
+                self.remaining, self.reset_at = remaining, now + reset
+
+    def reserve(self, tokens=1, key=None):
+        now = self.clock()
+        with self._lock:
+            start_at = max(now, self.blocked_until or now)
+            if self.reset_at is not None and self.reset_at > now:
+                if self.remaining < tokens:
+                    start_at = max(start_at, self.reset_at)
+                elif self.remaining <= self.limit * self.pace_ratio:
+                    start_at = max(start_at, self._next_at)
+                    self._next_at = (start_at + (self.reset_at - start_at)
+                                     / self.remaining * tokens)
+                self.remaining -= tokens
+            return start_at - now
+
+
+def _parse_header_seconds(value):
+    # Seconds delta or HTTP-date (as in Retry-After)
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        return max(parsedate_to_datetime(value).timestamp() - time(), 0)
+
+
+def _parse_reset(value):
+    # Reset is seconds delta, or epoch timestamp in some APIs (for example github),
+    # or epoch timestamp in milliseconds
+    value = float(value)
+    if value > 10 ** 12:
+        value /= 1000
+    return max(value - time(), 0) if value > 10 ** 9 else value
+
+
+def parse_ratelimit_headers(headers):
+    """
+    Parses Retry-After, X-RateLimit-Limit/Remaining/Reset, RateLimit-Limit/Remaining/Reset
+    and IETF draft "RateLimit" header ("limit=10, remaining=5, reset=3"
+    or "default";r=5;t=3 syntax). Returns dict with retry_after and reset in seconds
+    (for AdaptiveRateLimiter.update), values are None if not found or not parsable.
+    """
+    rv = dict(retry_after=None, limit=None, remaining=None, reset=None)
+    if 'Retry-After' in headers:
+        try:
+            rv['retry_after'] = _parse_header_seconds(headers['Retry-After'])
+        except (ValueError, TypeError):
+            pass
+
+    for key, header, parse in (
+        ('limit', 'X-RateLimit-Limit', int),
+        ('remaining', 'X-RateLimit-Remaining', int),
+        ('reset', 'X-RateLimit-Reset', _parse_reset),
+        ('limit', 'RateLimit-Limit', int),
+        ('remaining', 'RateLimit-Remaining', int),
+        ('reset', 'RateLimit-Reset', _parse_reset),
+    ):
+        if header in headers:
+            try:
+                # Multiple policies may be returned, first one is used
+                rv[key] = parse(headers[header].split(',')[0].split(';')[0].strip())
+            except (ValueError, TypeError):
+                pass
+
+    if 'RateLimit' in headers:
+        for key, value in re.findall(r'(\w+)=(\d+)', headers['RateLimit']):
+            key = {'r': 'remaining', 't': 'reset', 'l': 'limit'}.get(key, key)
+            if key in rv and rv[key] is None:
+                rv[key] = int(value)
+    return rv
+
+
+def get_retry_after(resp):
+    if resp is None:
+        return None
+    return parse_ratelimit_headers(resp.headers)['retry_after']
+
+
+def reserve_all(ratelimiters, tokens=1, key=None):
+    """
+    Reserves slot in all ratelimiters (None is skipped), returns max wait seconds.
+    """
+    return max([limiter.reserve(tokens, key) for limiter in ratelimiters if limiter] or [0])
@@ -1,9 +1,13 @@
 import copy
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 import marshmallow as ma
 from marshmallow.base import FieldABC
 from marshmallow.schema import _get_fields, _get_fields_by_mro
-from marshmallow.utils import EXCLUDE
+from marshmallow.utils import EXCLUDE, RAISE, set_value
 
 from .utils import maybe_attr_dict, pprint
 
@@ -18,14 +22,141 @@ def __obj_fields_iterator(obj):
             yield attr_name, attr
 
 
+def _get_class_state(cls):
+    # Attributes of class and its bases. Values are referenced here,
+    # so comparing states is cheap and detects any class modification
+    # (keys and values are separate tuples, to create less objects tracked by gc)
+    return [(tuple(attrs), tuple(attrs.values())) for attrs in map(vars, cls.__mro__)]
+
+
+def _get_class_fields(state):
+    # Same as dir() and getattr() scan, but descriptors are not called
+    attrs = {}
+    for keys, values in reversed(state):
+        attrs.update(zip(keys, values))
+    return {attr_name: attr for attr_name, attr in attrs.items() if isinstance(attr, FieldABC)}
+
+
+def _update_class_fields(fields, attrs):
+    # Fields of class from fields of its only base and class own attributes
+    fields = dict(fields)
+    for attr_name, attr in attrs.items():
+        if isinstance(attr, FieldABC):
+            fields[attr_name] = attr
+        elif attr_name in fields:
+            del fields[attr_name]
+    return fields
+
+
 def get_declared_fields(cls, base=FieldABC):
-    return (_get_fields(dict(__obj_fields_iterator(cls)), base)
-            + _get_fields_by_mro(cls, base))
+    """
+    Fields declared on class and its bases, cached per class
+    and recalculated if class or its bases were modified.
+    Cache is stored on class itself (so it's not keeping class alive),
+    and cache of single base is reused, so class creation is not scanning all bases.
+    """
+    if not isinstance(cls, type):
+        return (_get_fields(dict(__obj_fields_iterator(cls)), base)
+                + _get_fields_by_mro(cls, base))
+
+    cache = vars(cls).get('_declared_fields_cache')
+    if cache is None:
+        cache = {}
+        try:
+            # Set before state is taken, so state is not changed by it
+            cls._declared_fields_cache = cache
+        except TypeError:
+            pass  # builtin types, not cached
+    state = _get_class_state(cls)
+    cached = cache.get(base)
+    if cached is not None and cached[0] == state:
+        return list(cached[3])
+
+    parent_cached = None
+    if len(cls.__bases__) == 1:
+        parent = cls.__bases__[0]
+        # Updating parent cache, as parent may be modified after it's fields were cached
+        get_declared_fields(parent, base)
+        parent_cached = vars(parent).get('_declared_fields_cache', {}).get(base)
+    if parent_cached is not None and parent_cached[0] == state[1:]:
+        class_fields = _update_class_fields(parent_cached[1], vars(cls))
+        mro_fields = parent_cached[2] + _get_fields(
+            getattr(parent, '_declared_fields', parent.__dict__), base)
+    else:
+        class_fields = _get_class_fields(state)
+        mro_fields = _get_fields_by_mro(cls, base)
+    fields = _get_fields(dict(sorted(class_fields.items())), base) + mro_fields
+    cache[base] = (state, class_fields, mro_fields, fields)
+    return list(fields)
+
+
+_current_context = ContextVar('schema_context', default=None)
+
+
+@contextmanager
+def schema_context(**context):
+    """
+    Sets context for schemas loading in current thread (or task),
+    so shared schema instances are not mutated.
+    """
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
+
+
+class SchemaContext(MutableMapping):
+    """
+    Schema context proxy: values from schema_context() first, then schema own context.
+    Nested schemas get same proxy object, so it's up to date on each load.
+    """
+    def __init__(self, context=None):
+        self.own = context if context is not None else {}
+
+    @property
+    def current(self):
+        return _current_context.get() or {}
+
+    def __repr__(self):
+        return '<{}({!r})>'.format(self.__class__.__name__, dict(self))
+
+    def __bool__(self):
+        # marshmallow creates new dict for falsy context
+        return True
+
+    def __getitem__(self, key):
+        current = self.current
+        return current[key] if key in current else self.own[key]
+
+    def __setitem__(self, key, value):
+        current = _current_context.get()
+        (self.own if current is None else current)[key] = value
+
+    def __delitem__(self, key):
+        current = _current_context.get()
+        del (self.own if current is None else current)[key]
+
+    def __iter__(self):
+        current = self.current
+        yield from current
+        yield from (key for key in self.own if key not in current)
+
+    def __len__(self):
+        return len(set(self.current) | set(self.own))
 
 
 class ResponseSchema(ma.Schema):
     data_path = None
 
+    @property
+    def context(self):
+        return self._context
+
+    @context.setter
+    def context(self, context):
+        self._context = context if isinstance(context, SchemaContext) else SchemaContext(context)
+
     def __init__(self, **kwargs):
         if 'unknown' not in kwargs:
             kwargs['unknown'] = EXCLUDE
@@ -39,6 +170,55 @@ class ResponseSchema(ma.Schema):
 
         super().__init__(**kwargs)
 
+    def _deserialize(self, data, fields_dict, error_store, many=False, partial=False,
+                     unknown=RAISE, **kwargs):
+        columns = None
+        # Column values are set after other fields, so it's not used for ordered schemas
+        if many and not partial and unknown == EXCLUDE and not self.opts.ordered:
+            columns = self._deserialize_columns(data, fields_dict)
+        if not columns:
+            return super()._deserialize(data, fields_dict, error_store, many=many,
+                                        partial=partial, unknown=unknown, **kwargs)
+        fields_dict = {k: v for k, v in fields_dict.items() if k not in columns}
+        rv = super()._deserialize(data, fields_dict, error_store, many=many,
+                                  partial=partial, unknown=unknown, **kwargs)
+        for key, values in columns.values():
+            for item, value in zip(rv, values):
+                if value is not ma.missing:
+                    set_value(item, key, value)
+        return rv
+
+    def _deserialize_columns(self, data, fields_dict):
+        """
+        Deserializes columns of fields with deserialize_many (TimestampField) at once
+        for list of dicts, if column values are valid (so there are no errors to store).
+        Returns {field name: (attribute, values)}.
+        """
+        from .columnar import _is_fast  # columnar imports this module
+
+        names = [name for name, field in fields_dict.items()
+                 if hasattr(field, 'deserialize_many') and not field.dump_only]
+        if not names or not isinstance(data, list):
+            return None
+        if not all(isinstance(item, dict) for item in data):
+            return None
+        columns = {}
+        for name in names:
+            field = fields_dict[name]
+            key = field.data_key or name
+            values = [item.get(key, ma.missing) for item in data]
+            if not _is_fast(field, values):
+                continue
+            try:
+                rv = field.deserialize_many([None if v is ma.missing else v for v in values])
+            except ma.ValidationError:
+                continue
+            if field.missing is ma.missing:
+                # Not set, same as Field.deserialize returning missing
+                rv = [ma.missing if v is ma.missing else value for v, value in zip(values, rv)]
+            columns[name] = (field.attribute or name, rv)
+        return columns
+
     @ma.pre_load()
     def __pre_load(self, data, **kwargs):
         if getattr(self.Meta, 'pdb', False):
@@ -60,6 +240,16 @@ class ResponseSchema(ma.Schema):
             rv._client = self.context['client']
         return rv
 
+    def create_models(self, data):
+        if not hasattr(self.Meta.model, 'create_many'):
+            return tuple(self.create_model(d) for d in data)
+        rv = self.Meta.model.create_many(data)
+        if rv and hasattr(rv[0], '_client'):
+            client = self.context['client']
+            for obj in rv:
+                obj._client = client
+        return rv
+
     @ma.post_load(pass_many=True, pass_original=True)
     def __post_load(self, data, many, original_data, **kwargs):
         if hasattr(self.Meta, 'model'):
@@ -72,7 +262,7 @@ class ResponseSchema(ma.Schema):
                     assert isinstance(original_data, dict)
                     data['_entity'] = original_data
             if many:
-                return tuple(self.create_model(d) for d in data)
+                return self.create_models(data)
             else:
                 return self.create_model(data)
         return maybe_attr_dict(data)
@@ -115,11 +305,41 @@ class DumpKeySchemaMixin:
         return [_replace_keys(v, pairs) for v in data] if many else _replace_keys(data, pairs)
 
 
-def maybe_create_response_schema(schema, inherit=None):
-    inherit = inherit or (ResponseSchema,)
+_schemas_cache = OrderedDict()
+SCHEMAS_CACHE_SIZE = 1024
+
+
+def maybe_create_response_schema(schema, inherit=None, cache=False, **kwargs):
+    """
+    Returns schema instance for schema class or fields dict, cached by (schema, inherit, kwargs).
+    Schemas for fields dicts are added to cache only with `cache=True` (by decorators),
+    as dicts created per call would evict other schemas. Least recently used are evicted.
+    Cached instances are shared, so per load context should be set with schema_context().
+    """
+    if not isinstance(schema, (type, dict)):
+        return schema
+    inherit = tuple(inherit or (ResponseSchema,))
+
+    try:
+        # dict is not hashable, but it's kept in cache value, so id is not reused
+        key = (schema if isinstance(schema, type) else id(schema), inherit,
+               tuple(sorted(kwargs.items())))
+        rv = _schemas_cache[key][1]
+        _schemas_cache.move_to_end(key)
+        return rv
+    except KeyError:
+        pass
+    except TypeError:
+        key = None  # unhashable kwargs, for example "only" list
 
     if isinstance(schema, type):
-        return schema()
-    elif isinstance(schema, dict):
-        return type('_Schema', inherit, schema)()
-    return schema
+        rv = schema(**kwargs)
+    else:
+        rv = type('_Schema', inherit, schema)(**kwargs)
+        if not cache:
+            key = None
+    if key is not None:
+        _schemas_cache[key] = (schema, rv)
+        while len(_schemas_cache) > SCHEMAS_CACHE_SIZE:
+            _schemas_cache.popitem(last=False)
+    return rv
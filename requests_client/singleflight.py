@@ -0,0 +1,87 @@
+import asyncio
+from threading import Event, Lock
+
+
+class _Call:
+    def __init__(self):
+        self.event = Event()
+        self.result, self.exc = None, None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with same key (threads or monkey patched greenlets):
+    first caller (leader) runs func, others wait for it's result or exception.
+    If `copy` is set, leader takes result snapshot with it before returning, and waiting
+    callers get copies of snapshot, so leader or waiters may modify their result.
+    hits is count of coalesced calls, misses is count of calls that run func.
+    """
+    def __init__(self):
+        self.hits, self.misses = 0, 0
+        self._calls = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return '<{}(hits={}, misses={}, in_flight={})>'.format(
+            self.__class__.__name__, self.hits, self.misses, len(self._calls))
+
+    def do(self, key, func, copy=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            call.event.wait()
+            if call.exc is not None:
+                raise call.exc
+            return copy(call.result) if copy else call.result
+
+        try:
+            result = func()
+            # Snapshot is taken before waiters are woken up and before leader modifies result
+            call.result = copy(result) if copy else result
+            return result
+        except BaseException as exc:
+            # Including KeyboardInterrupt or gevent Timeout, so waiting callers are not
+            # returning result of failed call
+            call.exc = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight(SingleFlight):
+    """
+    Same as SingleFlight, but for coroutine functions on event loop.
+    """
+    async def do(self, key, func, copy=None):
+        future = self._calls.get(key)
+        if future is not None:
+            self.hits += 1
+            result = await asyncio.shield(future)
+            return copy(result) if copy else result
+
+        self.misses += 1
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await func()
+            # Waiters are resumed only after leader is suspended, so snapshot is required
+            future.set_result(copy(result) if copy else result)
+            return result
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark exception as retrieved, if there are no waiting callers
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+            if not future.done():
+                # Leader is cancelled, so waiting callers are cancelled too
+                future.cancel()
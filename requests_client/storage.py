@@ -1,5 +1,6 @@
 import os
 import pickle
+from math import ceil
 
 try:
     import redis
@@ -13,6 +14,9 @@ class BaseStorage(object):
     storage_type "state" - maps account_id to client state
     storage_type "account_id" - maps username to account_id
     """
+    # Values could be set with ttl in seconds
+    supports_ttl = False
+
     def __init__(self, uri, storage_type):
         self.uri, self.storage_type = uri, storage_type
 
@@ -25,6 +29,9 @@ class BaseStorage(object):
     def set(self, key, value):
         raise NotImplementedError()
 
+    def delete(self, key):
+        raise NotImplementedError()
+
 
 class FileStorage(BaseStorage):
     def build_filename(self, key):
@@ -44,9 +51,16 @@ class FileStorage(BaseStorage):
         with open(self.build_filename(key), 'wb') as fh:
             pickle.dump(value, fh)
 
+    def delete(self, key):
+        try:
+            os.remove(self.build_filename(key))
+        except FileNotFoundError:
+            pass
+
 
 class RedisStorage(BaseStorage):
     _redis_map = {}
+    supports_ttl = True
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -61,5 +75,9 @@ class RedisStorage(BaseStorage):
             return pickle.loads(value)
         return None
 
-    def set(self, key, value):
-        self._redis.set(self._build_key(key), pickle.dumps(value))
+    def set(self, key, value, ttl=None):
+        self._redis.set(self._build_key(key), pickle.dumps(value),
+                        ex=None if ttl is None else max(1, int(ceil(ttl))))
+
+    def delete(self, key):
+        self._redis.delete(self._build_key(key))
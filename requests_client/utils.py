@@ -4,13 +4,17 @@ from datetime import datetime, date, tzinfo
 from dateutil import tz
 from collections import OrderedDict
 from collections.abc import Mapping
+from functools import lru_cache
 from enum import Enum
 from importlib import import_module
 
 from marshmallow import missing
 
+from .jsoncodec import default_codec
+
 
 NO_DEFAULT = object()
+UTC = tz.UTC
 
 
 class EnumByNameMixin:
@@ -63,7 +67,7 @@ def resolve_obj_key(obj, key, default=NO_DEFAULT):
             except Exception:
                 if default is not NO_DEFAULT:
                     return default
-                raise ValueError('Could not resolve "{}" on {} object: {}'.format(key, obj))
+                raise ValueError('Could not resolve "{}" on {} object'.format(key, obj))
     else:
         try:
             return obj[key]
@@ -76,14 +80,38 @@ def resolve_obj_key(obj, key, default=NO_DEFAULT):
                 raise ValueError('Could not resolve "{}" on {} object'.format(key, obj))
 
 
+@lru_cache(maxsize=1024)
+def compile_obj_path(path):
+    """
+    Returns resolver(obj, default=NO_DEFAULT) for dot separated path,
+    with fast path for dict and list (json) data, falling back to resolve_obj_key.
+    """
+    steps = tuple((key, int(key) if key.isdigit() else None) for key in path.split('.'))
+
+    def resolver(obj, default=NO_DEFAULT):
+        for key, index in steps:
+            if isinstance(obj, dict):
+                if index is not None and index in obj:
+                    obj = obj[index]
+                    continue
+                if key in obj:
+                    obj = obj[key]
+                    continue
+                if (default is not NO_DEFAULT and not hasattr(type(obj), key)
+                   and key not in getattr(obj, '__dict__', ())):
+                    # Same as resolve_obj_key, but without raising exceptions
+                    obj = default
+                    continue
+            elif index is not None and isinstance(obj, list) and index < len(obj):
+                obj = obj[index]
+                continue
+            obj = resolve_obj_key(obj, key, default)
+        return obj
+    return resolver
+
+
 def resolve_obj_path(obj, path, default=NO_DEFAULT):
-    dot_pos = path.find('.')
-    if dot_pos == -1:
-        return resolve_obj_key(obj, path, default)
-    else:
-        key, path = path[:dot_pos], path[(dot_pos + 1):]
-        return resolve_obj_path(resolve_obj_key(obj, key, default),
-                                path, default)
+    return compile_obj_path(path)(obj, default)
 
 
 class AttrDict(dict):
@@ -115,6 +143,105 @@ def maybe_attr_dict(data):
     return data
 
 
+def _lazy_wrap(value):
+    if type(value) is dict:
+        return LazyAttrDict(value)
+    elif type(value) is list:
+        return LazyList(value)
+    return value
+
+
+class LazyAttrDict(AttrDict):
+    """
+    AttrDict over decoded json, nested dicts and lists are wrapped
+    on first access (and replaced in place), not on creation.
+    """
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        wrapped = _lazy_wrap(value)
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def __iter__(self):
+        # Overridden __iter__ disables fast copy of dict subclasses,
+        # so dict(data) and {**data} are using keys() and __getitem__
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *args):
+        return _lazy_wrap(super().pop(key, *args))
+
+    def popitem(self):
+        key, value = super().popitem()
+        return key, _lazy_wrap(value)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def copy(self):
+        return self.__class__(self)
+
+    def _wrap_values(self):
+        for key in self:
+            self[key]
+
+    def values(self):
+        self._wrap_values()
+        return super().values()
+
+    def items(self):
+        self._wrap_values()
+        return super().items()
+
+
+class LazyList(list):
+    """
+    List over decoded json, items are wrapped on first access.
+    """
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.__class__(list.__getitem__(self, index))
+        value = list.__getitem__(self, index)
+        wrapped = _lazy_wrap(value)
+        if wrapped is not value:
+            list.__setitem__(self, index, wrapped)
+        return wrapped
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reversed__(self):
+        for i in range(len(self) - 1, -1, -1):
+            yield self[i]
+
+    def __add__(self, other):
+        return self.__class__(list.__add__(self, other))
+
+    def __mul__(self, count):
+        return self.__class__(list.__mul__(self, count))
+
+    __rmul__ = __mul__
+
+    def pop(self, *args):
+        return _lazy_wrap(super().pop(*args))
+
+    def copy(self):
+        return self.__class__(self)
+
+
+def lazy_attr_dict(data):
+    """
+    Same as maybe_attr_dict for decoded json, but without recursive copy.
+    """
+    return _lazy_wrap(data)
+
+
 class cached_property(property):
     # https://github.com/pallets/werkzeug/blob/master/werkzeug/utils.py
     # Actually we're not using functools.lru_cache because we want to set
@@ -141,7 +268,10 @@ class cached_property(property):
 
 def repr_response(resp, full=False):
     # requests.models.Response
-    if not full and len(resp.content) > 128:
+    if resp._content is False and resp._content_consumed:
+        # stream response was parsed incrementally
+        content = '<stream>'
+    elif not full and len(resp.content) > 128:
         content = '{}...{}b'.format(resp.content[:128],
                                     len(resp.content))
     else:
@@ -154,13 +284,24 @@ def repr_response(resp, full=False):
     return '{} {} {}: {}'.format(resp.request.method, resp.status_code, url, content)
 
 
+def copy_response(resp):
+    # Shallow copy of requests.models.Response, including custom attributes (like "data").
+    # copy.copy is not working, because Response.__getstate__ is for pickle and reads content
+    rv = resp.__class__.__new__(resp.__class__)
+    rv.__dict__.update(resp.__dict__)
+    return rv
+
+
 def repr_str_short(value, length=32):
     if length is not None and len(value) > length:
         return value[:length] + '...'
     return value
 
 
-class ReprMixin:
+class BaseReprMixin:
+    # Without __dict__, so subclasses may be fully slotted (see ReprMixin)
+    __slots__ = ()
+
     def __repr__(self, *args, full=False, required=False, **kwargs):
         attrs = self.to_dict(*args, required=required, **kwargs)
         attrs = ', '.join(
@@ -177,6 +318,10 @@ class ReprMixin:
         }
 
 
+class ReprMixin(BaseReprMixin):
+    pass
+
+
 class SlotsReprMixin(ReprMixin):
     def to_dict(self, *args, exclude=[], required=True):
         return {
@@ -219,8 +364,10 @@ def from_timestamp(value, tz=tz.UTC, ms=False):
             .replace(tzinfo=get_tz(tz, allow_none=True)))
 
 
-def to_timestamp(dt, tz=tz.UTC, ms=False):
-    return (ensure_tz_aware(dt, tz).astimezone(tz).replace(tzinfo=tz.UTC).timestamp()
+def to_timestamp(dt, tz=UTC, ms=False):
+    # Datetime in timezone to timestamp in same timezone (reverse of from_timestamp)
+    tz = get_tz(tz)
+    return (ensure_tz_aware(dt, tz).astimezone(tz).replace(tzinfo=UTC).timestamp()
             * (1000 if ms else 1))
 
 
@@ -243,16 +390,15 @@ def pprint(obj, indent=2, color=True, print_=True):
     if isinstance(obj, Mapping):
         # To convert dict-like objects, for example requests.structures.CaseInsensitiveDict
         obj = OrderedDict(obj)
-    if isinstance(obj, bytes):
+    if isinstance(obj, (bytes, str)):
         try:
-            obj = obj.decode('utf-8')
+            obj = default_codec.loads(obj)
         except Exception:
-            pass
-    if isinstance(obj, str):
-        try:
-            obj = json.loads(obj)
-        except Exception:
-            pass
+            if isinstance(obj, bytes):
+                try:
+                    obj = obj.decode('utf-8')
+                except Exception:
+                    pass
 
     def default(obj):
         if isinstance(obj, (datetime, date)):
@@ -261,7 +407,11 @@ def pprint(obj, indent=2, color=True, print_=True):
             return obj.to_dict()
         raise TypeError('Type %s not serializable' % type(obj))
 
-    rv = json.dumps(obj, default=default, indent=indent, ensure_ascii=False)
+    try:
+        rv = default_codec.dumps(obj, default=default, indent=indent).decode('utf-8')
+    except TypeError:
+        # Fallback for values not supported by codec (big integers for orjson, for example)
+        rv = json.dumps(obj, default=default, indent=indent, ensure_ascii=False)
 
     if color:
         try:
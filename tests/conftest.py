@@ -0,0 +1,23 @@
+from requests_client.client import BaseClient
+
+
+class Client(BaseClient):
+    """
+    Client for tests, sending requests to base_url (mocked with requests_mock).
+    """
+    # For some reason urljoin not works properly with mock:// schema
+    base_url = 'http://test/'
+    auth_ident = None
+
+    _request = BaseClient._send_request
+
+
+class Clock:
+    """
+    Clock for ratelimiters, backoff and circuit breakers, time is set by tests.
+    """
+    def __init__(self, time=0):
+        self.time = time
+
+    def __call__(self):
+        return self.time
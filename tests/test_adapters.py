@@ -0,0 +1,101 @@
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+from requests_client.adapters import AdapterRegistry, DNSCache
+
+from conftest import Client
+
+
+@pytest.fixture
+def server():
+    peers = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            server.connections += 1
+            super().setup()
+
+        def do_GET(self):
+            peers.add(self.client_address)
+            time.sleep(server.delay)
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.send_header('Set-Cookie', 'path={}'.format(self.path.strip('/')))
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.peers, server.connections, server.delay = peers, 0, 0
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_adapter_registry(server):
+    registry = AdapterRegistry(pool_maxsize=4)
+
+    class ServerClient(Client):
+        base_url = 'http://{}:{}/'.format(*server.server_address)
+        adapter_registry = registry
+
+    client1, client2 = ServerClient(), ServerClient()
+    assert client1.session is not client2.session
+    adapter = client1.session.get_adapter(client1.base_url)
+    assert adapter is client2.session.get_adapter(client2.base_url)
+    assert adapter._pool_maxsize == 4
+    assert ServerClient(ssl_verify=False).session.get_adapter(client1.base_url) is not adapter
+
+    client1.get('one')
+    client1.session.close()  # should not close shared pools
+    client2.get('two')
+    assert len(server.peers) == 1
+    assert client1.cookies['path'] == 'one'
+    assert client2.cookies['path'] == 'two'
+
+    registry.close()
+    assert not registry._adapters
+
+
+def test_warmup_dns_cache(server, monkeypatch):
+    getaddrinfo = socket.getaddrinfo
+    resolved = []
+
+    def getaddrinfo_mock(host, *args, **kwargs):
+        if host == 'test.local':
+            resolved.append(host)
+        return getaddrinfo('127.0.0.1' if host == 'test.local' else host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo_mock)
+    now = [0]
+    dns_cache = DNSCache(ttl=10, clock=lambda: now[0])
+
+    class ServerClient(Client):
+        base_url = 'http://test.local:{}/'.format(server.server_address[1])
+
+    client = ServerClient(dns_cache=dns_cache)
+    client.warmup(2, wait=True)
+    assert client.warmup_count == 2
+    assert client.warmup_elapsed_seconds > 0
+    assert resolved == ['test.local']
+    assert (dns_cache.hits, dns_cache.misses) == (1, 1)
+
+    # Requests are overlapping, so both warmed up connections are used
+    server.delay = 0.1
+    client.gather([('get', ('one',)), ('get', ('two',))])
+    assert len(server.peers) == 2 and server.connections == 2
+    assert client.cookies['path'] in ('one', 'two')
+
+    now[0] = 11
+    assert dns_cache.resolve('test.local') == '127.0.0.1'
+    assert resolved == ['test.local', 'test.local']
+    assert dns_cache.resolve('127.0.0.1') == '127.0.0.1'
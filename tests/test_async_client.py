@@ -0,0 +1,254 @@
+import asyncio
+import json
+from threading import current_thread
+
+import pytest
+
+from requests_client.async_client import (AsyncBaseClient, AiohttpTransport, ThreadTransport,
+                                          auth_required, temporary_error)
+from requests_client.cache import ResponseCache, MemoryCache
+from requests_client.exceptions import HTTPError, RetryExceeded
+from requests_client.ratelimit import TokenBucket
+from requests_client.singleflight import AsyncSingleFlight
+
+
+class Server:
+    """
+    Minimal asyncio HTTP server, responds with (status, body) from routes by path.
+    """
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    async def handle(self, reader, writer):
+        request_line = (await reader.readline()).decode()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode().strip()
+            if not line:
+                break
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+        method, path, _ = request_line.split(' ')
+        self.requests.append((method, path, headers, body))
+
+        status, resp_body = self.routes[path.split('?')[0]]
+        if callable(resp_body):
+            resp_body = resp_body(method, path, headers, body)
+        resp_body = json.dumps(resp_body).encode()
+        writer.write((
+            'HTTP/1.1 {} X\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+            'Set-Cookie: session=1; Path=/\r\nConnection: close\r\n\r\n'
+        ).format(status, len(resp_body)).encode() + resp_body)
+        await writer.drain()
+        writer.close()
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.base_url = 'http://127.0.0.1:{}/'.format(self.server.sockets[0].getsockname()[1])
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def create_client(server, transport_cls, **kwargs):
+    class Client(AsyncBaseClient):
+        base_url = server.base_url
+        auth_ident = None
+
+        _request = AsyncBaseClient._send_request
+
+        _sleeped = 0
+
+        async def sleep(self, seconds, *args, **kwargs):
+            self._sleeped += seconds
+
+    return Client(transport=transport_cls(), **kwargs)
+
+
+@pytest.fixture(params=[AiohttpTransport, ThreadTransport])
+def transport_cls(request):
+    if request.param is AiohttpTransport:
+        pytest.importorskip('aiohttp')
+    return request.param
+
+
+def test_async_request(transport_cls):
+    async def test():
+        routes = {
+            '/path': (200, {'hello': 'world'}),
+            '/echo': (200, lambda method, path, headers, body: {
+                'method': method, 'path': path, 'body': json.loads(body.decode()),
+                'cookie': headers.get('cookie')}),
+        }
+        async with Server(routes) as server:
+            async with create_client(server, transport_cls) as client:
+                r1 = await client.get('path', parse_json=True)
+                assert r1.data.hello == 'world'
+
+                r2 = await client.post('echo', params={'x': [1, 2]}, json={'y': 3})
+                assert r2.data.method == 'POST'
+                assert r2.data.path == '/echo?x=1&x=2'
+                assert r2.data.body == {'y': 3}
+                # cookie from first response is stored in client session
+                assert r2.data.cookie == 'session=1'
+
+                assert client.calls_count == 2
+                assert client.last_response == r2
+
+    asyncio.run(test())
+
+
+def test_async_environment_proxies(transport_cls, monkeypatch):
+    async def test():
+        # Proxy receives absolute url in request line
+        async with Server({'http://upstream.test/path': (200, {'proxied': True})}) as proxy:
+            client = create_client(proxy, transport_cls)
+            client.base_url = 'http://upstream.test/'
+            monkeypatch.setenv('HTTP_PROXY', proxy.base_url)
+            assert (await client.get('path')).data.proxied
+
+            monkeypatch.delenv('HTTP_PROXY')
+            client.session.proxies = {'http': proxy.base_url}
+            assert (await client.get('path')).data.proxied
+            assert len(proxy.requests) == 2
+            await client.close()
+
+    monkeypatch.delenv('NO_PROXY', raising=False)
+    monkeypatch.delenv('no_proxy', raising=False)
+    asyncio.run(test())
+
+
+def test_async_concurrent_requests(transport_cls):
+    async def test():
+        async with Server({'/path': (200, {'hello': 'world'})}) as server:
+            async with create_client(server, transport_cls) as client:
+                responses = await asyncio.gather(*[client.get('path') for _ in range(10)])
+                assert all(r.data.hello == 'world' for r in responses)
+                assert client.calls_count == 10
+
+    asyncio.run(test())
+
+
+def test_async_temporary_error(transport_cls):
+    async def test():
+        async with Server({'/path': (400, {'match': True})}) as server:
+            client = create_client(server, transport_cls, temporary_error_retries=2,
+                                   temporary_error_wait_seconds=0.5)
+
+            @temporary_error(HTTPError, {'status': 400, 'data.match': True})
+            async def match(client, **kwargs):
+                return await client.get('path', **kwargs)
+
+            @temporary_error(HTTPError, {'status': 401})
+            async def not_match(client, **kwargs):
+                return await client.get('path', **kwargs)
+
+            with pytest.raises(RetryExceeded):
+                await match(client)
+            assert client._sleeped == 1
+            assert client.calls_count == 3
+
+            with pytest.raises(HTTPError):
+                await not_match(client)
+            assert client.calls_count == 4
+            await client.close()
+
+    asyncio.run(test())
+
+
+def test_async_auth_required(transport_cls):
+    async def test():
+        async with Server({'/path': (200, {'hello': 'world'})}) as server:
+            client = create_client(server, transport_cls)
+            authenticated = []
+
+            async def authenticate():
+                authenticated.append(True)
+                client.is_authenticated = True
+            client.authenticate = authenticate
+
+            @auth_required
+            async def get(client):
+                return await client.get('path')
+
+            assert (await get(client)).data.hello == 'world'
+            assert (await get(client)).data.hello == 'world'
+            assert authenticated == [True]
+            await client.close()
+
+    asyncio.run(test())
+
+
+def test_async_gather(transport_cls):
+    async def test():
+        routes = {'/path': (200, {'hello': 'world'}), '/error': (500, {})}
+        async with Server(routes) as server:
+            async with create_client(server, transport_cls) as client:
+                calls = [('get', ('path',))] * 5 + [('get', ('error',))]
+                results = await client.gather(calls, concurrency=2)
+                assert all(r.data.hello == 'world' for r in results[:5])
+                assert isinstance(results[5], HTTPError)
+
+                results = [r async for r in client.map(calls, ordered=False)]
+                assert sorted(i for i, r in results) == list(range(6))
+
+    asyncio.run(test())
+
+
+def test_async_single_flight(transport_cls):
+    async def test():
+        async with Server({'/path': (200, {'hello': 'world'})}) as server:
+            async with create_client(server, transport_cls,
+                                     single_flight=AsyncSingleFlight()) as client:
+                responses = await asyncio.gather(*[client.get('path') for _ in range(5)])
+                assert all(r.data.hello == 'world' for r in responses)
+                assert len(server.requests) == 1
+                assert client.single_flight.hits == 4
+
+                # processors created by decorator on every call are coalesced too
+                get = temporary_error(HTTPError, {'status': 503})(type(client).get)
+                responses = await asyncio.gather(*[get(client, 'path') for _ in range(5)])
+                assert len(server.requests) == 2
+                assert client.single_flight.hits == 8
+
+    asyncio.run(test())
+
+
+def test_async_blocking_storage(transport_cls):
+    threads = []
+
+    class BlockingRateLimiter(TokenBucket):
+        blocking = True
+
+        def reserve(self, tokens=1, key=None):
+            threads.append(current_thread())
+            return super().reserve(tokens, key)
+
+    class BlockingCache(MemoryCache):
+        blocking = True
+
+        def get(self, key):
+            threads.append(current_thread())
+            return super().get(key)
+
+        def set(self, key, entry):
+            threads.append(current_thread())
+            return super().set(key, entry)
+
+    async def test():
+        async with Server({'/path': (200, {'hello': 'world'})}) as server:
+            async with create_client(server, transport_cls, ratelimiter=BlockingRateLimiter(10),
+                                     response_cache=ResponseCache(BlockingCache(),
+                                                                  default_ttl=60)) as client:
+                assert (await client.get('path')).data.hello == 'world'
+                assert (await client.get('path')).data.hello == 'world'
+                assert len(server.requests) == 1
+        # ratelimiter reserve, cache get and set, cache get
+        assert len(threads) == 4
+        assert current_thread() not in threads
+
+    asyncio.run(test())
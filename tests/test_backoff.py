@@ -0,0 +1,88 @@
+import pytest
+import requests_mock
+
+from requests_client.backoff import (Backoff, ExponentialBackoff, DecorrelatedJitterBackoff,
+                                     RetryBudget)
+from requests_client.client import temporary_error
+from requests_client.exceptions import HTTPError, RetryExceeded
+
+import conftest
+
+
+def test_backoff():
+    assert [Backoff(2)(i) for i in range(1, 4)] == [2, 2, 2]
+    backoff = ExponentialBackoff(base=1, cap=5, jitter=None)
+    assert [backoff(i) for i in range(1, 6)] == [1, 2, 4, 5, 5]
+    backoff = ExponentialBackoff(base=1, cap=5)
+    assert all(0 <= backoff(i) <= min(2 ** (i - 1), 5) for i in range(1, 10))
+    backoff = ExponentialBackoff(base=1, cap=5, jitter='equal')
+    assert all(2 <= backoff(3) <= 4 for _ in range(10))
+    with pytest.raises(ValueError):
+        ExponentialBackoff(jitter='unknown')
+
+    backoff = DecorrelatedJitterBackoff(base=1, cap=10)
+    previous = None
+    for i in range(1, 10):
+        seconds = backoff(i, previous)
+        assert 1 <= seconds <= min((previous or 1) * 3, 10)
+        previous = seconds
+
+
+def test_retry_budget():
+    clock = conftest.Clock()
+    budget = RetryBudget(ratio=0.1, window_seconds=10, min_retries_per_second=0.2,
+                         clock=clock)
+    # 2 retries allowed without traffic
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+    for _ in range(20):
+        budget.record_request()
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+
+    # window is sliding
+    clock.time = 10
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+
+
+class Client(conftest.Client):
+    @temporary_error(HTTPError, {'status': 500})
+    def test(self, **kwargs):
+        return self.get('path', **kwargs)
+
+    def sleep(self, seconds, log_reason=None):
+        if log_reason != 'request wait':
+            self.sleeped.append(seconds)
+
+
+def test_client_backoff():
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', status_code=500)
+
+        client = Client(temporary_error_retries=3,
+                        temporary_error_backoff=ExponentialBackoff(jitter=None))
+        client.sleeped = []
+        with pytest.raises(RetryExceeded) as exc:
+            client.test()
+        assert client.sleeped == [1, 2, 4]
+        assert exc.value.retry_count == 3
+        assert exc.value.retries == 3
+        assert exc.value.backoff_seconds == 7
+        assert 'after 7.000 seconds backoff' in str(exc.value)
+
+
+def test_client_retry_budget():
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', status_code=500)
+
+        budget = RetryBudget(ratio=0, min_retries_per_second=0.1, window_seconds=30)
+        client1 = Client(temporary_error_retries=2, retry_budget=budget)
+        client2 = Client(temporary_error_retries=2, retry_budget=budget)
+        client1.sleeped, client2.sleeped = [], []
+        with pytest.raises(RetryExceeded) as exc:
+            client1.test()
+        assert exc.value.retries == 2
+        with pytest.raises(RetryExceeded) as exc:
+            client2.test()
+        # budget is shared, and exhausted after 3 retries
+        assert exc.value.retry_count == 1
+        assert exc.value.msg == 'Retry budget exhausted'
+        assert client2.calls_count == 2
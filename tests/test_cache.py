@@ -0,0 +1,120 @@
+import time
+
+import pytest
+import requests_mock
+
+from requests_client.cache import (ResponseCache, MemoryCache, StorageCache, TieredCache,
+                                   CacheEntry)
+from requests_client.storage import FileStorage
+
+from conftest import Client
+
+
+def create_entry(client, content, headers={}, expires_at=0):
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', content=content, headers=headers)
+        return CacheEntry(client.session.get('http://test/path'), expires_at=expires_at)
+
+
+def test_memory_cache():
+    client = Client()
+    cache = MemoryCache(max_size=250)
+    for i in range(3):
+        cache.set(i, create_entry(client, b'x' * 100))
+    assert len(cache) == 2 and cache.get(0) is None
+    cache.get(1)
+    cache.set(3, create_entry(client, b'x' * 100))
+    assert cache.get(1) and cache.get(2) is None
+    cache.set(4, create_entry(client, b'x' * 300))  # too large
+    assert len(cache) == 2 and cache.get(4) is None
+
+    cache = MemoryCache(max_entries=1)
+    cache.set(0, create_entry(client, b'x'))
+    cache.set(1, create_entry(client, b'x'))
+    assert len(cache) == 1 and cache.get(1)
+
+
+def test_tiered_cache(tmp_path):
+    client = Client()
+    memory, storage = MemoryCache(), StorageCache(FileStorage(str(tmp_path), 'CACHE_'))
+    TieredCache(storage).set('key', create_entry(client, b'content', {'ETag': '"1"'},
+                                                 expires_at=time.time()))
+    cache = TieredCache(memory, storage)
+    entry = cache.get('key')
+    assert entry.content == b'content'
+    assert entry.get_validators() == {'If-None-Match': '"1"'}
+    assert memory.get('key')
+
+
+def test_storage_cache_expiration(tmp_path):
+    client = Client()
+    storage = FileStorage(str(tmp_path), 'CACHE_')
+    cache = StorageCache(storage, stale_ttl=60)
+    cache.set('stale', create_entry(client, b'x', expires_at=time.time() - 30))
+    assert cache.get('stale').content == b'x'
+
+    storage.set('expired', create_entry(client, b'x', expires_at=time.time() - 90))
+    assert cache.get('expired') is None
+    assert storage.get('expired') is None
+    cache.set('stale', create_entry(client, b'x', expires_at=time.time() - 90))
+    assert storage.get('stale') is None
+
+
+def test_storage_cache_redis_ttl():
+    fakeredis = pytest.importorskip('fakeredis')
+    from requests_client.storage import RedisStorage
+
+    RedisStorage._redis_map['redis://fake'] = redis = fakeredis.FakeStrictRedis()
+    try:
+        cache = StorageCache(RedisStorage('redis://fake', 'CACHE_'), stale_ttl=60)
+        cache.set('key', create_entry(Client(), b'x', expires_at=time.time() + 60))
+        assert 110 < redis.ttl('CACHE_key') <= 120
+        assert cache.get('key').content == b'x'
+    finally:
+        del RedisStorage._redis_map['redis://fake']
+
+
+def test_client_cache():
+    client = Client(response_cache=ResponseCache())
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/fresh', json={'x': 1},
+                   headers={'Cache-Control': 'max-age=60'})
+        r1 = client.get('fresh', parse_json=True, params={'a': 1})
+        r2 = client.get('fresh', parse_json=True, params={'a': 1})
+        assert r1.data.x == r2.data.x == 1
+        assert r2.from_cache and not hasattr(r1, 'from_cache')
+        assert mocker.call_count == 1
+        assert client.calls_count == 1
+
+        client.get('fresh', params={'a': 2})
+        client.get('fresh', cache=False)
+        assert mocker.call_count == 3
+
+        mocker.get('http://test/etag', json={'x': 2}, headers={'ETag': '"v1"'})
+        client.get('etag')
+        mocker.get('http://test/etag', status_code=304, headers={'ETag': '"v1"'})
+        r = client.get('etag', parse_json=True)
+        assert mocker.last_request.headers['If-None-Match'] == '"v1"'
+        assert r.status_code == 200 and r.data.x == 2
+        assert client.response_cache.revalidated == 1
+
+        mocker.get('http://test/no-store', json={'x': 3},
+                   headers={'Cache-Control': 'no-store', 'ETag': '"v1"'})
+        client.get('no-store')
+        client.get('no-store')
+        assert 'If-None-Match' not in mocker.last_request.headers
+
+        mocker.get('http://test/vary', json={'x': 4},
+                   headers={'Cache-Control': 'max-age=60', 'Vary': 'Accept'})
+        client.get('vary', headers={'Accept': 'application/json'})
+        count = mocker.call_count
+        assert client.get('vary', headers={'Accept': 'application/json'}).from_cache
+        client.get('vary', headers={'Accept': 'text/html'})
+        assert mocker.call_count == count + 1
+
+    # Cache is per account
+    client2 = Client(auth_ident='other', response_cache=client.response_cache)
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/fresh', json={'x': 1})
+        client2.get('fresh', params={'a': 1})
+        assert mocker.call_count == 1
@@ -0,0 +1,100 @@
+import pytest
+import requests_mock
+from requests.exceptions import ConnectionError
+
+from requests_client.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from requests_client.client import temporary_error
+from requests_client.exceptions import (CircuitOpenError, HTTPError, RetryExceeded,
+                                        TemporaryError)
+from requests_client.storage import FileStorage
+
+import conftest
+
+
+def test_circuit_breaker():
+    clock = conftest.Clock(1000)
+    breaker = CircuitBreaker(failure_threshold=3, window_seconds=10, recovery_seconds=5,
+                             clock=clock)
+    for _ in range(2):
+        breaker.record_failure('host')
+    breaker.record_success('host')  # failures should be consecutive
+    for _ in range(2):
+        breaker.record_failure('host')
+    clock.time += 11  # failures should be within window
+    for _ in range(2):
+        breaker.record_failure('host')
+    assert breaker.get_state('host') == CLOSED
+    assert breaker.allow('host') == 0
+
+    breaker.record_failure('host')
+    assert breaker.get_state('host') == OPEN
+    assert breaker.allow('host') == 5
+    assert breaker.allow('other') == 0
+
+    clock.time += 5
+    assert breaker.allow('host') == 0  # probe
+    assert breaker.get_state('host') == HALF_OPEN
+    assert breaker.allow('host') == 5  # only one probe allowed
+    breaker.record_failure('host')
+    assert breaker.get_state('host') == OPEN
+    assert breaker.allow('host') == 5
+
+    clock.time += 5
+    assert breaker.allow('host') == 0
+    clock.time += 5
+    assert breaker.allow('host') == 0  # probe without result is reset after recovery
+    breaker.record_success('host')
+    assert breaker.get_state('host') == CLOSED
+
+
+def test_circuit_breaker_storage(tmp_path):
+    clock = conftest.Clock(1000)
+    storage = FileStorage(str(tmp_path), 'CIRCUIT_')
+    breaker1 = CircuitBreaker(failure_threshold=2, storage=storage, clock=clock)
+    breaker2 = CircuitBreaker(failure_threshold=2, storage=storage, clock=clock)
+    breaker1.record_failure('host')
+    breaker2.record_failure('host')
+    assert breaker1.allow('host') == 30
+    assert breaker2.allow('host') == 30
+
+
+class Client(conftest.Client):
+    @temporary_error(HTTPError, {'status': 503})
+    def test(self, **kwargs):
+        return self.get('path', **kwargs)
+
+
+def test_client_circuit_breaker():
+    with requests_mock.Mocker() as mocker:
+        client = Client(temporary_error_retries=0,
+                        circuit_breaker=CircuitBreaker(failure_threshold=2))
+
+        mocker.get('http://test/path', exc=ConnectionError)
+        with pytest.raises(ConnectionError):
+            client.test()
+        mocker.get('http://test/path', status_code=404)
+        with pytest.raises(HTTPError):
+            client.test()
+        assert client.circuit_breaker.get_state('test') == CLOSED
+
+        mocker.get('http://test/path', status_code=503)
+        with pytest.raises(TemporaryError):
+            client.test()
+        with pytest.raises(TemporaryError):
+            client.test()
+        assert client.circuit_breaker.get_state('test') == OPEN
+        assert mocker.call_count == 4
+
+        with pytest.raises(CircuitOpenError) as exc:
+            client.test()
+        assert isinstance(exc.value, client.CircuitOpenError)
+        assert exc.value.key == 'test'
+        assert 'Circuit open for test' in str(exc.value)
+        assert mocker.call_count == 4
+
+        # Circuit open error is not retried
+        client.temporary_error_retries = 2
+        with pytest.raises(CircuitOpenError):
+            client.test()
+        with pytest.raises(RetryExceeded):
+            Client(temporary_error_retries=1).test()
@@ -1,19 +1,14 @@
 import os
+import time
 
 import pytest
 import requests_mock
 
-from requests_client.client import BaseClient, ratelimit_error, temporary_error
+from requests_client.client import ratelimit_error, temporary_error
 from requests_client.exceptions import (ClientError, HTTPError, RatelimitError,
                                         TemporaryError, RetryExceeded)
 
-
-class Client(BaseClient):
-    # For some reason urljoin not works properly with mock:// schema
-    base_url = 'http://test/'
-    auth_ident = None
-
-    _request = BaseClient._send_request
+from conftest import Client
 
 
 @pytest.fixture
@@ -55,6 +50,31 @@ def test_json_decode_error(req_mocker):
     assert 'JSONDecodeError' in repr(exc.value)
 
 
+def test_stream_json(req_mocker):
+    client = Client()
+    client.stream_chunk_size = 4
+
+    text = '{"meta": {"count": 2}, "data": {"items": [{"id": 1}, {"id": 2}]}}'
+    req_mocker.get('http://test/path', text=text)
+    resp = client.get('path', parse_json='data.items', stream=True)
+    assert [item.id for item in resp.data] == [1, 2]
+
+    # Body of streamed JSON response is not read without parse_json
+    req_mocker.get('http://test/path', text=text, headers={'Content-Type': 'application/json'})
+    resp = client.get('path', stream=True)
+    assert resp._content is False and not hasattr(resp, 'data')
+    assert [item.id for item in client.iter_response_items(resp, 'data.items')] == [1, 2]
+
+    with pytest.raises(ClientError) as exc:
+        client.get('path', parse_json='data.missing', stream=True)
+    assert 'Could not resolve path' in str(exc.value)
+
+    req_mocker.get('http://test/path', text='{"data": {"items": [1, 2')
+    with pytest.raises(ClientError) as exc:
+        client.get('path', parse_json='data.items', stream=True)
+    assert 'JSONDecodeError' in repr(exc.value)
+
+
 def test_http_status_error(req_mocker):
     client = Client()
 
@@ -130,3 +150,32 @@ def test_temporary_error(error_type, req_mocker):
         req_mocker.get('http://test/path', status_code=400, json={'match3': True})
         client.test()
         assert client._sleeped == 5
+
+
+def test_map(req_mocker):
+    client = Client()
+
+    for i in range(10):
+        req_mocker.get('http://test/path/%s' % i, json={'i': i})
+    req_mocker.get('http://test/path/error', status_code=500)
+
+    calls = [('get', ('path/%s' % i,), {'parse_json': True}) for i in range(10)]
+    calls.append(lambda: client.get('path/error'))
+    results = client.gather(calls, concurrency=4)
+    assert [r.data.i for r in results[:10]] == list(range(10))
+    assert isinstance(results[10], HTTPError)
+    assert client.calls_count == 11
+
+    results = dict(client.map(calls[:10], concurrency=4, ordered=False))
+    assert {i: r.data.i for i, r in results.items()} == {i: i for i in range(10)}
+
+
+def test_map_request_wait_seconds(req_mocker):
+    client = Client(request_wait_seconds=0.05)
+    req_mocker.get('http://test/path', json={})
+
+    call_times = []
+    client.session.hooks['response'].append(lambda r, **kw: call_times.append(time.monotonic()))
+    client.gather([('get', ('path',))] * 4, concurrency=4)
+    call_times.sort()
+    assert all(b - a >= 0.04 for a, b in zip(call_times, call_times[1:]))
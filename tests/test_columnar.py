@@ -0,0 +1,92 @@
+import math
+from array import array
+from datetime import datetime
+
+import pytest
+import requests_mock
+from marshmallow import fields, validate, ValidationError
+
+from requests_client import columnar
+from requests_client.client import response_schema
+from requests_client.columnar import load_columns
+from requests_client.exceptions import ResponseValidationError
+from requests_client.fields import TimestampField
+from requests_client.schemas import ResponseSchema, LoadKeySchemaMixin
+
+import conftest
+
+
+class ItemSchema(LoadKeySchemaMixin, ResponseSchema):
+    id = fields.Int(load_key='item_id')
+    price = fields.Float(allow_none=True)
+    active = fields.Bool()
+    name = fields.Str(attribute='title')
+    created = TimestampField(ms=True, zero_as_none=True, allow_none=True)
+    rank = fields.Int(validate=validate.Range(min=0), missing=None)
+
+    data_path = 'items'
+
+
+DATA = [
+    {'item_id': 1, 'price': 1.5, 'active': True, 'name': 'a', 'created': 1546300800000},
+    {'id': 2, 'price': None, 'active': 'false', 'name': 'b', 'created': 0, 'rank': 1},
+]
+
+
+@pytest.fixture(params=['numpy', 'array'])
+def use_numpy(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(columnar, 'numpy', None)
+    return request.param == 'numpy'
+
+
+def test_load_columns(use_numpy):
+    rv = load_columns(DATA, ItemSchema())
+    assert list(rv['id']) == [1, 2]
+    assert rv['price'][0] == 1.5 and math.isnan(rv['price'][1])
+    assert list(rv['active']) == [True, False]
+    assert list(rv['title']) == ['a', 'b']
+    assert list(rv['rank']) == [None, 1]
+    if use_numpy:
+        import numpy
+        assert rv['id'].dtype == numpy.int64 and rv['active'].dtype == bool
+        assert rv['created'].dtype == numpy.dtype('datetime64[us]')
+        assert rv['created'][0] == numpy.datetime64('2019-01-01T00:00:00')
+        assert numpy.isnat(rv['created'][1])
+    else:
+        assert isinstance(rv['id'], array) and rv['id'].typecode == 'q'
+        assert isinstance(rv['price'], array) and rv['price'].typecode == 'd'
+        timezone = ItemSchema().fields['created'].timezone
+        assert rv['created'] == [datetime(2019, 1, 1, tzinfo=timezone), None]
+
+
+def test_load_columns_errors(use_numpy):
+    data = [dict(DATA[0], price='x'), dict(DATA[1], rank=-1), {'id': 2 ** 70}]
+    with pytest.raises(ValidationError) as exc:
+        load_columns(data, ItemSchema())
+    assert exc.value.messages == {0: {'price': ['Not a valid number.']},
+                                  1: {'rank': ['Must be at least 0.']}}
+    assert list(exc.value.valid_data['id']) == [1, 2, 2 ** 70]
+
+    with pytest.raises(ValidationError) as exc:
+        load_columns([1], ItemSchema())
+    assert exc.value.messages == {0: {'_schema': ['Invalid input type.']}}
+
+
+class Client(conftest.Client):
+    @response_schema(ItemSchema, columns=True)
+    def get_items(self):
+        return self.get('items', parse_json=True)
+
+
+def test_client_columns():
+    client = Client()
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/items', json={'items': DATA})
+        assert list(client.get_items().data['id']) == [1, 2]
+        mocker.get('http://test/items', json={'items': [{'id': 'x'}]})
+        with pytest.raises(ResponseValidationError) as exc:
+            client.get_items()
+    assert exc.value.errors == {0: {'id': ['Not a valid integer.']}}
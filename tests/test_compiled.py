@@ -0,0 +1,185 @@
+import random
+from copy import deepcopy
+from datetime import datetime
+
+import pytest
+import requests_mock
+from marshmallow import fields, validate, ValidationError, RAISE, missing
+
+from requests_client.client import response_schema
+from requests_client.compiled import CompiledSchemaMixin, compile_loader, CompileError
+from requests_client.exceptions import ResponseValidationError
+from requests_client.fields import TimestampField, SchemedEntityField
+from requests_client.models import SchemedEntity, BindedEntityMixin
+from requests_client.schemas import ResponseSchema, LoadKeySchemaMixin, schema_context
+from requests_client.utils import lazy_attr_dict
+
+import conftest
+
+
+class Tag(SchemedEntity):
+    name = fields.Str(required=True)
+    weight = fields.Float(missing=1.0)
+
+
+class Item(BindedEntityMixin, SchemedEntity):
+    id = fields.Int(required=True)
+
+
+class ItemSchema(LoadKeySchemaMixin, ResponseSchema):
+    id = fields.Int(required=True, load_key='item_id')
+    name = fields.Str(data_key='title', attribute='title', allow_none=True,
+                      validate=validate.Length(max=8))
+    price = fields.Float(allow_nan=True)
+    active = fields.Bool(missing=False)
+    created = TimestampField(ms=True, zero_as_none=True)
+    updated = TimestampField(naive=True, missing=None)
+    tag = SchemedEntityField(Tag, allow_none=True)
+    tags = SchemedEntityField(Tag, many=True, missing=list)
+    codes = fields.List(fields.Int(validate=validate.Range(min=0)))
+    flags = fields.List(fields.Bool(), allow_none=True)
+    extra = fields.Raw()
+
+    class Meta:
+        model = Item
+
+
+class DataSchema(LoadKeySchemaMixin, ResponseSchema):
+    id = fields.Int(strict=True)
+    name = fields.Str(load_key='title')
+    tags = fields.List(fields.List(fields.Str()), missing=None)
+    tag = SchemedEntityField(Tag, unknown=RAISE)
+
+
+def compiled(schema_cls):
+    return type(schema_cls.__name__, (CompiledSchemaMixin, schema_cls), {})
+
+
+VALUES = [
+    missing, None, 0, 1, -1, 2 ** 70, 1.5, float('nan'), float('inf'), True, False,
+    '', 'name', 'long name value', '12', b'bytes', 'ü', [], [1, 2], [-1], [True, None],
+    ['a', 'b'], [['a'], []], [['a', 1]], (1,), {}, {'name': 'x'}, {'name': 'x', 'weight': 2},
+    {'name': 'x', 'other': 1}, {'weight': 1}, [{'name': 'x'}], [{'name': 1}], {'x': [1]},
+    1546300800000, 1e30,
+]
+KEYS = ['id', 'item_id', 'title', 'name', 'price', 'active', 'created', 'updated', 'tag',
+        'tags', 'codes', 'extra', 'flags', 'unknown']
+
+
+def generate_data(rnd, many):
+    if many:
+        return [generate_data(rnd, False) for _ in range(rnd.randint(0, 3))]
+    if rnd.random() < 0.02:
+        return rnd.choice(VALUES)
+    data = {}
+    for key in rnd.sample(KEYS, rnd.randint(0, len(KEYS))):
+        value = rnd.choice(VALUES)
+        if value is not missing:
+            data[key] = deepcopy(value)
+    if rnd.random() < 0.7:
+        # Mostly valid data, so compiled path is used too
+        data.setdefault('id', data.pop('item_id', 1) if rnd.random() < 0.5 else 2)
+    return data
+
+
+def normalize(value):
+    # Comparable representation of loaded data, with types
+    if isinstance(value, SchemedEntity):
+        attrs = {k: getattr(value, k) for k in dir(value)
+                 if k in value.schema.fields or k in ('_entity', '_client')}
+        return (type(value), normalize(attrs))
+    elif isinstance(value, dict):
+        return (type(value), {k: normalize(v) for k, v in value.items()})
+    elif isinstance(value, (list, tuple)):
+        return (type(value), [normalize(v) for v in value])
+    elif isinstance(value, float) and value != value:
+        return (float, 'nan')
+    return (type(value), value)
+
+
+def load(schema, data, many):
+    try:
+        with schema_context(client='client', debug_level=0):
+            return 'ok', normalize(schema.load(data, many=many))
+    except ValidationError as exc:
+        return 'error', exc.normalized_messages(), normalize(exc.valid_data)
+    except Exception as exc:
+        # Not handled errors of fields (for example TypeError) should be the same too
+        return 'exception', type(exc), str(exc)
+
+
+@pytest.mark.parametrize('schema_cls', [ItemSchema, DataSchema])
+def test_differential(schema_cls):
+    schema, compiled_schema = schema_cls(), compiled(schema_cls)()
+    assert compiled_schema.get_compiled_loader()
+    rnd, results = random.Random(schema_cls.__name__), set()
+    for _ in range(2000):
+        many = rnd.random() < 0.3
+        data = generate_data(rnd, many)
+        expected = load(schema, deepcopy(data), many)
+        assert load(compiled_schema, deepcopy(data), many) == expected, data
+        assert (load(compiled_schema, lazy_attr_dict(deepcopy(data)), many)
+                == load(schema, lazy_attr_dict(deepcopy(data)), many)), data
+        results.add(expected[0])
+    assert {'ok', 'error'} <= results
+
+
+def test_compiled_load():
+    schema = compiled(ItemSchema)(many=True)
+    data = [{'item_id': '1', 'title': 'x', 'created': 1546300800000,
+             'tags': [{'name': 'a'}], 'updated': 0}]
+    with schema_context(client='client', debug_level=0):
+        items = schema.load(data)
+    assert isinstance(items, tuple) and isinstance(items[0], Item)
+    assert (items[0].id, items[0].title, items[0].active) == (1, 'x', False)
+    assert items[0].created == datetime(2019, 1, 1, tzinfo=ItemSchema().fields['created'].timezone)
+    assert items[0].updated == datetime(1970, 1, 1)
+    assert items[0].tags[0].weight == 1.0 and items[0]._client == 'client'
+    assert not hasattr(items[0], 'tag')
+    assert 'def ' in compile_loader(schema).source
+
+    class PdbSchema(ItemSchema):
+        class Meta:
+            pdb = True
+
+    class ValidatedSchema(ResponseSchema):
+        id = fields.Int()
+
+        @staticmethod
+        def _validate(data):
+            pass
+
+    ValidatedSchema._hooks[('validates_schema', False)] = ['_validate']
+    for schema_cls in (PdbSchema, ValidatedSchema):
+        with pytest.raises(CompileError):
+            compile_loader(schema_cls())
+    with pytest.raises(CompileError):
+        compile_loader(type('Schema', (ResponseSchema,), {'email': fields.Email()})())
+    assert compiled(PdbSchema)().get_compiled_loader() is None
+
+
+class Client(conftest.Client):
+    @response_schema(ItemSchema)
+    def get_item(self):
+        return self.get('item', parse_json=True)
+
+    @response_schema(compiled(ItemSchema))
+    def get_item_compiled(self):
+        return self.get('item', parse_json=True)
+
+
+@pytest.mark.parametrize('text', [
+    '{"id": 1, "title": "x"}',
+    '{"id": "x", "title": "very long title", "tags": [{"weight": "x"}]}',
+])
+def test_response_validation_error(text):
+    client = Client()
+    results = []
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/item', text=text)
+        for method in (client.get_item, client.get_item_compiled):
+            try:
+                results.append(normalize(method().data))
+            except ResponseValidationError as exc:
+                results.append(exc.errors)
+    assert results[0] == results[1]
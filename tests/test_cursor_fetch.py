@@ -0,0 +1,285 @@
+import asyncio
+import gc
+import threading
+import time
+
+import pytest
+import requests_mock
+
+from requests_client.cursor_fetch import (CursorFetchIterator, CursorFetchError,
+                                          ParallelFetchIterator, AsyncCursorFetchIterator)
+
+from conftest import Client
+
+
+PAGES = [[1, 2], [3], [], [4, 5, 6], [], [], [7], [8, 9]]
+
+
+def create_fetch(pages, fetched, delay=0):
+    def fetch(iterator):
+        index = iterator.cursor or 0
+        fetched.append(index)
+        time.sleep(delay)
+        iterator.cursor = index + 1 if index + 1 < len(pages) else None
+        return pages[index]
+    return fetch
+
+
+def iterate(pages=PAGES, **kwargs):
+    fetched, items = [], []
+    iterator = CursorFetchIterator(create_fetch(pages, fetched), **kwargs)
+    try:
+        for item in iterator:
+            items.append(item)
+    except CursorFetchError as exc:
+        items.append(type(exc))
+    return (items, iterator.cursor, iterator.has_more, iterator.count,
+            iterator.fetch_count), fetched
+
+
+ITERATE_KWARGS = [
+    {},
+    {'empty_fetch_retries': 1},
+    {'empty_fetch_retries': 2},
+    {'empty_fetch_retries': 2, 'max_count': 5},
+    {'empty_fetch_retries': 2, 'max_count_to_stop_fetch': 4},
+    {'empty_fetch_retries': 2, 'max_fetch_count': 3},
+    {'empty_fetch_retries': 2, 'max_fetch_count': 0},
+    {'empty_fetch_retries': 2, 'reverse': True, 'initial': [0]},
+    {'initial': [0], 'max_count_to_stop_fetch': 1},
+]
+
+
+@pytest.mark.parametrize('kwargs', ITERATE_KWARGS)
+@pytest.mark.parametrize('prefetch', [1, 3])
+def test_prefetch(kwargs, prefetch):
+    expected, expected_fetched = iterate(**kwargs)
+    result, fetched = iterate(prefetch=prefetch, **kwargs)
+    assert result == expected
+    # Iterated to the end, so no extra pages are fetched
+    assert fetched == expected_fetched
+
+
+async def async_iterate(pages=PAGES, **kwargs):
+    fetched, items = [], []
+    fetch = create_fetch(pages, fetched)
+
+    async def async_fetch(iterator):
+        await asyncio.sleep(0)
+        return fetch(iterator)
+
+    iterator = AsyncCursorFetchIterator(async_fetch, **kwargs)
+    try:
+        async for item in iterator:
+            items.append(item)
+    except CursorFetchError as exc:
+        items.append(type(exc))
+    return (items, iterator.cursor, iterator.has_more, iterator.count,
+            iterator.fetch_count), fetched
+
+
+@pytest.mark.parametrize('kwargs', ITERATE_KWARGS + [
+    {'max_count': 3}, {'empty_fetch_retries': 1, 'max_fetch_count': 4},
+    {'fetch_wait_seconds': 0.001, 'empty_fetch_wait_seconds': 0.001, 'empty_fetch_retries': 2},
+])
+def test_async(kwargs):
+    assert asyncio.run(async_iterate(**kwargs)) == iterate(**kwargs)
+
+
+def test_async_wait_seconds():
+    async def fetch(iterator):
+        iterator.cursor = (iterator.cursor or 0) + 1
+        iterator.has_more = iterator.cursor < 3
+        return [iterator.cursor]
+
+    async def ticker(ticks):
+        while True:
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def test():
+        ticks = []
+        task = asyncio.ensure_future(ticker(ticks))
+        iterator = AsyncCursorFetchIterator(fetch, fetch_wait_seconds=0.03)
+        items = [item async for item in iterator]
+        task.cancel()
+        return items, ticks
+
+    items, ticks = asyncio.run(test())
+    assert items == [1, 2, 3]
+    # Event loop is not blocked by waits between fetches
+    assert len(ticks) >= 5
+    with pytest.raises(TypeError):
+        list(AsyncCursorFetchIterator(fetch))
+    with pytest.raises(ValueError):
+        AsyncCursorFetchIterator(fetch, prefetch=1)
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_prefetch_fetch_state(prefetch):
+    fetch = create_fetch(PAGES, [])
+
+    def fetch_page(iterator):
+        iterator.page = iterator.cursor or 0
+        return fetch(iterator)
+
+    iterator = CursorFetchIterator(fetch_page, empty_fetch_retries=2, prefetch=prefetch)
+    # Attributes set by fetch_callback are changed on page consumption
+    assert [(item, iterator.page) for item in iterator] == [
+        (1, 0), (2, 0), (3, 1), (4, 3), (5, 3), (6, 3), (7, 6), (8, 7), (9, 7)]
+
+
+def _start_prefetch(**kwargs):
+    threads = set(threading.enumerate())
+    iterator = CursorFetchIterator(create_fetch(PAGES, [], 0.01), prefetch=1, **kwargs)
+    next(iterator)
+    thread, = set(threading.enumerate()) - threads
+    return iterator, thread
+
+
+def test_prefetch_thread_exit():
+    iterator, thread = _start_prefetch()
+    del iterator
+    gc.collect()
+    thread.join(1)
+    assert not thread.is_alive()
+
+    iterator, thread = _start_prefetch()
+    with iterator:
+        next(iterator)
+    thread.join(1)
+    assert not thread.is_alive()
+
+    # Closed on exhaustion, while iterator is still referenced
+    iterator, thread = _start_prefetch(max_count=3)
+    assert list(iterator) == [2, 3]
+    thread.join(1)
+    assert not thread.is_alive()
+
+
+def test_prefetch_overlap():
+    pages = [[i] for i in range(5)]
+
+    def consume(iterator):
+        started_at = time.monotonic()
+        for item in iterator:
+            time.sleep(0.05)
+        return time.monotonic() - started_at
+
+    elapsed = consume(CursorFetchIterator(create_fetch(pages, [], 0.05)))
+    prefetch_elapsed = consume(CursorFetchIterator(create_fetch(pages, [], 0.05), prefetch=2))
+    assert prefetch_elapsed < elapsed * 0.8
+
+
+def test_prefetch_stop_on_next_fetch():
+    fetched = []
+    iterator = CursorFetchIterator(create_fetch(PAGES, fetched, 0.01), prefetch=2)
+    assert next(iterator) == 1
+    iterator.stop_on_next_fetch()
+    assert list(iterator) == [2]
+    assert (iterator.cursor, iterator.fetch_count) == (1, 1)
+    assert len(fetched) <= 3
+    time.sleep(0.05)
+    assert len(fetched) <= 3
+
+
+def create_page_fetch(items, fetched, page_size=3, delay=0, set_total=True):
+    def fetch(iterator, page):
+        fetched.append(page)
+        time.sleep(delay)
+        if set_total:
+            iterator.total = len(items)
+        return items[page * page_size:(page + 1) * page_size]
+    return fetch
+
+
+@pytest.mark.parametrize('count', [0, 1, 3, 10, 12])
+@pytest.mark.parametrize('set_total', [True, False])
+@pytest.mark.parametrize('ordered', [True, False])
+def test_parallel(count, set_total, ordered):
+    items, fetched = list(range(count)), []
+    iterator = ParallelFetchIterator(create_page_fetch(items, fetched, set_total=set_total),
+                                     concurrency=3, ordered=ordered)
+    result = list(iterator)
+    assert (result if ordered else sorted(result)) == items
+    assert iterator.count == count and iterator.fetch_count == len(fetched)
+    pages = (count + 2) // 3
+    if set_total:
+        assert sorted(fetched) == list(range(max(pages, 1)))
+    else:
+        # Fetched until short page (empty page after full one),
+        # and up to concurrency + 1 next pages could be requested before it's returned
+        assert set(range(count // 3 + 1)) <= set(fetched) and len(fetched) <= pages + 5
+
+
+@pytest.mark.parametrize('kwargs, result, fetched', [
+    ({'max_count': 4}, [0, 1, 2, 3], [0, 1]),
+    ({'max_count': 6}, list(range(6)), [0, 1]),
+    ({'max_count': 0}, [], []),
+    ({'max_fetch_count': 2}, list(range(6)), [0, 1]),
+    ({'max_fetch_count': 0}, [], []),
+    ({'pages': 3}, list(range(9)), [0, 1, 2]),
+    ({'start': 2, 'max_fetch_count': 2}, list(range(6, 12)), [2, 3]),
+])
+def test_parallel_bounds(kwargs, result, fetched):
+    pages = []
+    iterator = ParallelFetchIterator(create_page_fetch(list(range(20)), pages, set_total=False),
+                                     concurrency=4, **kwargs)
+    assert list(iterator) == result
+    assert sorted(pages) == fetched
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_parallel_clamped_pages(ordered):
+    # API returns last page for page numbers out of range, and last page is slowest
+    def fetch(iterator, page):
+        page = min(page, 3)
+        time.sleep(0.1 if page == 3 else 0.01)
+        return list(range(7))[page * 2:(page + 1) * 2]
+
+    iterator = ParallelFetchIterator(fetch, concurrency=6, ordered=ordered)
+    result = list(iterator)
+    assert (result if ordered else sorted(result)) == list(range(7))
+    assert iterator.fetch_count > 4
+
+
+def test_parallel_concurrency():
+    fetched = []
+    iterator = ParallelFetchIterator(create_page_fetch(list(range(30)), fetched, delay=0.05),
+                                     concurrency=9)
+    started_at = time.monotonic()
+    assert list(iterator) == list(range(30))
+    # First page and then 9 pages at once
+    assert time.monotonic() - started_at < 0.05 * 4
+
+
+def test_parallel_error():
+    def fetch(iterator, page):
+        if page == 2:
+            raise ValueError(page)
+        return [page] * 2
+
+    iterator = ParallelFetchIterator(fetch, concurrency=2)
+    with pytest.raises(ValueError):
+        list(iterator)
+
+
+def test_parallel_client_ratelimit():
+    client = Client(request_wait_seconds=0.05)
+    call_times = []
+    client.session.hooks['response'].append(lambda r, **kw: call_times.append(time.monotonic()))
+
+    def fetch(iterator, page):
+        data = client.get('items', params={'page': page}, parse_json=True).data
+        iterator.total = data.total
+        return data['items']
+
+    with requests_mock.Mocker() as mocker:
+        for page in range(4):
+            mocker.get('http://test/items?page={}'.format(page), complete_qs=True,
+                       json={'total': 8, 'items': [page] * 2})
+        result = list(ParallelFetchIterator(fetch, concurrency=4))
+    assert result == [0, 0, 1, 1, 2, 2, 3, 3]
+    call_times.sort()
+    assert len(call_times) == 4
+    assert all(b - a >= 0.04 for a, b in zip(call_times, call_times[1:]))
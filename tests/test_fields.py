@@ -0,0 +1,76 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from marshmallow import ValidationError, fields
+
+from requests_client.fields import TimestampField
+from requests_client.schemas import ResponseSchema
+from requests_client.utils import from_timestamp, to_timestamp, get_tz
+
+
+@pytest.mark.parametrize('timezone', ['UTC', 'Europe/Moscow', 'America/New_York'])
+@pytest.mark.parametrize('ms', [False, True])
+def test_timestamp_field(timezone, ms):
+    rnd = random.Random(timezone)
+    scale = 1000 if ms else 1
+    values = [rnd.randint(-2 * 10 ** 9, 4 * 10 ** 9) * scale + rnd.randint(0, scale)
+              for _ in range(1000)]
+    values += [value + rnd.random() for value in values[:300]] + [0, '1546300800', 1.5]
+
+    for naive in (False, True):
+        field = TimestampField(timezone, ms=ms, naive=naive)
+        tz = None if naive else get_tz(timezone)
+        expected = [from_timestamp(value, tz, ms) for value in values]
+        assert [field.deserialize(value) for value in values] == expected
+        assert field.deserialize_many(values) == expected
+        assert field.deserialize_many([None] + values[:10]) == [None] + expected[:10]
+
+    field = TimestampField(timezone, ms=ms)
+    int_field = TimestampField(timezone, ms=ms, as_int=True)
+    for value, dt in zip(values[:500], expected):
+        for dt_ in (dt, dt.astimezone(get_tz('Asia/Tokyo')), dt.replace(tzinfo=None)):
+            assert field._serialize(dt_, None, None) == to_timestamp(dt_, timezone, ms)
+        for dt_ in (dt, dt.replace(tzinfo=None)):
+            # Exact for int timestamps (float timestamp may be truncated to value - 1)
+            assert int_field._serialize(dt_, None, None) == value
+    assert int_field._serialize(expected[-1], None, None) == 1
+    assert field._serialize(None, None, None) is None
+
+
+def test_timestamp_field_errors():
+    field = TimestampField(ms=True, zero_as_none=True)
+    assert field.deserialize(0) is None
+    assert field.deserialize_many([0, 1000, None]) == [
+        None, datetime(1970, 1, 1, 0, 0, 1, tzinfo=field.timezone), None]
+    assert TimestampField().deserialize(0) == datetime(1970, 1, 1, tzinfo=field.timezone)
+    assert TimestampField(naive=True).deserialize(-1) == datetime(1970, 1, 1) - timedelta(0, 1)
+
+    for value in (10 ** 20, float('nan'), float('inf'), 'x'):
+        with pytest.raises(ValidationError):
+            field.deserialize(value)
+        with pytest.raises(ValidationError):
+            field.deserialize_many([1, value])
+
+
+def test_timestamp_field_schema_many():
+    class Schema(ResponseSchema):
+        id = fields.Int()
+        created = TimestampField(ms=True, zero_as_none=True, data_key='ts')
+        seen = TimestampField(naive=True, missing=None, allow_none=True, attribute='seen_at')
+
+    data = [{'id': 1, 'ts': 1546300800000, 'seen': 5}, {'id': 2, 'ts': 0}, {'seen': None}]
+    expected = [Schema().load(item) for item in data]
+    schema = Schema(many=True)
+    # Valid columns are deserialized at once
+    schema.fields['created']._deserialize = schema.fields['seen']._deserialize = None
+    assert schema.load(data) == expected
+    assert expected[0]['created'] == datetime(2019, 1, 1, tzinfo=schema.fields['created'].timezone)
+    assert 'created' not in expected[2]
+
+    data += [{'ts': 'x', 'seen': 10 ** 20}]
+    with pytest.raises(ValidationError) as exc:
+        Schema(many=True).load(data)
+    assert exc.value.messages == {3: {'ts': ['Not a valid timestamp.'],
+                                      'seen': ['Not a valid timestamp.']}}
+    assert exc.value.valid_data[:3] == expected
@@ -0,0 +1,96 @@
+import json
+from collections import namedtuple
+from json import JSONDecodeError
+
+import pytest
+import requests_mock
+from requests.exceptions import InvalidJSONError
+
+from requests_client.exceptions import ClientError
+from requests_client.jsoncodec import CODECS, get_codec
+from requests_client.utils import pprint
+
+from conftest import Client
+
+
+CODEC_NAMES = [name for name, cls in CODECS.items() if cls]
+
+
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_codec(name):
+    codec = get_codec(name)
+    assert codec.loads(b'{"x": ["\xd1\x82", 1.5, null]}') == {'x': ['т', 1.5, None]}
+    assert codec.loads('{"x": 1}') == {'x': 1}
+    assert codec.loads(codec.dumps({'x': ['т', 1]})) == {'x': ['т', 1]}
+    assert codec.dumps({'x': 1}, indent=2).decode().startswith('{\n  "x"')
+    assert codec.dumps({'x': 1}, indent=4).decode().startswith('{\n    "x"')
+    assert codec.dumps({'x': object()}, default=lambda obj: 'obj') == b'{"x":"obj"}'
+    for data in (b'', b'{"x": ', '[1, 2'):
+        with pytest.raises(JSONDecodeError):
+            codec.loads(data)
+
+
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_codec_stdlib_compatibility(name):
+    # Same results as stdlib json for values not supported by fast codecs
+    codec, stdlib = get_codec(name), get_codec('json')
+    Point = namedtuple('Point', 'x y')
+    for obj in ([2 ** 70, -2 ** 64], [Point(1, 2)], {'x': [float('nan'), float('inf')]},
+                [None, 1.5]):
+        assert json.loads(codec.dumps(obj)) == json.loads(stdlib.dumps(obj))
+        assert codec.dumps(obj).replace(b' ', b'') == stdlib.dumps(obj)
+    with pytest.raises(ValueError):
+        codec.dumps([float('nan')], allow_nan=False)
+    for data in (b'[99999999999999999999999999, 1]', '[-18446744073709551617]',
+                 b'{"x": NaN, "y": -Infinity}', b'[1e30, 18446744073709551615]',
+                 b'{"a": -9223372036854775809}', b'[-9223372036854775808, 1234567890123456789]'):
+        assert repr(codec.loads(data)) == repr(stdlib.loads(data))
+    # Long numbers on any offset and after many long floats are found
+    for data in ['[{}99999999999999999999]'.format('1, ' * offset) for offset in range(10)] + [
+            '[{}-9223372036854775809]'.format('1, ' * offset) for offset in range(10)] + [
+            '[{}, 99999999999999999999]'.format(', '.join(['0.1234567890123456'] * 20)),
+            '[{}, -9223372036854775809]'.format(', '.join(['-1234567890123456789'] * 20))]:
+        assert repr(codec.loads(data)) == repr(stdlib.loads(data))
+
+
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_client_codec(name):
+    client = Client(json_codec=name)
+    assert client.json_codec.name == name
+
+    with requests_mock.Mocker() as mocker:
+        mocker.post('http://test/path', text='{"hello": "мир"}',
+                    headers={'Content-Type': 'application/json'})
+        resp = client.post('path', json={'x': 'т'}, parse_json=True)
+        assert resp.data.hello == 'мир'
+        assert mocker.last_request.headers['Content-Type'] == 'application/json'
+        assert mocker.last_request.json() == {'x': 'т'}
+
+        mocker.get('http://test/path', content='{"hello": "мир"}'.encode('cp1251'),
+                   headers={'Content-Type': 'application/json; charset=cp1251'})
+        assert client.get('path', parse_json=True).data.hello == 'мир'
+
+        # Without charset encoding is detected, same as response.json()
+        for encoding in ('utf-8', 'utf-8-sig', 'utf-16', 'utf-16-be', 'utf-32'):
+            mocker.get('http://test/path', content='{"hello": "мир"}'.encode(encoding))
+            assert client.get('path', parse_json=True).data.hello == 'мир'
+
+        mocker.post('http://test/path', json={})
+        client.post('path', json={'x': 2 ** 70})
+        assert mocker.last_request.json() == {'x': 2 ** 70}
+        with pytest.raises(InvalidJSONError):
+            client.post('path', json={'x': float('nan')})
+
+        mocker.get('http://test/path', text='unparsable')
+        with pytest.raises(ClientError) as exc:
+            client.get('path', parse_json=True)
+        assert isinstance(exc.value, JSONDecodeError)
+
+
+def test_get_codec():
+    codec = get_codec('json')
+    assert get_codec(codec) is codec
+    assert get_codec().name == CODEC_NAMES[0]
+    with pytest.raises(ValueError):
+        get_codec('unknown')
+    assert pprint(b'{"x": 1}', color=False, print_=False) == '{\n  "x": 1\n}'
@@ -0,0 +1,68 @@
+import json
+import tracemalloc
+
+import pytest
+
+from requests_client.jsonstream import load_path, iter_path_items, JSONPathError
+from requests_client.utils import AttrDict, resolve_obj_path
+
+
+DOC = {
+    'meta': {'count': 3, 'next': None, 'skip': [{'x': 'y,]}'}, 1e10, -12, True]},
+    'data': {'items': [{'id': 1, 'name': 'тест'}, {'id': 2, 'tags': []}, 12345678901234]},
+    'empty': [],
+}
+
+
+def _chunks(doc, size):
+    data = json.dumps(doc, ensure_ascii=False, indent=1).encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 3, 1024])
+@pytest.mark.parametrize('path', ['meta', 'meta.skip.0.x', 'meta.skip.2', 'data.items',
+                                  'data.items.1', 'data.items.2', 'empty'])
+def test_load_path(path, size):
+    data = load_path(_chunks(DOC, size), path)
+    assert data == resolve_obj_path(DOC, path)
+
+
+def test_load_path_attr_dict():
+    data = load_path(_chunks(DOC, 7), 'data')
+    assert isinstance(data, AttrDict)
+    assert data['items'][0].name == 'тест'
+
+
+@pytest.mark.parametrize('size', [1, 1024])
+def test_iter_path_items(size):
+    items = iter_path_items(_chunks(DOC, size), 'data.items')
+    assert next(items) == {'id': 1, 'name': 'тест'}
+    assert list(items) == DOC['data']['items'][1:]
+    assert list(iter_path_items(_chunks(DOC, size), 'empty')) == []
+    assert list(iter_path_items(_chunks([1, 2], size))) == [1, 2]
+
+
+def test_skip_memory():
+    # Skipped siblings are not decoded and not kept in buffer
+    skip = [{'id': i, 'name': 'item "{}" ]'.format(i), 'tags': ['a', '\\']} for i in range(30000)]
+    data = json.dumps({'skip': skip, 'data': {'skip': 'x' * 2 ** 20, 'items': [1]}}).encode()
+    tracemalloc.start()
+    try:
+        assert load_path((data[i:i + 4096] for i in range(0, len(data), 4096)),
+                         'data.items') == [1]
+        assert tracemalloc.get_traced_memory()[1] < len(data) / 20
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('path', ['missing', 'meta.skip.4', 'meta.skip.x', 'meta.count.x'])
+def test_path_error(path):
+    with pytest.raises(JSONPathError):
+        load_path(_chunks(DOC, 5), path)
+
+
+def test_decode_error():
+    with pytest.raises(json.JSONDecodeError):
+        load_path([b'{"a": {"b": [1, 2'], 'a.b')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_path_items([b'[1, 2 3]']))
@@ -0,0 +1,171 @@
+import pickle
+from abc import ABC, abstractmethod
+from copy import copy
+
+import pytest
+from marshmallow import fields, missing
+
+from requests_client.models import Entity, SchemedEntity, BindedEntityMixin
+
+
+class User(SchemedEntity):
+    id = fields.Int()
+    name = fields.Str(default='anonymous')
+
+
+class SlottedUser(BindedEntityMixin, SchemedEntity):
+    __slots__ = True
+
+    id = fields.Int()
+    name = fields.Str(default='anonymous')
+
+    @property
+    def title(self):
+        return 'User {}'.format(self.name)
+
+
+class SlottedAdmin(SlottedUser):
+    __slots__ = True
+
+    level = fields.Int()
+
+
+def test_slotted_entity():
+    assert set(SlottedUser.__slots__) == {'id', 'name', '_entity', '_meta', '_client'}
+    assert SlottedAdmin.__slots__ == ('level',)
+    assert set(SlottedAdmin.schema.fields) == {'id', 'name', 'level'}
+
+    user = SlottedUser.load({'id': 1})
+    assert not hasattr(user, '__dict__')
+    assert (user.id, user.name, user.title) == (1, 'anonymous', 'User anonymous')
+    assert user.to_dict() == User.load({'id': 1}).to_dict() == {'id': 1, 'name': 'anonymous'}
+    assert SlottedUser.load([{'id': 1}], many=True)[0].id == 1
+
+    admin = SlottedAdmin(level=2)
+    assert not hasattr(admin, '__dict__')
+    assert admin.id is missing and ('id' in admin) == ('id' in User())
+    assert admin.to_dict() == {'name': 'anonymous', 'level': 2}
+    with pytest.raises(AttributeError) as exc:
+        SlottedAdmin(unknown=1)
+    assert 'Unknown attribute "unknown"' in str(exc.value)
+    with pytest.raises(AttributeError):
+        admin.unknown
+
+    admin.meta['x'] = 1
+    admin._entity = {'id': 3}
+    assert admin._meta == {'x': 1} and admin._entity == {'id': 3}
+    with pytest.raises(RuntimeError):
+        admin.client
+    admin._client = 'client'
+    assert admin.client == 'client'
+
+    loaded = pickle.loads(pickle.dumps(SlottedAdmin(id=4, level=5)))
+    assert (loaded.id, loaded.level) == (4, 5)
+    admin.update(loaded)
+    assert (admin.id, admin.level) == (4, 5)
+
+
+def test_declared_slots():
+    # Declared slots are not making instances fully slotted, same as before slotted bases
+    class Plain(Entity):
+        __slots__ = ('a',)
+
+    class Binded(BindedEntityMixin, SchemedEntity):
+        __slots__ = ('b',)
+
+        id = fields.Int()
+
+    for cls, kwargs in ((Plain, {'a': 1}), (Binded, {'b': 1})):
+        entity = cls(**kwargs)
+        assert entity.meta == {}
+        entity.other = 2
+        assert entity.other == 2 and hasattr(entity, '__dict__')
+        with pytest.raises(AttributeError):
+            cls(unknown=1)
+    assert Plain(a=1).to_dict() == {'a': 1}
+    assert Plain.__slots__ == ('a',)
+
+    class Pair(Entity):
+        __slots__ = ('a', 'b')
+
+    first, second = Pair(a=1), Pair(a=2, b=3)
+    first.update(second)
+    first.c = 5
+    assert (first.a, first.b) == (2, 3)
+    assert first.__dict__ is not second.__dict__ and not hasattr(second, 'c')
+    copied = copy(first)
+    assert (copied.a, copied.b, copied.c) == (2, 3, 5)
+
+
+def test_abc_mixin():
+    class Named(ABC):
+        __slots__ = ()
+
+        @abstractmethod
+        def get_name(self):
+            pass
+
+    class NamedUser(User, Named):
+        def get_name(self):
+            return self.name
+
+    class SlottedNamedUser(SlottedUser, Named):
+        __slots__ = True
+
+        def get_name(self):
+            return self.name
+
+    class NamedEntity(Entity, Named):
+        pass
+
+    for cls in (NamedUser, SlottedNamedUser):
+        assert cls(name='x').get_name() == 'x'
+        assert isinstance(cls(), Named)
+    assert not hasattr(SlottedNamedUser(), '__dict__')
+    with pytest.raises(TypeError):
+        NamedEntity()
+
+
+def test_pickle():
+    for cls in (User, SlottedUser, SlottedAdmin):
+        entity = cls(id=1)
+        del entity.name
+        entity.meta['x'] = 1
+        loaded = pickle.loads(pickle.dumps(entity))
+        assert loaded.to_dict() == {'id': 1}
+        assert loaded.meta == {'x': 1} and loaded.name is missing
+        assert repr(loaded) == repr(entity)
+
+
+def test_create_many():
+    class Custom(User):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.custom = True
+
+    class WithProperty(User):
+        @property
+        def full_name(self):
+            return self.name
+
+        @full_name.setter
+        def full_name(self, value):
+            self.name = value.upper()
+
+    items = [{'id': 1}, {'id': 2, 'name': 'x'}, {}]
+    for entity in (User, SlottedUser, SlottedAdmin, Custom, WithProperty):
+        rv = entity.create_many([dict(item) for item in items])
+        expected = tuple(entity(**item) for item in items)
+        assert isinstance(rv, tuple)
+        assert [type(obj) for obj in rv] == [entity] * len(items)
+        assert ([obj.to_dict() for obj in rv] == [obj.to_dict() for obj in expected]
+                == [{'id': 1, 'name': 'anonymous'}, {'id': 2, 'name': 'x'},
+                    {'name': 'anonymous'}])
+        assert [getattr(obj, '__dict__', None) for obj in rv] == \
+            [getattr(obj, '__dict__', None) for obj in expected]
+    assert all(obj.custom for obj in Custom.create_many(items))
+    assert (WithProperty.create_many([{'full_name': 'y', 'id': 1}])[0].to_dict()
+            == WithProperty(full_name='y', id=1).to_dict())
+    with pytest.raises(AttributeError) as exc:
+        SlottedUser.create_many([{'id': 1}, {'unknown': 1}])
+    assert 'Unknown attribute "unknown"' in str(exc.value)
@@ -0,0 +1,212 @@
+import time
+
+import pytest
+import requests_mock
+
+from requests_client.client import ratelimit
+from requests_client.ratelimit import TokenBucket
+
+import conftest
+
+
+def test_token_bucket():
+    clock = conftest.Clock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # callers are queued after burst is exhausted
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1
+
+    clock.time = 10
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+    clock.time = 10.25
+    assert bucket.reserve() == 0.25
+    bucket.drain()
+    clock.time = 10.5
+    assert bucket.reserve() == 0.5
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+class Client(conftest.Client):
+    search_ratelimiter = TokenBucket(rate=1, burst=1)
+
+    @ratelimit('search_ratelimiter')
+    def search(self, **kwargs):
+        return self.get('search', **kwargs)
+
+    def sleep(self, seconds, *args, **kwargs):
+        self.sleeped.append(round(seconds, 1))
+
+
+def test_client_ratelimiter():
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path')
+        mocker.get('http://test/search')
+
+        client = Client(request_wait_seconds=10)
+        client.sleeped = []
+        assert isinstance(client.ratelimiter, TokenBucket)
+        client.get('path')
+        client.get('path')
+        assert client.sleeped == [0, 10]
+
+        # ratelimiter shared between clients
+        ratelimiter = TokenBucket(rate=0.1, burst=2, clock=conftest.Clock())
+        client1, client2 = Client(ratelimiter=ratelimiter), Client(ratelimiter=ratelimiter)
+        client1.sleeped, client2.sleeped = [], []
+        client1.get('path')
+        client2.get('path')
+        client1.get('path')
+        assert client1.sleeped == [0, 10]
+        assert client2.sleeped == [0]
+
+        # endpoint ratelimiter is applied in addition to client ratelimiter
+        client = Client()
+        client.sleeped = []
+        client.search()
+        client.search()
+        client.get('path')
+        assert client.sleeped == [0, 1, 0]
+
+
+@pytest.fixture
+def redis_storage():
+    fakeredis = pytest.importorskip('fakeredis')
+    # fakeredis needs lupa to run lua scripts
+    pytest.importorskip('lupa')
+    from requests_client.storage import RedisStorage
+
+    server = fakeredis.FakeServer()
+    RedisStorage._redis_map['redis://fake'] = fakeredis.FakeStrictRedis(server=server)
+    yield RedisStorage('redis://fake', 'CLIENT_RATELIMIT_'), server
+    del RedisStorage._redis_map['redis://fake']
+
+
+def test_redis_ratelimiter(redis_storage):
+    from requests_client.ratelimit import RedisRateLimiter
+
+    storage, server = redis_storage
+    # Different limiter instances simulate different processes sharing quota
+    limiter1 = RedisRateLimiter(storage, rate=1, burst=2)
+    limiter2 = RedisRateLimiter(storage, rate=1, burst=2)
+    assert limiter1.reserve(key='a') == 0
+    assert limiter2.reserve(key='a') == 0
+    assert limiter1.reserve(key='a') == pytest.approx(1, abs=0.1)
+    assert limiter2.reserve(key='a') == pytest.approx(2, abs=0.1)
+    # Quota is kept by lua script, not by local fallback
+    assert storage._redis.exists(storage._build_key(':a'))
+    assert not limiter1._fallback_until and not limiter2._fallback_until
+    # Other keys (auth_ident) and endpoints are limited separately
+    assert limiter1.reserve(key='b') == 0
+    assert RedisRateLimiter(storage, rate=1, name='search').reserve(key='a') == 0
+
+    # Fallback to local limiting if redis is unavailable
+    server.connected = False
+    assert [limiter1.reserve(key='a') for _ in range(3)] == [0, 0, pytest.approx(1, abs=0.1)]
+    assert limiter1._fallback_until
+    server.connected = True
+    # redis is not tried until fallback_seconds passed
+    assert limiter1.reserve(key='c') == 0
+    assert not storage._redis.exists(storage._build_key(':c'))
+    limiter1._fallback_until = 1
+    assert limiter1.reserve(key='c') == 0
+    assert storage._redis.exists(storage._build_key(':c'))
+
+
+def test_redis_ratelimiter_client(redis_storage):
+    from requests_client.ratelimit import RedisRateLimiter
+
+    storage, _ = redis_storage
+    ratelimiter = RedisRateLimiter(storage, rate=0.1, clock=conftest.Clock())
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path')
+        client1 = Client(auth_ident='user1', ratelimiter=ratelimiter)
+        client2 = Client(auth_ident='user2', ratelimiter=ratelimiter)
+        client1.sleeped, client2.sleeped = [], []
+        client1.get('path')
+        client2.get('path')
+        client1.get('path')
+        assert client1.sleeped == [0, 10]
+        assert client2.sleeped == [0]
+
+
+def test_parse_ratelimit_headers():
+    from requests_client.ratelimit import parse_ratelimit_headers
+
+    assert parse_ratelimit_headers({}) == dict(retry_after=None, limit=None,
+                                               remaining=None, reset=None)
+    assert parse_ratelimit_headers({
+        'Retry-After': '5', 'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '10',
+        'X-RateLimit-Reset': '30',
+    }) == dict(retry_after=5, limit=100, remaining=10, reset=30)
+    rv = parse_ratelimit_headers({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT',
+                                  'X-RateLimit-Reset': str(int(time.time()) + 60)})
+    assert rv['retry_after'] == 0
+    assert rv['reset'] == pytest.approx(60, abs=2)
+    rv = parse_ratelimit_headers({'X-RateLimit-Reset': str(int(time.time() * 1000) + 60000)})
+    assert rv['reset'] == pytest.approx(60, abs=2)
+    assert parse_ratelimit_headers({'RateLimit': 'limit=10, remaining=5, reset=3'}) == \
+        dict(retry_after=None, limit=10, remaining=5, reset=3)
+    assert parse_ratelimit_headers({'RateLimit': '"default";r=5;t=3',
+                                    'RateLimit-Limit': '10, 10;w=1'}) == \
+        dict(retry_after=None, limit=10, remaining=5, reset=3)
+    assert parse_ratelimit_headers({'Retry-After': 'unparsable'})['retry_after'] is None
+
+
+def test_adaptive_ratelimiter():
+    from requests_client.ratelimit import AdaptiveRateLimiter
+
+    clock = conftest.Clock()
+    limiter = AdaptiveRateLimiter(pace_ratio=0.5, clock=clock)
+    assert limiter.reserve() == 0
+
+    limiter.update(limit=8, remaining=6, reset=8)
+    assert [limiter.reserve() for _ in range(2)] == [0, 0]
+    # remaining 4 of 8 limit, spreading requests until reset
+    assert [limiter.reserve() for _ in range(4)] == [0, 2, 4, 6]
+    # no requests remaining, waiting until reset
+    assert limiter.reserve() == 8
+    clock.time = 9
+    assert limiter.reserve() == 0
+
+    limiter.update(retry_after=3)
+    assert limiter.reserve() == 3
+    clock.time = 13
+    assert limiter.reserve() == 0
+
+    # Waits are limited by max_wait
+    limiter.max_wait = 60
+    limiter.update(limit=8, remaining=0, reset=1.79e12)
+    assert limiter.reserve() == 60
+    limiter.update(retry_after=1000)
+    assert limiter.reserve() == 60
+
+
+def test_client_ratelimit_headers():
+    from requests_client.client import ratelimit_error
+    from requests_client.exceptions import HTTPError, RetryExceeded
+
+    class _Client(Client):
+        @ratelimit_error(HTTPError, {'status': 429})
+        def test(self, **kwargs):
+            return self.get('path', **kwargs)
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', status_code=429, headers={'Retry-After': '7'})
+        client = _Client(ratelimit_retries=1, ratelimit_wait_seconds=100)
+        client.sleeped = []
+        with pytest.raises(RetryExceeded):
+            client.test()
+        # retry waits for Retry-After, then limiter is not blocking anymore
+        assert client.sleeped[:2] == [0, 7]
+
+        mocker.get('http://test/path', headers={'X-RateLimit-Remaining': '0',
+                                                'X-RateLimit-Reset': '30'})
+        client = _Client()
+        client.sleeped = []
+        client.get('path')
+        client.get('path')
+        assert client.sleeped == [0, 30]
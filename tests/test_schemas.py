@@ -0,0 +1,173 @@
+import gc
+import weakref
+from threading import Barrier
+
+import requests_mock
+from marshmallow import Schema, fields, post_load
+from marshmallow.base import FieldABC
+from marshmallow.schema import _get_fields, _get_fields_by_mro
+
+from requests_client.client import response_schema
+from requests_client import schemas
+from requests_client.schemas import (ResponseSchema, maybe_create_response_schema,
+                                     schema_context, get_declared_fields)
+
+import conftest
+
+
+class Model:
+    _client = None
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+barrier = Barrier(2)
+
+
+def _wait(value):
+    # Both loads are running at same time on shared schema
+    barrier.wait(timeout=5)
+    return value
+
+
+class ModelSchema(ResponseSchema):
+    id = fields.Function(deserialize=_wait)
+
+    class Meta:
+        model = Model
+
+
+class Client(conftest.Client):
+    @response_schema(ModelSchema)
+    def get_model(self):
+        return self.get('model', parse_json=True)
+
+
+def test_schema_cache():
+    schema = {'id': fields.Int()}
+    # Schemas for dicts are cached only if requested (by decorators)
+    assert maybe_create_response_schema(schema) is not maybe_create_response_schema(schema)
+    assert (maybe_create_response_schema(schema, cache=True)
+            is maybe_create_response_schema(schema) is maybe_create_response_schema(schema))
+    assert maybe_create_response_schema(ModelSchema) is maybe_create_response_schema(ModelSchema)
+    assert (maybe_create_response_schema(ModelSchema, many=True)
+            is not maybe_create_response_schema(ModelSchema))
+    assert (maybe_create_response_schema(ModelSchema, only=['id'])
+            is not maybe_create_response_schema(ModelSchema, only=['id']))
+    instance = ModelSchema()
+    assert maybe_create_response_schema(instance) is instance
+
+
+def test_schema_cache_eviction(monkeypatch):
+    monkeypatch.setattr(schemas, 'SCHEMAS_CACHE_SIZE', 2)
+    monkeypatch.setattr(schemas, '_schemas_cache', type(schemas._schemas_cache)())
+    cached = maybe_create_response_schema(ModelSchema)
+    for _ in range(3):
+        maybe_create_response_schema({'id': fields.Int()})
+    assert len(schemas._schemas_cache) == 1
+    schema_classes = [type('Schema', (ResponseSchema,), {}) for _ in range(2)]
+    maybe_create_response_schema(schema_classes[0])
+    assert maybe_create_response_schema(ModelSchema) is cached
+    maybe_create_response_schema(schema_classes[1])
+    # Least recently used is evicted
+    assert maybe_create_response_schema(ModelSchema) is cached
+    assert len(schemas._schemas_cache) == 2
+
+
+def test_schema_context():
+    schema = maybe_create_response_schema({'id': fields.Int()})
+    schema.context['own'] = 1
+    with schema_context(client='client'):
+        assert dict(schema.context) == {'client': 'client', 'own': 1}
+        schema.context['response'] = 'response'
+    assert dict(schema.context) == {'own': 1}
+
+
+def test_shared_schema_load():
+    clients = [Client(), Client()]
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/model', text='{"id": 1}')
+        results = clients[0].gather([clients[0].get_model, clients[1].get_model])
+    assert [r.data._client for r in results] == clients
+
+
+def test_plain_schema_context():
+    class ItemSchema(Schema):
+        id = fields.Int()
+
+        @post_load
+        def set_client(self, data):
+            data['client'] = self.context.get('client')
+            return data
+
+    class PlainSchema(ItemSchema):
+        items = fields.Nested(ItemSchema, many=True)
+
+    class PlainClient(conftest.Client):
+        @response_schema(PlainSchema)
+        def get_plain(self):
+            return self.get('plain', parse_json=True)
+
+    clients = [PlainClient(), PlainClient()]
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/plain', text='{"id": 1, "items": [{"id": 2}]}')
+        for client in clients:
+            data = client.get_plain().data
+            assert data['client'] is data['items'][0]['client'] is client
+            instance = PlainSchema(context={'own': 1})
+            assert client.load_response_schema(client.get('plain', parse_json=True),
+                                               instance)['client'] is client
+            assert instance.context['own'] == 1 and instance.context['client'] is client
+    # Shared cached instance is not mutated
+    assert maybe_create_response_schema(PlainSchema).context == {}
+
+
+def test_get_declared_fields():
+    class Base:
+        x = fields.Int()
+        y = fields.Str()
+
+        @property
+        def broken(self):
+            raise RuntimeError()
+
+    class Entity(Base):
+        z = fields.Int()
+
+    def scan(cls):
+        # Previous implementation
+        attrs = {name: getattr(cls, name) for name in dir(cls)}
+        return _get_fields({k: v for k, v in attrs.items() if isinstance(v, FieldABC)},
+                           FieldABC) + _get_fields_by_mro(cls, FieldABC)
+
+    assert get_declared_fields(Entity) == scan(Entity)
+    assert list(dict(get_declared_fields(Entity))) == ['x', 'y', 'z']
+    assert get_declared_fields(Entity) == get_declared_fields(Entity)
+
+    Entity.w = fields.Int()
+    del Base.y
+    assert list(dict(get_declared_fields(Entity))) == ['w', 'x', 'z']
+    assert get_declared_fields(Entity) == scan(Entity)
+
+    class Child(Entity):
+        x = None
+        v = fields.Int()
+
+    class Mixed(Child, Base):
+        pass
+
+    Base.u = fields.Int()
+    for cls in (Child, Mixed, Entity):
+        assert get_declared_fields(cls) == scan(cls)
+
+
+def test_get_declared_fields_release():
+    refs = []
+    for _ in range(10):
+        cls = type('Entity', (), {'x': fields.Int()})
+        get_declared_fields(cls)
+        refs.append(weakref.ref(cls))
+    del cls
+    gc.collect()
+    assert not any(ref() for ref in refs)
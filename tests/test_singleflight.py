@@ -0,0 +1,172 @@
+import asyncio
+import time
+from threading import Event, Thread
+
+import pytest
+import requests_mock
+
+from requests_client.client import response_schema, temporary_error
+from requests_client.exceptions import HTTPError
+from requests_client.fields import TimestampField
+from requests_client.singleflight import SingleFlight, AsyncSingleFlight
+
+from conftest import Client
+
+
+def test_single_flight():
+    single_flight = SingleFlight()
+    started = Event()
+
+    def func():
+        started.set()
+        time.sleep(0.1)
+        return [1]
+
+    client = Client()
+    results = client.gather([
+        lambda: single_flight.do('key', func, copy=list),
+        lambda: started.wait() and single_flight.do('key', func, copy=list),
+        lambda: started.wait() and single_flight.do('other', lambda: 2),
+    ])
+    assert results == [[1], [1], 2]
+    assert results[0] is not results[1]
+    assert (single_flight.hits, single_flight.misses) == (1, 2)
+
+    with pytest.raises(ValueError):
+        single_flight.do('key', lambda: int('x'))
+    assert not single_flight._calls
+
+
+def test_single_flight_base_exception():
+    single_flight = SingleFlight()
+    started = Event()
+
+    class Interrupt(BaseException):
+        pass
+
+    def func():
+        started.set()
+        time.sleep(0.1)
+        raise Interrupt()
+
+    def call(wait):
+        try:
+            wait and started.wait()
+            single_flight.do('key', func)
+        except Interrupt as exc:
+            results.append(exc)
+
+    results = []
+    threads = [Thread(target=call, args=(wait,)) for wait in (False, True)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 2 and isinstance(results[0], Interrupt)
+    assert results[1] is results[0]
+    assert not single_flight._calls
+
+
+def test_async_single_flight_cancelled():
+    single_flight = AsyncSingleFlight()
+
+    async def func():
+        await asyncio.sleep(10)
+
+    async def test():
+        leader = asyncio.ensure_future(single_flight.do('key', func))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do('key', func))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(follower, 1)
+        assert not single_flight._calls
+        assert await single_flight.do('key', lambda: asyncio.sleep(0)) is None
+
+    asyncio.run(test())
+
+
+def test_client_single_flight():
+    client = Client(single_flight=SingleFlight())
+
+    def callback(request, context):
+        time.sleep(0.2)
+        return {'x': request.qs['x'][0]}
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', json=callback)
+        results = client.gather([('get', ('path',), {'params': {'x': 1}, 'parse_json': True})] * 4
+                                + [('get', ('path',), {'params': {'x': 2}, 'parse_json': True})])
+        assert [r.data.x for r in results] == ['1'] * 4 + ['2']
+        assert mocker.call_count == 2
+        assert client.calls_count == 2
+        assert client.single_flight.hits == 3
+        # responses are copies of leader response snapshot, parsed data is shared
+        assert len(set(map(id, results))) == 5
+        assert results[0].data is results[1].data
+
+        mocker.get('http://test/path', status_code=500)
+        results = client.gather([('get', ('path',))] * 2)
+        assert all(isinstance(r, HTTPError) for r in results)
+
+
+def test_client_single_flight_headers():
+    client = Client(single_flight=SingleFlight())
+
+    def callback(request, context):
+        time.sleep(0.2)
+        return {'accept': request.headers.get('Accept')}
+
+    def error_processor(exc):
+        raise ValueError()
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', json=callback)
+        results = client.gather(
+            [('get', ('path',), {'headers': {'Accept': accept}, 'parse_json': True})
+             for accept in ('application/json', 'text/plain', 'application/json')])
+        assert [r.data.accept for r in results] == ['application/json', 'text/plain',
+                                                    'application/json']
+        assert mocker.call_count == 2 and client.single_flight.hits == 1
+
+        # Errors converted by error_processors are not shared with other calls
+        mocker.get('http://test/path', status_code=500, text=lambda r, c: time.sleep(0.2) or '')
+        results = client.gather([('get', ('path',), {'error_processors': [error_processor]}),
+                                 ('get', ('path',))])
+        assert isinstance(results[0], ValueError) and isinstance(results[1], HTTPError)
+        assert mocker.call_count == 4
+
+
+def test_client_single_flight_decorated():
+    class DecoratedClient(Client):
+        @temporary_error(HTTPError, {'status': 503}, wait_seconds=1)
+        def get_path(self, **kwargs):
+            return self.get('path', parse_json=True, **kwargs)
+
+    client = DecoratedClient(single_flight=SingleFlight())
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', json=lambda r, c: time.sleep(0.2) or {'x': 1})
+        results = client.gather([client.get_path] * 4)
+        assert [r.data.x for r in results] == [1] * 4
+        assert mocker.call_count == 1
+        assert client.single_flight.hits == 3
+
+
+def test_client_single_flight_response_schema():
+    class SchemaClient(Client):
+        @response_schema({'x': TimestampField()})
+        def get_path(self):
+            return self.get('path', parse_json=True)
+
+    client = SchemaClient(single_flight=SingleFlight())
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get('http://test/path', json=lambda r, c: time.sleep(0.2) or {'x': 1})
+        for _ in range(5):
+            results = client.gather([client.get_path] * 3)
+            assert [r.data.x.timestamp() for r in results] == [1] * 3
+            assert len(set(id(r.data) for r in results)) == 3
+        assert mocker.call_count == 5
+        assert client.single_flight.hits == 10
@@ -1,6 +1,79 @@
-from requests_client.utils import maybe_attr_dict
+import copy
+import pickle
+
+import pytest
+
+from requests_client.utils import (maybe_attr_dict, lazy_attr_dict, AttrDict, resolve_obj_path,
+                                   compile_obj_path)
 
 
 def test_maybe_attr_dict():
     assert maybe_attr_dict({'x': 1}).x == 1
     assert maybe_attr_dict({'x': (2, {'y': 3})}).x[1].y == 3
+
+
+def test_lazy_attr_dict():
+    raw = {'x': [{'y': 1}, 2], 'z': {'w': {'v': 3}}}
+    data = lazy_attr_dict(raw)
+    assert isinstance(data, AttrDict)
+    assert data == raw
+    assert type(dict.__getitem__(data, 'z')) is dict
+    assert data.z.w.v == 3
+    assert isinstance(dict.__getitem__(data, 'z'), AttrDict)
+    assert data.x[0].y == 1
+    assert [item for item in data.x][0].y == 1
+    assert data.x[:1][0].y == 1
+    assert data.get('z').w.v == 3
+    assert data.get('missing', 4) == 4
+    assert all(isinstance(v, AttrDict) for k, v in data.items() if k == 'z')
+
+    loaded = pickle.loads(pickle.dumps(data))
+    assert loaded == raw
+    assert loaded.x[0].y == 1 and loaded.z.w.v == 3
+
+
+@pytest.mark.parametrize('wrap', [maybe_attr_dict, lazy_attr_dict])
+def test_attr_dict_access(wrap):
+    def raw():
+        return {'x': [{'y': 1}, {'y': 2}], 'z': {'w': 3}}
+
+    data = wrap(raw())
+    for copied in (dict(data), {**data}, data.copy(), copy.copy(data), copy.deepcopy(data),
+                   pickle.loads(pickle.dumps(data)), dict(**data)):
+        assert copied == raw()
+        assert copied['z'].w == 3 and copied['x'][0].y == 1
+    assert wrap(raw()).pop('z').w == 3
+    assert wrap(raw()).popitem()[1].w == 3
+    assert [key for key, in [(k,) for k in data]] == ['x', 'z']
+
+    items = wrap(raw())['x']
+    assert [item.y for item in reversed(items)] == [2, 1]
+    assert [item.y for item in list(items)] == [1, 2]
+    assert [item.y for item in items.copy()] == [1, 2]
+    assert [item.y for item in items + []] == [1, 2]
+    assert [item.y for item in items * 2] == [1, 2, 1, 2]
+    assert items[1:][0].y == 2 and type(items[:1]) is type(items)
+    first, second = items
+    assert (first.y, second.y) == (1, 2)
+    assert items.pop().y == 2 and items.pop(0).y == 1
+
+
+def test_resolve_obj_path():
+    class Obj:
+        attr = {'x': [10, {'1': 'one'}]}
+
+    data = {'a': [{'b': 1}, {'0': 'zero'}], 'c': {2: 'two'}, 'obj': Obj()}
+    assert resolve_obj_path(data, 'a.0.b') == 1
+    assert resolve_obj_path(data, 'a.1.0') == 'zero'
+    assert resolve_obj_path(data, 'c.2') == 'two'
+    assert resolve_obj_path(data, 'obj.attr.x.1.1') == 'one'
+    assert resolve_obj_path(lazy_attr_dict(data), 'a.0.b') == 1
+    assert resolve_obj_path(data, 'a.5.b', None) is None
+    assert resolve_obj_path(data, 'missing.x', None) is None
+    assert compile_obj_path('a.0.b') is compile_obj_path('a.0.b')
+
+    for path in ('a.5', 'a.x', 'missing', 'c.3'):
+        with pytest.raises(ValueError) as exc:
+            resolve_obj_path(data, path)
+        key = path.split('.')[-1]
+        assert str(exc.value).startswith('Could not resolve "{}" on '.format(key))